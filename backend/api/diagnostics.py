@@ -1,8 +1,16 @@
 import os
 from fastapi import APIRouter
 
+from backend.services.view_refresh import get_view_refresher
+
 router = APIRouter(prefix="/api", tags=["diagnostics"])
 
 @router.get("/translate-model")
 def translate_model():
     return {"model": os.getenv("TRANSLATION_MODEL", "gpt-5")}
+
+
+@router.get("/stats-views")
+def stats_views():
+    """Freshness of the v2 statistics materialized views."""
+    return get_view_refresher().status()
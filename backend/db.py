@@ -1,13 +1,16 @@
 import os
+import copy
 import logging
 import uuid
-from datetime import datetime, date
-from typing import Any, Dict, Optional, List, Iterable
+from datetime import datetime, date, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, List, Iterable, Iterator
 import random
 from supabase import create_client, Client, ClientOptions
 from postgrest.exceptions import APIError
 from backend.utils.settings import get_setting_int
 from backend.http_client import get_client
+from backend.utils.cache import request_map, shared_cache
+from backend.services.view_refresh import note_stats_write
 from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception
 import httpx
 
@@ -17,6 +20,63 @@ _processed_payments: set[str] = set()
 _supabase: Client | None = None
 logger = logging.getLogger(__name__)
 
+# ``hashed_id`` -> ``app_users.id``. The mapping never changes once the row
+# exists, so entries are only evicted for space.
+_user_id_cache = shared_cache(
+    "db.user_id", maxsize=int(os.getenv("USER_ID_CACHE_SIZE", "10000"))
+)
+# ``survey_items.id`` -> ``(survey_id, survey_group_id)``. Items are immutable;
+# edits create new rows with fresh ids.
+_survey_item_cache = shared_cache(
+    "db.survey_item", maxsize=int(os.getenv("SURVEY_ITEM_CACHE_SIZE", "5000"))
+)
+# ``(hashed_id, UTC day)`` -> frozenset of survey group ids answered that day.
+# Entries expire at the next UTC midnight and are updated write-through by
+# every path that records survey answers.
+_daily_groups_cache = shared_cache(
+    "db.daily_groups", maxsize=int(os.getenv("DAILY_COUNT_CACHE_SIZE", "20000"))
+)
+# Resolved user rows keyed by ``hashed_id``. The TTL is short because some
+# writes bypass this module; the write helpers here invalidate entries
+# explicitly.
+_user_cache = shared_cache(
+    "db.user",
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "5")),
+)
+# Lookup key (``app_users.id`` or ``hashed_id``) -> ``hashed_id``. Both ids are
+# fixed once a row exists, so aliases only age out for space.
+_user_alias_cache = shared_cache(
+    "db.user_alias", maxsize=int(os.getenv("USER_ALIAS_CACHE_SIZE", "20000"))
+)
+# Ids recently confirmed not to exist. Bounded in size and time, and cleared by
+# the helpers that create users.
+_missing_user_cache = shared_cache(
+    "db.missing_user",
+    maxsize=int(os.getenv("MISSING_USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("MISSING_USER_CACHE_TTL", "30")),
+)
+# Set once rows from the legacy ``users`` table have been migrated into
+# ``app_users``; until then unknown ids cost a second lookup there.
+LEGACY_USERS_FALLBACK = os.getenv("LEGACY_USERS_FALLBACK", "0").lower() in {"1", "true", "yes"}
+# Usernames seen taken (or handed out) by this process, skipped before the
+# batched availability query.
+_taken_usernames = shared_cache(
+    "db.taken_usernames", maxsize=int(os.getenv("TAKEN_USERNAME_CACHE_SIZE", "50000"))
+)
+# Rows per page when scanning ``app_users`` with :func:`iter_users`.
+USER_PAGE_SIZE = int(os.getenv("USER_PAGE_SIZE", "1000"))
+# Recent scores kept inline on ``app_users.scores``; the full history is the
+# append-only ``user_scores`` table.
+SCORE_RING_SIZE = int(os.getenv("SCORE_RING_SIZE", "20"))
+USERNAME_BATCH_SIZE = int(os.getenv("USERNAME_BATCH_SIZE", "8"))
+USERNAME_MAX_ATTEMPTS = 5
+# ``hashed_id`` values whose signup reward is known to be granted. The grant is
+# permanent, so once a user is verified this process never checks again.
+_signup_verified = shared_cache(
+    "db.signup_verified", maxsize=int(os.getenv("SIGNUP_VERIFIED_CACHE_SIZE", "100000"))
+)
+
 ALLOWED_USER_UPDATE_FIELDS = {
     "nationality",
     "demographic",
@@ -28,6 +88,7 @@ ALLOWED_USER_UPDATE_FIELDS = {
     "referrals",
     "party_log",
     "scores",
+    "score_summary",
     "invite_code",
     "referred_by",
 }
@@ -123,17 +184,53 @@ def _random_username() -> str:
     return f"{random.choice(_ADJECTIVES)} {random.choice(_DUMB_ANIMALS)} {num:05d}"
 
 
-def _username_exists(supabase: Client, username: str) -> bool:
-    """Return True if a username already exists."""
+def _allocate_username(supabase: Client) -> str:
+    """Return a username that is free as far as one batched lookup can tell.
 
-    resp = (
-        supabase.table("app_users")
-        .select("id")
-        .eq("username", username)
-        .limit(1)
-        .execute()
-    )
-    return bool(resp.data)
+    ``USERNAME_BATCH_SIZE`` candidates are drawn, names this process already
+    knows to be taken are dropped, and the rest are checked with a single
+    ``in_`` query. The unique constraint on ``app_users.username`` remains the
+    final arbiter; see :func:`_write_with_username`.
+    """
+
+    while True:
+        candidates = [
+            name
+            for name in dict.fromkeys(_random_username() for _ in range(USERNAME_BATCH_SIZE))
+            if name not in _taken_usernames
+        ]
+        if not candidates:
+            continue
+        resp = (
+            supabase.table("app_users")
+            .select("username")
+            .in_("username", candidates)
+            .execute()
+        )
+        taken = {row.get("username") for row in resp.data or []}
+        for name in taken:
+            if name:
+                _taken_usernames.set(name, True)
+        for name in candidates:
+            if name not in taken:
+                return name
+
+
+def _write_with_username(supabase: Client, write: Callable[[str], Any]) -> str:
+    """Call ``write(username)`` with a fresh username, retrying on collisions."""
+
+    for attempt in range(USERNAME_MAX_ATTEMPTS):
+        name = _allocate_username(supabase)
+        try:
+            write(name)
+        except Exception as exc:  # pragma: no cover - network errors
+            if _is_unique_error(exc) and attempt + 1 < USERNAME_MAX_ATTEMPTS:
+                _taken_usernames.set(name, True)
+                continue
+            raise
+        _taken_usernames.set(name, True)
+        return name
+    raise RuntimeError("unreachable")  # pragma: no cover
 
 
 def _is_unique_error(exc: Exception) -> bool:
@@ -202,15 +299,7 @@ def with_retries(func, *, idempotent: bool = True):
     return _retry_call(func)()
 
 
-def get_user(user_id: str) -> Optional[Dict[str, Any]]:
-    """Return the user record for the given id or hashed_id.
-
-    Supabase JWTs encode the user's UUID in the ``sub`` claim, so we first
-    attempt to resolve the row by ``id``.  For backwards compatibility with
-    older tokens that supplied a ``hashed_id`` we fall back to that column if no
-    match is found.
-    """
-
+def _fetch_user(user_id: str) -> Optional[Dict[str, Any]]:
     supabase = get_supabase()
 
     # Primary lookup against ``app_users`` by id or hashed_id in a single call
@@ -222,10 +311,10 @@ def get_user(user_id: str) -> Optional[Dict[str, Any]]:
         .execute()
     )
     data = resp.data or []
-    if data:
-        return data[0]
+    if data or not LEGACY_USERS_FALLBACK:
+        return data[0] if data else None
 
-    # Legacy support: some tests insert into a ``users`` table.
+    # Legacy ``users`` table, only consulted until it has been migrated.
     resp = (
         supabase.from_("users")
         .select("*")
@@ -237,6 +326,58 @@ def get_user(user_id: str) -> Optional[Dict[str, Any]]:
     return data[0] if data else None
 
 
+def _canonical_user_key(user_id: str) -> str:
+    return _user_alias_cache.get(user_id) or user_id
+
+
+def get_user(user_id: str) -> Optional[Dict[str, Any]]:
+    """Return the user record for the given id or hashed_id.
+
+    Supabase JWTs encode the user's UUID in the ``sub`` claim, so we first
+    attempt to resolve the row by ``id``.  For backwards compatibility with
+    older tokens that supplied a ``hashed_id`` we fall back to that column if no
+    match is found.
+
+    Rows are served from the request identity map, then the short-lived user
+    cache, so one request never fetches the same row twice, and recently
+    unknown ids are answered from a negative cache. Callers receive a private
+    copy they may mutate.
+    """
+
+    key = _canonical_user_key(user_id)
+    scoped = request_map("db.user")
+    row = scoped.get(key) if scoped is not None else None
+    if row is None:
+        row = _user_cache.get(key)
+    if row is None:
+        if _missing_user_cache.get(user_id):
+            return None
+        row = _fetch_user(user_id)
+        if row is None:
+            _missing_user_cache.set(user_id, True)
+            return None
+        key = str(row.get("hashed_id") or row.get("id") or user_id)
+        for alias in (user_id, row.get("id"), row.get("hashed_id")):
+            if alias and str(alias) != key:
+                _user_alias_cache.set(str(alias), key)
+        _user_cache.set(key, row)
+    if scoped is not None:
+        scoped[key] = row
+    return copy.deepcopy(row)
+
+
+def invalidate_user(user_id: str) -> None:
+    """Forget cached state for ``user_id`` after it was written or created."""
+
+    key = _canonical_user_key(user_id)
+    _missing_user_cache.pop(user_id)
+    _missing_user_cache.pop(key)
+    _user_cache.pop(key)
+    scoped = request_map("db.user")
+    if scoped is not None:
+        scoped.pop(key, None)
+
+
 def _generate_invite_code() -> str:
     """Return a short random invite code."""
 
@@ -265,8 +406,10 @@ def create_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
     resp = supabase.from_("app_users").insert(data).execute()
     row = resp.data[0]
     uid = row.get("hashed_id") or row.get("id")
+    for key in {row.get("id"), row.get("hashed_id")} - {None}:
+        invalidate_user(str(key))
     # Ensure signup reward is granted exactly once
-    get_points(uid)
+    grant_signup_reward(uid)
     return row
 
 
@@ -292,29 +435,23 @@ def upsert_user(user_id: str, email: str | None = None) -> None:
         if email and row.get("email") != email:
             updates["email"] = email
         existing_username = row.get("username")
-        if (
+        needs_username = (
             not existing_username
             or existing_username == email
             or "@" in existing_username
-        ):
-            updates["username"] = _random_username()
-        if updates:
-            if "username" in updates:
-                while True:
-                    candidate = updates["username"]
-                    if _username_exists(supabase, candidate):
-                        updates["username"] = _random_username()
-                        continue
-                    try:
-                        supabase.table("app_users").update(updates).eq("id", user_id).execute()
-                        break
-                    except Exception as exc:  # pragma: no cover - network errors
-                        if _is_unique_error(exc):
-                            updates["username"] = _random_username()
-                            continue
-                        raise
-            else:
-                supabase.table("app_users").update(updates).eq("id", user_id).execute()
+        )
+        if needs_username:
+            _write_with_username(
+                supabase,
+                lambda name: supabase.table("app_users")
+                .update({**updates, "username": name})
+                .eq("id", user_id)
+                .execute(),
+            )
+        elif updates:
+            supabase.table("app_users").update(updates).eq("id", user_id).execute()
+        if needs_username or updates:
+            invalidate_user(user_id)
         return
     payload = {
         "id": user_id,
@@ -325,26 +462,16 @@ def upsert_user(user_id: str, email: str | None = None) -> None:
         "party_log": [],
         "scores": [],
         "invite_code": _generate_invite_code(),
-        "username": _random_username(),
     }
     if email:
         payload["email"] = email
-    while True:
-        candidate = payload["username"]
-        if _username_exists(supabase, candidate):
-            payload["username"] = _random_username()
-            continue
-        try:
-            supabase.table("app_users").upsert(payload).execute()
-            break
-        except Exception as exc:  # pragma: no cover - network errors
-            if _is_unique_error(exc):
-                payload["username"] = _random_username()
-                continue
-            raise
-    reward = get_setting_int(supabase, "signup_reward_points", 1)
-    if reward:
-        insert_point_ledger(user_id, reward, "signup")
+
+    def write(name: str) -> None:
+        supabase.table("app_users").upsert({**payload, "username": name}).execute()
+
+    _write_with_username(supabase, write)
+    invalidate_user(user_id)
+    grant_signup_reward(user_id)
 
 
 def get_or_create_user_id_from_hashed(
@@ -358,6 +485,10 @@ def get_or_create_user_id_from_hashed(
     ``id`` or ``None`` on failure.
     """
 
+    cached = _user_id_cache.get(hashed_id)
+    if cached:
+        return cached
+
     # Look up an existing user first.
     res = (
         supabase.table("app_users")
@@ -367,16 +498,18 @@ def get_or_create_user_id_from_hashed(
     )
     data = res.data or []
     if data:
+        _user_id_cache.set(hashed_id, data[0]["id"])
         return data[0]["id"]
 
     # Create the user when missing.
-    default_name = _random_username()
-    supabase.table("app_users").upsert(
-        {"id": hashed_id, "hashed_id": hashed_id, "username": default_name}
-    ).execute()
-    reward = get_setting_int(supabase, "signup_reward_points", 1)
-    if reward:
-        insert_point_ledger(hashed_id, reward, "signup")
+    _write_with_username(
+        supabase,
+        lambda name: supabase.table("app_users")
+        .upsert({"id": hashed_id, "hashed_id": hashed_id, "username": name})
+        .execute(),
+    )
+    invalidate_user(hashed_id)
+    grant_signup_reward(hashed_id)
 
     res = (
         supabase.table("app_users")
@@ -385,7 +518,10 @@ def get_or_create_user_id_from_hashed(
         .execute()
     )
     data = res.data or []
-    return data[0]["id"] if data else None
+    if not data:
+        return None
+    _user_id_cache.set(hashed_id, data[0]["id"])
+    return data[0]["id"]
 
 
 def update_user(supabase: Client, hashed_id: str, data_to_update: Dict[str, Any]) -> None:
@@ -399,6 +535,7 @@ def update_user(supabase: Client, hashed_id: str, data_to_update: Dict[str, Any]
         return
     try:
         supabase.table("app_users").update(payload).eq("hashed_id", hashed_id).execute()
+        invalidate_user(hashed_id)
     except APIError as exc:  # ignore unknown column errors for backwards compatibility
         code = getattr(exc, "code", "")
         msg = str(exc).lower()
@@ -410,12 +547,137 @@ def update_user(supabase: Client, hashed_id: str, data_to_update: Dict[str, Any]
         raise
 
 
-def insert_point_ledger(
-    user_id: str, delta: int, reason: str, expires_at: datetime | None = None
-) -> None:
-    """Insert a row into ``point_ledger`` and sync ``points``."""
+def score_summary(user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return ``{best, latest, count, sum, sum_sq}`` for ``user``'s scores.
+
+    Rows written before ``score_summary`` existed are summarised from the
+    inline ``scores`` array. Returns ``None`` for users without scores.
+    """
+
+    summary = user.get("score_summary")
+    if summary and summary.get("count"):
+        return summary
+    iqs = [s.get("iq") for s in (user.get("scores") or []) if s.get("iq") is not None]
+    if not iqs:
+        return None
+    return {
+        "best": max(iqs),
+        "latest": iqs[-1],
+        "count": len(iqs),
+        "sum": sum(iqs),
+        "sum_sq": sum(v * v for v in iqs),
+    }
+
+
+def record_score(
+    supabase: Client,
+    user: Dict[str, Any],
+    iq: float,
+    percentile: float,
+    session_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Append a score to ``user_scores`` and fold it into the user's summary.
+
+    ``app_users`` only keeps the running summary and the last
+    ``SCORE_RING_SIZE`` entries, so the row stays the same size however many
+    times the user plays. Returns the new summary.
+    """
+
+    entry = {
+        "iq": iq,
+        "percentile": percentile,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        supabase.from_("user_scores").insert(
+            {
+                "user_id": user["hashed_id"],
+                "session_id": session_id,
+                "iq": iq,
+                "percentile": percentile,
+            }
+        ).execute()
+    except Exception as exc:  # pragma: no cover - best effort only
+        logger.warning("Could not store user score: %s", exc)
+
+    summary = dict(
+        score_summary(user) or {"best": iq, "latest": iq, "count": 0, "sum": 0, "sum_sq": 0}
+    )
+    summary["best"] = max(summary["best"], iq)
+    summary["latest"] = iq
+    summary["count"] += 1
+    summary["sum"] += iq
+    summary["sum_sq"] += iq * iq
+    ring = ((user.get("scores") or []) + [entry])[-SCORE_RING_SIZE:]
+    update_user(
+        supabase,
+        user["hashed_id"],
+        {"scores": ring, "score_summary": summary, "plays": (user.get("plays") or 0) + 1},
+    )
+    note_stats_write()
+    return summary
+
+
+def rpc_missing(exc: Exception) -> bool:
+    """Return True if ``exc`` means the database function is not deployed."""
+
+    code = getattr(exc, "code", "")
+    return code in ("PGRST202", "42883") or "could not find the function" in str(exc).lower()
 
+
+def _points_rpc(name: str, params: Dict[str, Any]) -> tuple[bool, Optional[int]]:
+    """Call a points function and return ``(available, balance)``.
+
+    ``available`` is False only when the function is not deployed so callers
+    can fall back to table queries; other errors propagate to avoid applying
+    a ledger change twice.
+    """
+
+    supabase = get_supabase()
+    try:
+        res = supabase.rpc(name, params).execute()
+    except Exception as exc:
+        if rpc_missing(exc):
+            return False, None
+        raise
+    data = res.data
+    if isinstance(data, list):
+        data = data[0] if data else None
+    if isinstance(data, dict):
+        data = next(iter(data.values()), None)
+    return True, None if data is None else int(data)
+
+
+def _credited_today(supabase: Client, user_id: str, reason: str) -> bool:
+    today = datetime.utcnow().date()
+    try:
+        resp = (
+            supabase.table("point_ledger")
+            .select("id")
+            .eq("user_id", user_id)
+            .eq("reason", reason)
+            .gte("created_at", today.isoformat())
+            .lt("created_at", (today + timedelta(days=1)).isoformat())
+            .execute()
+        )
+        return bool(resp.data)
+    except Exception:
+        return False
+
+
+def _credit_points_fallback(
+    user_id: str,
+    delta: int,
+    reason: str,
+    expires_at: datetime | None,
+    once_per_day: bool,
+) -> Optional[int]:
     supabase = get_supabase()
+    current = get_user(user_id)
+    if current is None:
+        return None
+    if once_per_day and _credited_today(supabase, user_id, reason):
+        return int(current.get("points", 0))
     row: Dict[str, Any] = {"user_id": user_id, "delta": delta, "reason": reason}
     if expires_at is not None:
         row["expires_at"] = expires_at.isoformat()
@@ -425,7 +687,6 @@ def insert_point_ledger(
         # Tests may not create the table; fail silently
         pass
 
-    current = get_user(user_id) or {}
     new_points = int(current.get("points", 0)) + delta
     try:
         update_user(supabase, user_id, {"points": new_points})
@@ -433,6 +694,57 @@ def insert_point_ledger(
         code = getattr(exc, "code", "")
         if code not in ("PGRST204", "42703"):
             raise
+    return new_points
+
+
+def credit_points(
+    user_id: str,
+    delta: int,
+    reason: str,
+    expires_at: datetime | None = None,
+    *,
+    once_per_day: bool = False,
+) -> Optional[int]:
+    """Append a ledger entry and return the new balance.
+
+    Runs as a single ``points_credit`` call that locks the user row, so the
+    ledger and ``app_users.points`` cannot drift apart. With ``once_per_day``
+    nothing is credited if ``reason`` was already credited today (UTC) and the
+    current balance is returned. Returns ``None`` if the user does not exist.
+    """
+
+    ok, balance = _points_rpc(
+        "points_credit",
+        {
+            "p_user_id": user_id,
+            "p_delta": delta,
+            "p_reason": reason,
+            "p_expires_at": expires_at.isoformat() if expires_at else None,
+            "p_once_per_day": once_per_day,
+        },
+    )
+    if not ok:
+        return _credit_points_fallback(user_id, delta, reason, expires_at, once_per_day)
+    invalidate_user(user_id)
+    return balance
+
+
+def point_balance(user_id: str) -> Optional[int]:
+    """Return the stored balance for ``user_id`` or ``None`` if unknown."""
+
+    ok, balance = _points_rpc("points_balance", {"p_user_id": user_id})
+    if not ok:
+        user = get_user(user_id)
+        return None if user is None else int(user.get("points", 0))
+    return balance
+
+
+def insert_point_ledger(
+    user_id: str, delta: int, reason: str, expires_at: datetime | None = None
+) -> Optional[int]:
+    """Insert a row into ``point_ledger`` and sync ``points``."""
+
+    return credit_points(user_id, delta, reason, expires_at)
 
 
 def insert_attempt_ledger(*args, **kwargs):  # pragma: no cover - backwards compat
@@ -445,28 +757,73 @@ def increment_free_attempts(user_id: str, delta: int = 1, reason: str = "manual"
     insert_point_ledger(user_id, delta, reason)
 
 
+def _has_signup_ledger(supabase: Client, user_id: str) -> bool:
+    try:
+        res = (
+            supabase.table("point_ledger")
+            .select("id")
+            .eq("user_id", user_id)
+            .eq("reason", "signup")
+            .limit(1)
+            .execute()
+        )
+        return bool(res.data)
+    except Exception:
+        return True
+
+
+def grant_signup_reward(user_id: str) -> Optional[int]:
+    """Credit the one-time signup reward unless it was already granted.
+
+    ``points_grant_signup`` flips ``app_users.signup_reward_granted`` and
+    credits the ledger in one transaction, so concurrent callers grant at most
+    once. Returns the new balance when a reward was credited, else ``None``.
+    """
+
+    supabase = get_supabase()
+    reward = get_setting_int(supabase, "signup_reward_points", 1)
+    if not reward:
+        return None
+    ok, balance = _points_rpc(
+        "points_grant_signup", {"p_user_id": user_id, "p_reward": reward}
+    )
+    if not ok:
+        if _has_signup_ledger(supabase, user_id):
+            balance = None
+        else:
+            insert_point_ledger(user_id, reward, "signup")
+            balance = point_balance(user_id)
+    else:
+        invalidate_user(user_id)
+    _signup_verified.set(user_id, True)
+    return balance
+
+
+def ensure_signup_reward(user_record: Dict[str, Any]) -> Dict[str, Any]:
+    """Make sure ``user_record`` has received its signup reward.
+
+    Users flagged ``signup_reward_granted`` or already verified by this
+    process cost no queries; otherwise the grant is attempted once and
+    ``points`` is refreshed if it was credited.
+    """
+
+    uid = user_record.get("hashed_id") or user_record.get("id")
+    if not uid or _signup_verified.get(uid):
+        return user_record
+    if user_record.get("signup_reward_granted"):
+        _signup_verified.set(uid, True)
+        return user_record
+    balance = grant_signup_reward(uid)
+    if balance is not None:
+        user_record["points"] = balance
+    return user_record
+
+
 def get_points(user_id: str) -> int:
     """Return the current point balance for ``user_id``."""
     user_record = get_user(user_id) or {}
     if user_record:
-        supabase = get_supabase()
-        try:
-            res = (
-                supabase.table("point_ledger")
-                .select("id")
-                .eq("user_id", user_id)
-                .eq("reason", "signup")
-                .limit(1)
-                .execute()
-            )
-            has_signup = bool(res.data)
-        except Exception:
-            has_signup = True
-        if not has_signup:
-            reward = get_setting_int(supabase, "signup_reward_points", 1)
-            if reward:
-                insert_point_ledger(user_id, reward, "signup")
-                user_record = get_user(user_id) or {}
+        ensure_signup_reward(user_record)
     return int(user_record.get("points", 0))
 
 
@@ -478,11 +835,7 @@ def get_free_attempts(user_id: str) -> int:  # pragma: no cover - compat
     return get_points(user_id)
 
 
-def spend_points(user_id: str, amount: int = 1, reason: str = "consume") -> Optional[int]:
-    """Spend ``amount`` points. Returns remaining points or ``None`` if insufficient."""
-
-    if amount <= 0:
-        return get_points(user_id)
+def _spend_points_fallback(user_id: str, amount: int, reason: str) -> Optional[int]:
     if get_user(user_id) is None:
         upsert_user(user_id)
     available = get_points(user_id)
@@ -492,6 +845,27 @@ def spend_points(user_id: str, amount: int = 1, reason: str = "consume") -> Opti
     return get_points(user_id)
 
 
+def spend_points(user_id: str, amount: int = 1, reason: str = "consume") -> Optional[int]:
+    """Spend ``amount`` points. Returns remaining points or ``None`` if insufficient.
+
+    The balance check and debit happen in one ``points_spend`` call, so
+    concurrent spends cannot both succeed against the same points.
+    """
+
+    if amount <= 0:
+        return get_points(user_id)
+    params = {"p_user_id": user_id, "p_amount": amount, "p_reason": reason}
+    ok, balance = _points_rpc("points_spend", params)
+    if not ok:
+        return _spend_points_fallback(user_id, amount, reason)
+    if balance is None and get_user(user_id) is None:
+        # First contact: create the user (granting the signup reward) and retry.
+        upsert_user(user_id)
+        _, balance = _points_rpc("points_spend", params)
+    invalidate_user(user_id)
+    return balance
+
+
 def consume_free_attempt(user_id: str) -> Optional[int]:  # pragma: no cover - compat
     return spend_points(user_id)
 
@@ -529,10 +903,55 @@ def record_payment_event(
         raise
 
 
-def get_all_users() -> List[Dict[str, Any]]:
+def iter_users(columns: str = "hashed_id", page_size: int | None = None) -> Iterator[Dict[str, Any]]:
+    """Yield ``app_users`` rows one page at a time, selecting only ``columns``.
+
+    Pages are fetched with keyset pagination on ``id`` (``id > last`` ordered
+    by ``id``), so every page is an index range scan and memory stays bounded
+    by ``page_size`` however large the table grows. ``id`` is always included
+    in the projection.
+    """
+
+    size = page_size or USER_PAGE_SIZE
+    cols = [c.strip() for c in columns.split(",") if c.strip()]
+    if "*" not in cols and "id" not in cols:
+        cols.append("id")
+    supabase = get_supabase()
+    last_id = None
+    while True:
+        query = supabase.from_("app_users").select(",".join(cols)).order("id")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.limit(size).execute().data or []
+        yield from rows
+        if len(rows) < size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def iter_score_values(page_size: int | None = None) -> Iterator[float]:
+    """Yield the IQ of every ``user_scores`` row, paging by ``id``."""
+
+    size = page_size or USER_PAGE_SIZE
     supabase = get_supabase()
-    resp = supabase.from_("app_users").select("*").execute()
-    return resp.data or []
+    last_id = None
+    while True:
+        query = supabase.from_("user_scores").select("id,iq").order("id")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.limit(size).execute().data or []
+        for row in rows:
+            if row.get("iq") is not None:
+                yield row["iq"]
+        if len(rows) < size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def get_all_users() -> List[Dict[str, Any]]:  # pragma: no cover - compat
+    """Return every user row; prefer :func:`iter_users` with a projection."""
+
+    return list(iter_users("*"))
 
 
 def is_payment_processed(payment_id: str) -> bool:
@@ -721,6 +1140,7 @@ def insert_survey_answers(rows: List[Dict[str, Any]]) -> None:
             )
     if answer_rows:
         supabase.from_("survey_answers").insert(answer_rows).execute()
+        note_stats_write(len(answer_rows))
 
 
 def get_daily_survey_response(
@@ -789,53 +1209,107 @@ def get_survey_answers(group_id: str) -> List[Dict[str, Any]]:
     return answers
 
 
-def get_daily_answer_count(user_hashed_id: str, _day: date | None = None) -> int:
-    """Return the number of distinct survey groups answered on the given UTC day."""
+def _seconds_until_utc_midnight() -> float:
+    now = datetime.utcnow()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max((midnight - now).total_seconds(), 1.0)
 
-    supabase = get_supabase()
-    # Resolve hashed_id to UUID. Missing users simply have zero answers.
-    ures = (
-        supabase.table("app_users")
-        .select("id")
-        .eq("hashed_id", user_hashed_id)
-        .single()
-        .execute()
-    )
-    if not ures.data or "id" not in ures.data:
-        return 0
-    user_id = ures.data["id"]
 
-    utc_today = datetime.utcnow().date() if _day is None else _day
-    day_str = utc_today.isoformat()
+def _fetch_daily_answer_groups(supabase: Client, user_id: str, day_str: str) -> frozenset:
+    """Return the distinct survey groups a user answered on ``day_str``.
 
-    resp = (
-        supabase.table("survey_answers")
-        .select("survey_group_id")
-        .eq("user_id", user_id)
-        .eq("answered_on", day_str)
-        .execute()
+    Uses the ``daily_answer_groups`` RPC so only distinct group ids travel over
+    the wire; falls back to scanning the day's rows when the function is not
+    deployed.
+    """
+
+    try:
+        res = supabase.rpc(
+            "daily_answer_groups", {"p_user_id": user_id, "p_day": day_str}
+        ).execute()
+        rows = res.data or []
+    except Exception as exc:
+        if not rpc_missing(exc):
+            raise
+        res = (
+            supabase.table("survey_answers")
+            .select("survey_group_id")
+            .eq("user_id", user_id)
+            .eq("answered_on", day_str)
+            .execute()
+        )
+        rows = res.data or []
+    return frozenset(
+        str(r["survey_group_id"]) for r in rows if r.get("survey_group_id")
     )
-    rows = resp.data or []
-    groups = {r.get("survey_group_id") for r in rows if r.get("survey_group_id")}
-    return len(groups)
 
 
-def insert_daily_answer(user_hashed_id: str, survey_item_id: str) -> None:
-    """Insert a single poll answer for ``user_hashed_id``.
+def get_daily_answer_count(user_hashed_id: str, _day: date | None = None) -> int:
+    """Return the number of distinct survey groups answered on the given UTC day.
 
-    Only the ``survey_item_id`` is provided by the caller.  This function
-    resolves the corresponding ``survey_id`` and ``survey_group_id`` so that the
-    inserted row satisfies the foreign key constraints of ``survey_answers``.
+    Counts are cached per ``(user, day)`` until the next UTC midnight and kept
+    current by :func:`note_daily_answer`, so repeated quota checks within a
+    request cost nothing.
     """
 
+    utc_today = datetime.utcnow().date() if _day is None else _day
+    day_str = utc_today.isoformat()
+    key = (user_hashed_id, day_str)
+    groups = _daily_groups_cache.get(key)
+    if groups is not None:
+        return len(groups)
+
     supabase = get_supabase()
-    # Resolve the hashed identifier to the internal UUID so that counting
-    # queries operate on the same ``user_id`` field.
-    user_id = get_or_create_user_id_from_hashed(supabase, user_hashed_id)
+    # Resolve hashed_id to UUID. Missing users simply have zero answers.
+    user_id = _user_id_cache.get(user_hashed_id)
     if not user_id:
+        ures = (
+            supabase.table("app_users")
+            .select("id")
+            .eq("hashed_id", user_hashed_id)
+            .single()
+            .execute()
+        )
+        if not ures.data or "id" not in ures.data:
+            return 0
+        user_id = ures.data["id"]
+        _user_id_cache.set(user_hashed_id, user_id)
+
+    groups = _fetch_daily_answer_groups(supabase, user_id, day_str)
+    _daily_groups_cache.set(key, groups, ttl=_seconds_until_utc_midnight())
+    return len(groups)
+
+
+def note_daily_answer(
+    user_hashed_id: str, survey_group_id: str | None, _day: date | None = None
+) -> None:
+    """Record a just-written answer in the cached daily count, if one exists."""
+
+    if not survey_group_id:
+        return
+    utc_today = datetime.utcnow().date() if _day is None else _day
+    key = (user_hashed_id, utc_today.isoformat())
+    groups = _daily_groups_cache.get(key)
+    if groups is None:
         return
+    _daily_groups_cache.set(
+        key, groups | {str(survey_group_id)}, ttl=_seconds_until_utc_midnight()
+    )
+
+
+def get_survey_item_meta(
+    supabase: Client, survey_item_id: str
+) -> tuple[str, Optional[str]] | None:
+    """Return ``(survey_id, survey_group_id)`` for a survey item.
+
+    Results are cached for the lifetime of the process; unknown items are not
+    cached so that newly created surveys resolve on their first answer.
+    """
+
+    cached = _survey_item_cache.get(survey_item_id)
+    if cached is not None:
+        return cached
 
-    # Look up the survey and group identifiers for the provided item.
     item_resp = (
         supabase.table("survey_items")
         .select("survey_id")
@@ -845,7 +1319,7 @@ def insert_daily_answer(user_hashed_id: str, survey_item_id: str) -> None:
     )
     survey_id = item_resp.data.get("survey_id") if item_resp.data else None
     if not survey_id:
-        return
+        return None
 
     survey_resp = (
         supabase.table("surveys")
@@ -855,6 +1329,32 @@ def insert_daily_answer(user_hashed_id: str, survey_item_id: str) -> None:
         .execute()
     )
     survey_group_id = survey_resp.data.get("group_id") if survey_resp.data else None
+    meta = (survey_id, survey_group_id)
+    _survey_item_cache.set(survey_item_id, meta)
+    return meta
+
+
+def insert_daily_answer(user_hashed_id: str, survey_item_id: str) -> None:
+    """Insert a single poll answer for ``user_hashed_id``.
+
+    Only the ``survey_item_id`` is provided by the caller.  This function
+    resolves the corresponding ``survey_id`` and ``survey_group_id`` so that the
+    inserted row satisfies the foreign key constraints of ``survey_answers``.
+    Both lookups are cached, so in the steady state this costs a single insert.
+    """
+
+    supabase = get_supabase()
+    # Resolve the hashed identifier to the internal UUID so that counting
+    # queries operate on the same ``user_id`` field.
+    user_id = get_or_create_user_id_from_hashed(supabase, user_hashed_id)
+    if not user_id:
+        return
+
+    # Look up the survey and group identifiers for the provided item.
+    meta = get_survey_item_meta(supabase, survey_item_id)
+    if meta is None:
+        return
+    survey_id, survey_group_id = meta
 
     row = {
         "id": str(uuid.uuid4()),
@@ -865,6 +1365,8 @@ def insert_daily_answer(user_hashed_id: str, survey_item_id: str) -> None:
         "created_at": datetime.utcnow().isoformat() + "Z",
     }
     supabase.table("survey_answers").insert(row).execute()
+    note_daily_answer(user_hashed_id, survey_group_id)
+    note_stats_write()
 
 
 def get_dashboard_default_survey() -> Optional[str]:
@@ -1,14 +1,134 @@
+import logging
 import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
 import jwt
-from jwt import PyJWKClient
 from fastapi import HTTPException
 
+from backend.http_client import get_client
+
+logger = logging.getLogger(__name__)
+
 SUPABASE_URL = os.getenv("SUPABASE_URL", "").rstrip("/")
 SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL") or (
     f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json" if SUPABASE_URL else None
 )
 JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET") or os.getenv("JWT_SECRET")
 VERIFY_OPTS = {"verify_aud": False}
+# Key sets older than this are refreshed in the background; they stay usable.
+JWKS_CACHE_TTL = float(os.getenv("JWKS_CACHE_TTL", "600"))
+# Lower bound between fetches so bursts of unknown ``kid`` values or an
+# unreachable endpoint cannot turn into a fetch per request.
+JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("JWKS_MIN_REFRESH_INTERVAL", "30"))
+
+
+class JWKSCache:
+    """Process-wide signing keys indexed by ``kid``.
+
+    Lookups are in-memory. An unknown ``kid`` triggers at most one synchronous
+    refetch (concurrent callers wait for it rather than fetching again), aging
+    key sets are refreshed in a background thread, and the last good keys keep
+    being served while the endpoint is failing.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        ttl: float = JWKS_CACHE_TTL,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_INTERVAL,
+        fetch: Optional[Callable[[], Dict[str, Any]]] = None,
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._fetch_impl = fetch or self._fetch
+        self._keys: Dict[Optional[str], jwt.PyJWK] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _fetch(self) -> Dict[str, Any]:
+        resp = get_client().get(self.url)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _may_fetch(self, now: float) -> bool:
+        return (
+            self._last_attempt is None
+            or now - self._last_attempt >= self.min_refresh_interval
+        )
+
+    def refresh(self) -> bool:
+        """Fetch the key set, keeping the current keys if that fails."""
+
+        self._last_attempt = time.monotonic()
+        try:
+            keyset = jwt.PyJWKSet.from_dict(self._fetch_impl())
+        except Exception as exc:
+            logger.warning("JWKS refresh failed; serving cached keys: %s", exc)
+            return False
+        self._keys = {k.key_id: k for k in keyset.keys}
+        self._fetched_at = time.monotonic()
+        return True
+
+    def refresh_in_background(self) -> None:
+        """Start a refresh unless one is running or one ran too recently."""
+
+        if not self.url or not self._may_fetch(time.monotonic()):
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+
+        def run() -> None:
+            try:
+                self.refresh()
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+    def _lookup(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        keys = self._keys
+        if kid is None and len(keys) == 1:
+            return next(iter(keys.values()))
+        return keys.get(kid)
+
+    def get_key(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        key = self._lookup(kid)
+        if key is not None:
+            if self._fetched_at is not None and time.monotonic() - self._fetched_at >= self.ttl:
+                self.refresh_in_background()
+            return key
+        if not self.url:
+            return None
+        seen = self._last_attempt
+        with self._lock:
+            key = self._lookup(kid)
+            # Another caller fetched while we waited; do not fetch again.
+            if key is None and self._last_attempt == seen and self._may_fetch(time.monotonic()):
+                self.refresh()
+                key = self._lookup(kid)
+        return key
+
+
+_jwks_cache: Optional[JWKSCache] = None
+_jwks_lock = threading.Lock()
+
+
+def get_jwks_cache() -> JWKSCache:
+    global _jwks_cache
+    with _jwks_lock:
+        if _jwks_cache is None:
+            _jwks_cache = JWKSCache(SUPABASE_JWKS_URL)
+        return _jwks_cache
+
+
+def prefetch_jwks() -> None:
+    """Warm the key cache at startup so the first request verifies in memory."""
+
+    get_jwks_cache().refresh_in_background()
 
 
 def decode_supabase_jwt(token: str) -> dict:
@@ -29,10 +149,15 @@ def decode_supabase_jwt(token: str) -> dict:
     if not SUPABASE_JWKS_URL:
         raise HTTPException(status_code=401, detail="JWT verification not configured")
 
+    signing_key = get_jwks_cache().get_key(header.get("kid"))
+    if signing_key is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
     try:
-        jwk_client = PyJWKClient(SUPABASE_JWKS_URL)
-        signing_key = jwk_client.get_signing_key_from_jwt(token)
-        return jwt.decode(token, signing_key.key, algorithms=[alg], options=VERIFY_OPTS)
+        return jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=[signing_key.algorithm_name],
+            options=VERIFY_OPTS,
+        )
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
-
@@ -2,6 +2,7 @@
 
 import math
 import random
+from typing import List, Sequence
 
 
 def laplace_noise(scale: float) -> float:
@@ -16,3 +17,9 @@ def add_laplace(value: float, epsilon: float, sensitivity: float = 1.0) -> float
         raise ValueError("epsilon must be positive")
     scale = sensitivity / epsilon
     return value + laplace_noise(scale)
+
+
+def laplace_noises(scales: Sequence[float]) -> List[float]:
+    """Return one Laplace draw per entry of ``scales``."""
+    draws = [random.random() - 0.5 for _ in scales]
+    return [-s * math.copysign(math.log(1 - 2 * abs(u)), u) for s, u in zip(scales, draws)]
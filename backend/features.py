@@ -1,12 +1,13 @@
 """Additional features used by the FastAPI backend."""
 
 import io
-import json
 import os
 import time
-from typing import List, Optional
+from typing import Hashable, List, Optional
 
-from db import get_all_users
+from backend.services.dp_release import get_dp_releases
+from backend.services.norms import get_norms
+from backend.services.party_stats import get_party_aggregates
 from dp import add_laplace
 
 try:
@@ -26,45 +27,60 @@ def dp_average(
     ``None`` to avoid revealing small aggregates. Laplace noise scaled by
     ``epsilon`` is applied to the resulting mean.
     """
-    if len(values) < min_count:
+    return dp_mean(sum(values), len(values), epsilon, min_count=min_count)
+
+
+def dp_mean(
+    total: float,
+    count: int,
+    epsilon: float,
+    min_count: int = MIN_BUCKET_SIZE,
+    key: Optional[Hashable] = None,
+) -> Optional[float]:
+    """Differentially private mean from a precomputed ``total`` and ``count``.
+
+    With a ``key`` the release is cached and budgeted per key by
+    :mod:`backend.services.dp_release` until ``total`` or ``count`` changes.
+    """
+    if count < min_count:
         return None
-    mean = sum(values) / len(values)
-    return add_laplace(mean, epsilon, sensitivity=1 / len(values))
+    if key is not None:
+        return get_dp_releases().release(
+            key, (count, total), total / count, epsilon, sensitivity=1 / count
+        )
+    return add_laplace(total / count, epsilon, sensitivity=1 / count)
 
 
 async def leaderboard_by_party(epsilon: float = 1.0) -> List[dict]:
     """Return average IQ by party with differential privacy.
 
-    Parties with fewer than ``min_count`` submissions are omitted to
-    preserve privacy. Laplace noise is added using :func:`dp_average`.
+    Each user counts once per party with their average score, read from
+    the running aggregates in :mod:`backend.services.party_stats`. Parties
+    with fewer than ``min_count`` users are omitted to preserve privacy.
+    Noisy averages are cached per party until that party's counters change
+    (see :mod:`backend.services.dp_release`).
     """
-    buckets: dict[int, List[float]] = {}
-    users = get_all_users()
-    for user in users:
-        latest = user.get("party_log", [])
-        latest = latest[-1]["party_ids"] if latest else []
-        parties = latest
-        scores = [s.get("iq") for s in (user.get("scores") or [])]
-        if not parties or not scores:
-            continue
-        avg_score = sum(scores) / len(scores)
-        for pid in parties:
-            buckets.setdefault(pid, []).append(avg_score)
+    eligible = [
+        (pid, cell)
+        for pid, cell in get_party_aggregates().parties().items()
+        if cell.count >= MIN_BUCKET_SIZE
+    ]
+    queries = [
+        (("party_avg", pid), (cell.count, cell.total), cell.mean, 1 / cell.count)
+        for pid, cell in eligible
+    ]
+    noisy = get_dp_releases().release_many(queries, epsilon)
 
     results = []
-    for pid, vals in buckets.items():
-        if not vals:
-            continue
-        true_mean = sum(vals) / len(vals)
-        noisy = dp_average(vals, epsilon, min_count=MIN_BUCKET_SIZE)
-        if noisy is None:
+    for (pid, cell), value in zip(eligible, noisy):
+        if value is None:
             continue
         results.append(
             {
                 "party_id": pid,
-                "avg_iq": noisy,
-                "n": len(vals),
-                "noise": noisy - true_mean,
+                "avg_iq": value,
+                "n": cell.count,
+                "noise": value - cell.mean,
             }
         )
 
@@ -134,30 +150,12 @@ def generate_share_image(user_id: str, iq: float, percentile: float) -> str:
     return f"/static/share/{filename}"
 
 
-def update_normative_distribution(new_scores: List[float]) -> None:
-    """Recompute normative distribution with incoming scores.
+def update_normative_distribution(new_thetas: List[float]) -> int:
+    """Rebuild the normative sketch from ``new_thetas``.
 
-    The existing distribution is loaded from ``data/normative_distribution.json``.
-    ``new_scores`` are appended and the list is truncated to keep only the most
-    recent 5000 values.  This simple rolling window prevents small sample
-    skew while remaining lightweight for the demo application.
+    The sketch (see :mod:`backend.services.norms`) replaces the old rolling
+    window of raw samples; submits feed it incrementally, so this is only
+    needed to recompute norms from the full score history.
     """
 
-    if not new_scores:
-        return
-
-    path = os.path.join(
-        os.path.dirname(__file__), "data", "normative_distribution.json"
-    )
-    try:
-        with open(path) as f:
-            dist = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        dist = []
-
-    dist.extend(new_scores)
-    if len(dist) > 5000:
-        dist = dist[-5000:]
-
-    with open(path, "w") as f:
-        json.dump(dist, f)
+    return get_norms().replace(new_thetas)
@@ -12,6 +12,7 @@ logger = logging.getLogger(__name__)
 
 _Client = httpx.Client
 _client: Optional[_Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
 
 
 def _env_bool(name: str, default: bool = False) -> bool:
@@ -34,45 +35,110 @@ _retry_deco = retry(
 )
 
 
+def _is_idempotent(method: str, kwargs: dict) -> bool:
+    return kwargs.pop("idempotent", False) or method.upper() in {"GET", "HEAD", "OPTIONS"}
+
+
+def _check_status(response: httpx.Response) -> httpx.Response:
+    if response.status_code >= 500 or response.status_code == 429:
+        raise httpx.HTTPStatusError("server error", request=response.request, response=response)
+    return response
+
+
+def _log_response(method: str, response: httpx.Response, attempt: int, start: float) -> None:
+    latency = (time.perf_counter() - start) * 1000
+    logger.info(
+        "external_http", extra={"method": method.upper(), "path": urlparse(str(response.request.url)).path, "status": response.status_code, "attempt": attempt, "latency_ms": round(latency, 2)}
+    )
+
+
+def _log_error(method: str, url: str, exc: Exception, attempt: int, start: float) -> None:
+    latency = (time.perf_counter() - start) * 1000
+    logger.warning(
+        "external_http_error",
+        extra={
+            "method": method.upper(),
+            "path": urlparse(str(url)).path,
+            "attempt": attempt,
+            "latency_ms": round(latency, 2),
+            "error": str(exc)[:200],
+        },
+    )
+
+
 class RetryingClient(httpx.Client):
     """httpx.Client with tenacity-based retries for idempotent requests."""
 
     def request(self, method: str, url: str, *args, **kwargs) -> httpx.Response:  # type: ignore[override]
-        idempotent = kwargs.pop("idempotent", False) or method.upper() in {"GET", "HEAD", "OPTIONS"}
+        idempotent = _is_idempotent(method, kwargs)
         attempt = 0
         start = time.perf_counter()
 
         def send() -> httpx.Response:
             nonlocal attempt
             attempt += 1
-            response = super(RetryingClient, self).request(method, url, *args, **kwargs)
-            if response.status_code >= 500 or response.status_code == 429:
-                raise httpx.HTTPStatusError("server error", request=response.request, response=response)
-            return response
+            return _check_status(super(RetryingClient, self).request(method, url, *args, **kwargs))
 
         try:
-            if idempotent:
-                response = _retry_deco(send)()
-            else:
-                response = send()
-            latency = (time.perf_counter() - start) * 1000
-            logger.info(
-                "external_http", extra={"method": method.upper(), "path": urlparse(str(response.request.url)).path, "status": response.status_code, "attempt": attempt, "latency_ms": round(latency, 2)}
-            )
-            return response
+            response = _retry_deco(send)() if idempotent else send()
         except Exception as exc:  # pragma: no cover - network error
-            latency = (time.perf_counter() - start) * 1000
-            logger.warning(
-                "external_http_error",
-                extra={
-                    "method": method.upper(),
-                    "path": urlparse(url).path,
-                    "attempt": attempt,
-                    "latency_ms": round(latency, 2),
-                    "error": str(exc)[:200],
-                },
+            _log_error(method, url, exc, attempt, start)
+            raise
+        _log_response(method, response, attempt, start)
+        return response
+
+
+class AsyncRetryingClient(httpx.AsyncClient):
+    """httpx.AsyncClient with the same retries and logging as :class:`RetryingClient`."""
+
+    async def request(self, method: str, url: str, *args, **kwargs) -> httpx.Response:  # type: ignore[override]
+        idempotent = _is_idempotent(method, kwargs)
+        attempt = 0
+        start = time.perf_counter()
+
+        async def send() -> httpx.Response:
+            nonlocal attempt
+            attempt += 1
+            return _check_status(
+                await super(AsyncRetryingClient, self).request(method, url, *args, **kwargs)
             )
+
+        try:
+            response = await (_retry_deco(send)() if idempotent else send())
+        except Exception as exc:  # pragma: no cover - network error
+            _log_error(method, url, exc, attempt, start)
             raise
+        _log_response(method, response, attempt, start)
+        return response
+
+
+def _client_options() -> dict:
+    """Base URL, pool limits, timeouts and headers shared by both clients."""
+
+    base_url = os.getenv("BASE_REST_URL")
+    if not base_url:
+        supabase_url = os.getenv("SUPABASE_URL", "http://localhost").rstrip("/")
+        base_url = f"{supabase_url}/rest/v1"
+    timeout = httpx.Timeout(
+        connect=float(os.getenv("HTTPX_CONNECT_TIMEOUT", 3.0)),
+        read=float(os.getenv("READ_TIMEOUT", 10.0)),
+        write=float(os.getenv("WRITE_TIMEOUT", 10.0)),
+        pool=float(os.getenv("POOL_TIMEOUT", 5.0)),
+    )
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("MAX_CONNECTIONS", 20)),
+        max_keepalive_connections=int(os.getenv("MAX_KEEPALIVE", 20)),
+    )
+    headers = {"User-Agent": "IQArenaBackend/1.0", "Accept": "application/json"}
+    if _env_bool("HTTPX_DEBUG", False):
+        logging.getLogger("httpx").setLevel(logging.DEBUG)
+    return {
+        "base_url": base_url,
+        "timeout": timeout,
+        "limits": limits,
+        "headers": headers,
+        "http2": _env_bool("EXTERNAL_HTTP2", False),
+    }
 
 
 def get_client(transport: httpx.BaseTransport | None = None) -> RetryingClient:
@@ -83,32 +149,7 @@ def get_client(transport: httpx.BaseTransport | None = None) -> RetryingClient:
     """
     global _client
     if _client is None or _client.is_closed:
-        base_url = os.getenv("BASE_REST_URL")
-        if not base_url:
-            supabase_url = os.getenv("SUPABASE_URL", "http://localhost").rstrip("/")
-            base_url = f"{supabase_url}/rest/v1"
-        timeout = httpx.Timeout(
-            connect=float(os.getenv("HTTPX_CONNECT_TIMEOUT", 3.0)),
-            read=float(os.getenv("READ_TIMEOUT", 10.0)),
-            write=float(os.getenv("WRITE_TIMEOUT", 10.0)),
-            pool=float(os.getenv("POOL_TIMEOUT", 5.0)),
-        )
-        limits = httpx.Limits(
-            max_connections=int(os.getenv("MAX_CONNECTIONS", 20)),
-            max_keepalive_connections=int(os.getenv("MAX_KEEPALIVE", 20)),
-        )
-        headers = {"User-Agent": "IQArenaBackend/1.0", "Accept": "application/json"}
-        http2 = _env_bool("EXTERNAL_HTTP2", False)
-        _client = RetryingClient(
-            base_url=base_url,
-            timeout=timeout,
-            limits=limits,
-            headers=headers,
-            transport=transport,
-            http2=http2,
-        )
-        if _env_bool("HTTPX_DEBUG", False):
-            logging.getLogger("httpx").setLevel(logging.DEBUG)
+        _client = RetryingClient(transport=transport, **_client_options())
     return _client
 
 
@@ -119,6 +160,28 @@ def close_client() -> None:
         _client = None
 
 
+def get_async_client(transport: httpx.AsyncBaseTransport | None = None) -> AsyncRetryingClient:
+    """Return the shared async client for Supabase REST.
+
+    It has its own connection pool with the same limits as :func:`get_client`
+    and is opened and closed by the app lifespan, so it belongs to the
+    server's event loop. Use it from ``async`` routes to issue PostgREST
+    calls concurrently (e.g. with ``asyncio.gather``) without holding
+    threadpool workers.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = AsyncRetryingClient(transport=transport, **_client_options())
+    return _async_client
+
+
+async def close_async_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
 def warmup_supabase() -> None:
     if not _env_bool("WARMUP_SUPABASE", False):
         return
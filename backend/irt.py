@@ -17,6 +17,13 @@ def update_theta(
     return theta + lr * a * error
 
 
-def percentile(score: float, distribution: list) -> float:
+def percentile(score: float, distribution) -> float:
+    """Percentage of ``distribution`` at or below ``score``.
+
+    ``distribution`` is a list of samples or a sketch with a ``percentile``
+    method such as :class:`backend.services.norms.Norms`.
+    """
+    if hasattr(distribution, "percentile"):
+        return distribution.percentile(score)
     count = sum(1 for x in distribution if x <= score)
     return 100 * count / len(distribution)
@@ -10,7 +10,7 @@ from typing import List, Optional
 
 import sys
 import logging
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 
 logging.basicConfig(level=logging.INFO)
@@ -32,11 +32,26 @@ import tempfile
 from tools.generate_questions import import_dir
 
 from backend.routes.dependencies import require_admin
-from backend.http_client import get_client, close_client, warmup_supabase
+from backend.http_client import (
+    close_async_client,
+    close_client,
+    get_async_client,
+    get_client,
+    warmup_supabase,
+)
+from backend.deps.supabase_jwt import prefetch_jwks
+from backend.utils.cache import RequestScopeMiddleware
+from backend.utils.response_cache import CacheRule, ResponseCacheMiddleware
+from backend.services.score_index import get_score_index
+from backend.services.demographic_cube import get_demographic_cube, query_key
+from backend.services.view_refresh import get_view_refresher
+from backend.services.norms import get_norms
+from backend.services.dp_release import quantize_epsilon
+from backend.services import db_read
 from features import (
     generate_share_image,
     update_normative_distribution,
-    dp_average,
+    dp_mean,
     MIN_BUCKET_SIZE,
 )
 from demographics import collect_demographics
@@ -92,9 +107,15 @@ from utils.settings import get_setting_int
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     get_client()
+    get_async_client()
     warmup_supabase()
+    prefetch_jwks()
+    if db_read._use_v2():
+        get_view_refresher().start()
     yield
+    get_view_refresher().stop()
     close_client()
+    await close_async_client()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -110,6 +131,16 @@ async def favicon() -> Response:
 async def root_head() -> Response:
     return Response(status_code=204)
 
+# Added first so it runs innermost: cached bodies stay uncompressed and CORS
+# headers are still computed for each request.
+app.add_middleware(
+    ResponseCacheMiddleware,
+    rules=[
+        CacheRule.path(r"/leaderboard", vary_on_auth=True),
+        CacheRule.path(r"/arena/iq_stats"),
+        CacheRule.path(r"/stats/surveys/[^/]+/iq_by_option"),
+    ],
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -127,6 +158,7 @@ except Exception:  # pragma: no cover
     BrotliMiddleware = None
 
 app.add_middleware(GZipMiddleware, minimum_size=500)
+app.add_middleware(RequestScopeMiddleware)
 if BrotliMiddleware:
     app.add_middleware(BrotliMiddleware)
 
@@ -171,7 +203,9 @@ from db import (
     get_user,
     create_user as db_create_user,
     update_user as db_update_user,
-    get_all_users,
+    iter_users,
+    iter_score_values,
+    score_summary,
     get_supabase,
     get_surveys,
     get_survey_answers,
@@ -184,9 +218,12 @@ from db import (
     DEFAULT_RETRY_PRICE,
     DEFAULT_PRO_PRICE,
     insert_point_ledger,
+    credit_points,
     with_retries,
     insert_daily_answer,
     get_daily_answer_count,
+    note_daily_answer,
+    invalidate_user,
     spend_points,
     mark_payment_processed,
     is_payment_processed,
@@ -246,12 +283,8 @@ PRICE_VARIANTS = [480, 720, 980]
 AD_REWARD_POINTS = int(os.getenv("AD_REWARD_POINTS", "1"))
 RETRY_POINT_COST = int(os.getenv("RETRY_POINT_COST", "5"))
 
-# Load normative distribution for percentile scores
-_dist_path = os.path.join(
-    os.path.dirname(__file__), "data", "normative_distribution.json"
-)
-with open(_dist_path) as f:
-    NORMATIVE_DIST = json.load(f)
+# Normative ability distribution for percentile scores
+NORMATIVE_DIST = get_norms()
 
 
 class QuizQuestion(BaseModel):
@@ -359,10 +392,19 @@ class ScoreEntry(BaseModel):
     set_id: str | None = None
 
 
+class ScoreSummary(BaseModel):
+    best: float
+    latest: float
+    count: int
+    sum: float
+    sum_sq: float
+
+
 class UserStats(BaseModel):
     plays: int
     referrals: int
     scores: list[ScoreEntry]
+    score_summary: ScoreSummary | None = None
     party_log: list
     points: int
 
@@ -470,20 +512,16 @@ async def record_play(action: UserAction):
     user = get_user(action.user_id)
     if not user:
         user = db_create_user({"hashed_id": action.user_id})
-    if user.get("points", 0) < cost:
+    remaining = spend_points(action.user_id, cost)
+    if remaining is None:
         raise HTTPException(
             status_code=402,
             detail={"error": "insufficient_points", "message": "ポイントが不足しています。"},
         )
-    remaining = spend_points(action.user_id, cost)
     user["plays"] = user.get("plays", 0) + 1
-    db_update_user(
-        supabase,
-        action.user_id,
-        {"plays": user["plays"], "points": remaining or 0},
-    )
+    db_update_user(supabase, action.user_id, {"plays": user["plays"]})
     track_event({"event": "play_record", "user_id": action.user_id})
-    return {"plays": user["plays"], "points": remaining or 0}
+    return {"plays": user["plays"], "points": remaining}
 
 
 @app.post("/referral")
@@ -508,33 +546,14 @@ async def ads_start(action: UserAction):
 
 @app.post("/ads/complete")
 async def ads_complete(action: UserAction):
-    user = get_user(action.user_id)
-    if not user:
-        user = db_create_user({"hashed_id": action.user_id})
     supabase = get_supabase()
     reward = get_setting_int(supabase, "ad_reward_points", AD_REWARD_POINTS)
-    today = datetime.utcnow().date()
-    tomorrow = today + timedelta(days=1)
-    try:
-        resp = (
-            supabase.table("point_ledger")
-            .select("id")
-            .eq("user_id", action.user_id)
-            .eq("reason", "ad")
-            .gte("created_at", today.isoformat())
-            .lt("created_at", tomorrow.isoformat())
-            .execute()
-        )
-        if resp.data:
-            updated = get_user(action.user_id) or {}
-            return {"points": updated.get("points", 0)}
-    except Exception:
-        pass
-    insert_point_ledger(action.user_id, reward, "ad")
-    updated = get_user(action.user_id) or {}
-    new_points = updated.get("points", 0)
+    new_points = credit_points(action.user_id, reward, "ad", once_per_day=True)
+    if new_points is None:
+        db_create_user({"hashed_id": action.user_id})
+        new_points = credit_points(action.user_id, reward, "ad", once_per_day=True)
     track_event({"event": "ad_complete", "user_id": action.user_id})
-    return {"points": new_points}
+    return {"points": new_points or 0}
 
 
 @app.get("/ping")
@@ -614,6 +633,7 @@ async def adaptive_answer(payload: AdaptiveAnswerRequest):
         theta = estimate_theta(session["answers"])
         iq_val = iq_score(theta)
         pct = percentile(theta, NORMATIVE_DIST)
+        NORMATIVE_DIST.record(theta)
         ability = ability_summary(theta)
         se = standard_error(theta, session["answers"])
         share_url = generate_share_image(payload.session_id, iq_val, pct)
@@ -632,6 +652,7 @@ async def adaptive_answer(payload: AdaptiveAnswerRequest):
         theta = estimate_theta(session["answers"])
         iq_val = iq_score(theta)
         pct = percentile(theta, NORMATIVE_DIST)
+        NORMATIVE_DIST.record(theta)
         ability = ability_summary(theta)
         se = standard_error(theta, session["answers"])
         share_url = generate_share_image(payload.session_id, iq_val, pct)
@@ -783,9 +804,11 @@ async def survey_submit(payload: SurveySubmit):
         supabase_admin.table("app_users").update({"survey_completed": True}).eq(
             "id", str(payload.user_id)
         ).execute()
+        invalidate_user(str(payload.user_id))
         user = get_user(str(payload.user_id))
         hashed_id = user.get("hashed_id") if user else None
         if hashed_id:
+            note_daily_answer(hashed_id, str(payload.survey_group_id))
             answered_count = get_daily_answer_count(
                 hashed_id, datetime.utcnow().date()
             )
@@ -831,6 +854,7 @@ async def user_stats(user_id: str):
         "plays": user.get("plays", 0),
         "referrals": user.get("referrals", 0),
         "scores": user.get("scores") or [],
+        "score_summary": score_summary(user),
         "party_log": user.get("party_log") or [],
         "points": user.get("points", 0),
     }
@@ -838,7 +862,11 @@ async def user_stats(user_id: str):
 
 @app.get("/user/history/{user_id}", response_model=HistoryResponse)
 async def user_history(user_id: str):
-    """Return past quiz scores for the user sorted by timestamp desc."""
+    """Return the user's recent quiz scores sorted by timestamp desc.
+
+    Only the last ``SCORE_RING_SIZE`` scores are kept on the user row; the
+    paginated attempt history is served by ``/user/history``.
+    """
     user = get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -871,35 +899,26 @@ async def analytics(event: dict):
 
 @app.get("/stats/iq_histogram")
 async def iq_histogram(user_id: str):
-    users = get_all_users()
-    top_scores = []
-    user_score = None
-    for u in users:
-        uscores = [s.get("iq") for s in (u.get("scores") or [])]
-        if not uscores:
-            continue
-        top = max(uscores)
-        top_scores.append(top)
-        if u.get("hashed_id") == user_id:
-            user_score = top
-    if not top_scores:
+    index = get_score_index()
+    user_score = index.best(user_id)
+    buckets = index.histogram()
+    if not buckets:
         return {
             "histogram": [],
             "bucket_edges": [],
             "user_score": user_score,
             "user_percentile": None,
         }
-    min_edge = int(min(top_scores) // 5 * 5)
-    max_edge = int(max(top_scores) // 5 * 5) + 5
-    bucket_edges = list(range(min_edge, max_edge + 1, 5))
+    width = index.bucket_width
+    min_edge = buckets[0][0]
+    max_edge = buckets[-1][0] + width
+    bucket_edges = list(range(min_edge, max_edge + 1, width))
     hist_counts = [0] * (len(bucket_edges) - 1)
-    for s in top_scores:
-        idx = min(int((s - min_edge) // 5), len(hist_counts) - 1)
-        hist_counts[idx] += 1
+    for start, count in buckets:
+        hist_counts[(start - min_edge) // width] = count
     percentile = None
     if user_score is not None:
-        rank = sum(1 for s in top_scores if s <= user_score)
-        percentile = rank / len(top_scores) * 100
+        percentile = index.percentile(user_score)
     return {
         "histogram": hist_counts,
         "bucket_edges": bucket_edges,
@@ -913,7 +932,11 @@ async def survey_option_stats(group_id: str):
     answers = get_survey_answers(group_id)
     if not answers:
         return {"options": [], "averages": [], "counts": []}
-    users = {u["hashed_id"]: u for u in get_all_users()}
+    best_by_user = {}
+    for u in iter_users("hashed_id,score_summary,scores"):
+        summary = score_summary(u)
+        if summary:
+            best_by_user[u["hashed_id"]] = summary["best"]
     survey = next(
         (s for s in get_surveys("en") if s.get("group_id") == group_id),
         None,
@@ -926,13 +949,9 @@ async def survey_option_stats(group_id: str):
     options = survey.get("options", []) if survey else []
     iq_by_option: dict[int, list[float]] = {i: [] for i in range(len(options))}
     for ans in answers:
-        user = users.get(ans["user_id"])
-        if not user:
+        top = best_by_user.get(ans["user_id"])
+        if top is None:
             continue
-        uscores = [s.get("iq") for s in (user.get("scores") or [])]
-        if not uscores:
-            continue
-        top = max(uscores)
         iq_by_option.setdefault(ans["option_index"], []).append(top)
     averages = []
     counts = []
@@ -946,29 +965,18 @@ async def survey_option_stats(group_id: str):
 @app.get("/stats/distribution")
 async def stats_distribution(user_id: str, epsilon: float = 1.0):
     """Return histogram of top IQ scores and user's percentile."""
-    users = get_all_users()
-    scores = []
-    user_score = None
-    for u in users:
-        uscores = [s.get("iq") for s in (u.get("scores") or [])]
-        if not uscores:
-            continue
-        top = max(uscores)
-        scores.append(top)
-        if u.get("hashed_id") == user_id:
-            user_score = top
-
-    scores.sort()
-    buckets: dict[int, int] = {}
-    for s in scores:
-        b = int(s // 5 * 5)
-        buckets[b] = buckets.get(b, 0) + 1
-    histogram = [{"bin": k, "count": v} for k, v in sorted(buckets.items())]
-    mean = dp_average(scores, epsilon, min_count=MIN_BUCKET_SIZE)
+    try:
+        epsilon = quantize_epsilon(epsilon)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    index = get_score_index()
+    user_score = index.best(user_id)
+    histogram = [{"bin": k, "count": v} for k, v in index.histogram()]
+    count, total = index.summary()
+    mean = dp_mean(total, count, epsilon, min_count=MIN_BUCKET_SIZE, key=("best_iq_mean",))
     percentile = None
-    if user_score is not None and scores:
-        rank = sum(1 for s in scores if s <= user_score)
-        percentile = rank / len(scores) * 100
+    if user_score is not None:
+        percentile = index.percentile(user_score)
     return {
         "histogram": histogram,
         "mean": mean,
@@ -990,40 +998,37 @@ async def dp_data_api(
         raise HTTPException(status_code=403, detail="Invalid API key")
 
     epsilon = float(os.getenv("DP_EPSILON", "1.0"))
-    scores: List[float] = []
-    users = get_all_users()
-    for user in users:
-        demo = user.get("demographic") or {}
-        if age_band and demo.get("age_band") != age_band:
-            continue
-        if gender and demo.get("gender") != gender:
-            continue
-        if income_band and demo.get("income_band") != income_band:
-            continue
-        for s in (user.get("scores") or []):
-            scores.append(s.get("iq"))
+    filters = {
+        "age_band": age_band or None,
+        "gender": gender or None,
+        "income_band": income_band or None,
+    }
+    cell = get_demographic_cube().cell(**filters)
 
-    if len(scores) < MIN_BUCKET_SIZE:
+    if cell.count < MIN_BUCKET_SIZE:
         raise HTTPException(status_code=400, detail="Not enough data")
 
-    mean = dp_average(scores, epsilon, min_count=MIN_BUCKET_SIZE)
+    mean = dp_mean(
+        cell.total,
+        cell.count,
+        epsilon,
+        min_count=MIN_BUCKET_SIZE,
+        key=("data_iq",) + query_key(**filters),
+    )
     if mean is None:
         raise HTTPException(status_code=400, detail="Not enough data")
 
-    return {"count": len(scores), "avg_iq": mean}
+    return {"count": cell.count, "avg_iq": mean}
 
 
 @app.post("/admin/update-norms", dependencies=[Depends(require_admin)])
 async def admin_update_norms():
     """Update normative distribution from stored user scores."""
 
-    scores: List[float] = []
-    users = get_all_users()
-    for user in users:
-        for s in (user.get("scores") or []):
-            scores.append(s.get("iq"))
-    update_normative_distribution(scores)
-    return {"added": len(scores)}
+    added = update_normative_distribution(
+        (iq - 100) / 15 for iq in iter_score_values()
+    )
+    return {"added": added}
 
 
 @app.get("/admin/dif-report", dependencies=[Depends(require_admin)])
@@ -4,7 +4,8 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import List
 
-from db import get_user, create_user, update_user, get_supabase
+from db import get_user, create_user, update_user, get_supabase, score_summary
+from backend.services.party_stats import get_party_aggregates, latest_parties
 
 ONE_MONTH = timedelta(days=30)
 
@@ -23,6 +24,7 @@ async def update_party_affiliation(user_id: str, party_ids: List[int]) -> None:
                 "hashed_id": user_id,
             }
         )
+    old_parties = latest_parties(user)
     log = user.get("party_log") or []
     if log:
         last = datetime.fromisoformat(log[-1]["timestamp"])
@@ -33,3 +35,4 @@ async def update_party_affiliation(user_id: str, party_ids: List[int]) -> None:
     log.append({"timestamp": datetime.utcnow().isoformat(), "party_ids": party_ids})
     supabase = get_supabase()
     update_user(supabase, user_id, {"party_log": log})
+    get_party_aggregates(fresh=False).move(old_parties, party_ids, score_summary(user))
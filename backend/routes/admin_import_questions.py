@@ -1,181 +1,83 @@
 import json
 import uuid
 import logging
+import shutil
+import tempfile
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File
 from backend.deps.supabase_client import get_supabase_client
 import asyncio
-from backend.services.openai_client import translate_with_openai
+from backend.services import import_jobs
 from .dependencies import require_admin
 
 # Supported languages for automatic translation, including Turkish and Italian
 target_languages = ["en", "tr", "ru", "zh", "ko", "es", "fr", "it", "de", "ar"]
-LANG_DISPLAY = {
-    "en": "English",
-    "tr": "Turkish",
-    "ru": "Russian",
-    "zh": "Chinese",
-    "ko": "Korean",
-    "es": "Spanish",
-    "fr": "French",
-    "it": "Italian",
-    "de": "German",
-    "ar": "Arabic",
-    "ja": "Japanese",
-}
 
 router = APIRouter(prefix="/admin", tags=["admin-questions"])
 
 logger = logging.getLogger(__name__)
 
 
-def _build_prompt(src: str, tgt: str) -> str:
-    return (
-        "You are a professional translator. "
-        "Translate the following text into {lang}. "
-        "Keep math symbols, numbers, and answer labels intact. "
-        "Return ONLY the translated text without extra commentary.\n\n"
-        f"=== SOURCE LANGUAGE TEXT ===\n{src}\n"
-    ).format(lang=LANG_DISPLAY.get(tgt, tgt))
+def _spool_upload(src, dst) -> None:
+    shutil.copyfileobj(src, dst, 1024 * 1024)
+    dst.seek(0)
 
 
-@router.post("/import_questions", dependencies=[Depends(require_admin)])
-async def import_questions(file: UploadFile = File(...)):
+def _looks_like_array(fp) -> bool:
+    head = fp.read(1024).lstrip(b"\xef\xbb\xbf \t\r\n")
+    fp.seek(0)
+    return head.startswith(b"[")
+
+
+@router.post("/import_questions", status_code=202, dependencies=[Depends(require_admin)])
+async def import_questions(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """Queue a background import of a JSON array of questions.
+
+    Returns a job id; poll ``/admin/import_jobs/{job_id}`` for progress and
+    ``/admin/import_jobs/{job_id}/errors`` for per-item failures.
+    """
     if not file:
         raise HTTPException(status_code=400, detail="File required")
-    contents = await file.read()
-    try:
-        data = json.loads(contents)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON")
-    if not isinstance(data, list):
+    # Copy to a file owned by the job; the upload is closed with the request.
+    spool = tempfile.TemporaryFile()
+    await asyncio.to_thread(_spool_upload, file.file, spool)
+    if not _looks_like_array(spool):
+        spool.close()
         raise HTTPException(status_code=400, detail="JSON must be an array")
 
-    supabase = get_supabase_client()
-    inserted = 0
-    for idx, item in enumerate(data):
-        group_id = str(uuid.uuid4())
-        if not isinstance(item, dict):
-            raise HTTPException(status_code=400, detail=f"Item {idx} must be object")
-        required = {"id", "question", "options", "answer", "irt"}
-        if not required.issubset(item):
-            raise HTTPException(status_code=400, detail=f"Missing keys in item {idx}")
-        options = item["options"]
-        if not isinstance(options, list) or len(options) != 4:
-            raise HTTPException(
-                status_code=400, detail=f"Options in item {idx} must be list of 4"
-            )
-        answer = item["answer"]
-        if not isinstance(answer, int) or answer < 0 or answer > 3:
-            raise HTTPException(
-                status_code=400, detail=f"Answer in item {idx} must be 0-3"
-            )
-        irt = item["irt"]
-        if not isinstance(irt, dict) or "a" not in irt or "b" not in irt:
-            raise HTTPException(
-                status_code=400, detail=f"IRT in item {idx} must contain a and b"
-            )
-        image_val = item.get("image")
-        if image_val is not None and not isinstance(image_val, str):
-            raise HTTPException(
-                status_code=400, detail=f"Image in item {idx} must be a string"
-            )
+    job = import_jobs.create_job(file.filename)
+    background_tasks.add_task(
+        import_jobs.run_import,
+        job,
+        spool,
+        get_supabase_client(),
+        target_languages,
+        on_done=spool.close,
+    )
+    return {"job_id": job.id, "status": job.status}
 
-        lang = item.get("lang") or item.get("language", "ja")
-        incoming_id = item["id"]
-        if not isinstance(incoming_id, (int, str)):
-            incoming_id = str(incoming_id)
 
-        record = {
-            "orig_id": incoming_id,
-            "group_id": group_id,
-            "question": item["question"],
-            "options": options,
-            "answer": answer,
-            "irt_a": irt["a"],
-            "irt_b": irt["b"],
-            "lang": lang,
-            "image_prompt": item.get("image_prompt"),
-            "image": image_val,
-        }
-        try:
-            supabase.table("questions").insert(record).execute()
-            inserted += 1
-        except Exception as exc:
-            logger.error(
-                f"Failed to insert record (lang={record['lang']}, orig_id={record['orig_id']}): {exc}"
-            )
-            continue
+def _get_job_or_404(job_id: str) -> import_jobs.ImportJob:
+    job = import_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
-        if lang == "ja":
-            base = {
-                "prompt": item["question"],
-                "options": options,
-                "answer_index": answer,
-                "explanation": item.get("explanation", ""),
-            }
-            for tgt in target_languages:
-                try:
-                    tasks = [
-                        asyncio.to_thread(
-                            translate_with_openai,
-                            _build_prompt(base["prompt"], tgt),
-                        ),
-                        *[
-                            asyncio.to_thread(
-                                translate_with_openai, _build_prompt(opt, tgt)
-                            )
-                            for opt in options
-                        ],
-                    ]
-                    if base["explanation"]:
-                        tasks.append(
-                            asyncio.to_thread(
-                                translate_with_openai,
-                                _build_prompt(base["explanation"], tgt),
-                            )
-                        )
-                    results = await asyncio.gather(*tasks)
-                    translated_prompt = results[0]
-                    translated_options = results[1 : 1 + len(options)]
-                    logger.info(
-                        "Translated orig_id=%s lang=%s len=%d",
-                        incoming_id,
-                        tgt,
-                        len(translated_prompt),
-                    )
-                except Exception as exc:
-                    logger.error(
-                        "Translation %s failed for orig_id %s: %s",
-                        tgt,
-                        incoming_id,
-                        exc,
-                        exc_info=True,
-                    )
-                    continue
 
-                trans_record = {
-                    "orig_id": incoming_id,
-                    "group_id": group_id,
-                    "question": translated_prompt,
-                    "options": translated_options,
-                    "answer": answer,
-                    "irt_a": irt["a"],
-                    "irt_b": irt["b"],
-                    "lang": tgt,
-                    "image_prompt": item.get("image_prompt"),
-                    "image": image_val,
-                }
-                try:
-                    supabase.table("questions").insert(trans_record).execute()
-                    inserted += 1
-                except Exception as exc:
-                    logger.error(
-                        f"Failed to insert record (lang={trans_record['lang']}, orig_id={trans_record['orig_id']}): {exc}"
-                    )
-                    continue
-                await asyncio.sleep(0.2)
-    return {"inserted": inserted}
+@router.get("/import_jobs/{job_id}", dependencies=[Depends(require_admin)])
+async def import_job_status(job_id: str):
+    return _get_job_or_404(job_id).summary()
+
+
+@router.get("/import_jobs/{job_id}/errors", dependencies=[Depends(require_admin)])
+async def import_job_errors(job_id: str, offset: int = 0, limit: int = 100):
+    job = _get_job_or_404(job_id)
+    limit = max(1, min(limit, import_jobs.MAX_JOB_ERRORS))
+    return {
+        "job_id": job.id,
+        "total": job.error_count,
+        "errors": job.errors[max(0, offset) : max(0, offset) + limit],
+    }
 
 
 @router.post("/import_questions_with_images", dependencies=[Depends(require_admin)])
@@ -261,29 +163,9 @@ async def import_questions_with_images(
                 }
                 for tgt in target_languages:
                     try:
-                        tasks = [
-                            asyncio.to_thread(
-                                translate_with_openai,
-                                _build_prompt(base["prompt"], tgt),
-                            ),
-                            *[
-                                asyncio.to_thread(
-                                    translate_with_openai,
-                                    _build_prompt(opt, tgt),
-                                )
-                                for opt in item["options"]
-                            ],
-                        ]
-                        if base["explanation"]:
-                            tasks.append(
-                                asyncio.to_thread(
-                                    translate_with_openai,
-                                    _build_prompt(base["explanation"], tgt),
-                                )
-                            )
-                        results = await asyncio.gather(*tasks)
-                        translated_prompt = results[0]
-                        translated_options = results[1 : 1 + len(item["options"])]
+                        translated = (await import_jobs.translate_questions([base], tgt))[0]
+                        translated_prompt = translated["prompt"]
+                        translated_options = translated["options"]
                         logger.info(
                             "Translated orig_id=%s lang=%s len=%d",
                             incoming_id,
@@ -6,6 +6,7 @@ from backend import db
 import uuid
 import logging
 from backend.services.openai_client import translate_with_openai
+from backend.services.translation_fanout import content_hash, translate_pairs
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,118 @@ def _build_prompt(src: str, tgt: str) -> str:
         "=== SOURCE LANGUAGE TEXT ===\n{src}\n"
     ).format(lang=LANG_DISPLAY.get(tgt, tgt), src=src)
 
+
+def _target_langs(lang: str) -> list[str]:
+    targets = list(SUPPORTED_LANGS)
+    if lang != "ja":
+        targets.append("ja")
+    if lang in targets:
+        targets.remove(lang)
+    return targets
+
+
+def _known_translations(
+    group_rows: list[dict], group_items: list[dict], base_id: str
+) -> dict[tuple[str, str], str]:
+    """Map ``(content_hash(source), lang)`` to translations already stored."""
+
+    base = next((r for r in group_rows if r["id"] == base_id), None)
+    if not base:
+        return {}
+    bodies: dict[str, dict] = {}
+    for it in group_items:
+        bodies.setdefault(it["survey_id"], {})[it.get("position")] = it.get("body")
+    base_bodies = bodies.get(base_id, {})
+    known: dict[tuple[str, str], str] = {}
+    for row in group_rows:
+        if row["id"] == base_id:
+            continue
+        tgt = row.get("lang")
+        row_bodies = bodies.get(row["id"], {})
+        pairs = [
+            (base.get("question_text"), row.get("question_text")),
+            (base.get("title"), row.get("title")),
+        ] + [(src, row_bodies.get(pos)) for pos, src in base_bodies.items()]
+        for src, dst in pairs:
+            if src and dst:
+                known[(content_hash(src), tgt)] = dst
+    return known
+
+
+def _insert_translations(
+    base: dict,
+    base_items: list[dict],
+    group_id: str,
+    known: dict[tuple[str, str], str] | None = None,
+) -> None:
+    """Translate ``base`` into every target language and bulk-insert the rows.
+
+    All (language, text) pairs are translated concurrently; texts found in
+    ``known`` are reused instead of being sent to the model again.
+    """
+
+    known = known or {}
+    targets = _target_langs(base["lang"])
+    texts = [base["question_text"], base.get("title") or ""] + [
+        it["body"] for it in base_items
+    ]
+    pending = [
+        (text, tgt)
+        for tgt in targets
+        for text in texts
+        if text and (content_hash(text), tgt) not in known
+    ]
+    fresh = translate_pairs(
+        pending, lambda text, tgt: translate_with_openai(_build_prompt(text, tgt))
+    )
+
+    def lookup(text: str, tgt: str) -> str | None:
+        if not text:
+            return ""
+        return known.get((content_hash(text), tgt)) or fresh.get((text, tgt))
+
+    trans_rows = []
+    options_by_lang: dict[str, list[str]] = {}
+    for tgt in targets:
+        question = lookup(base["question_text"], tgt)
+        title = lookup(base.get("title") or "", tgt)
+        options = [lookup(it["body"], tgt) for it in base_items]
+        if question is None or title is None or None in options:
+            logger.error("Translation %s failed for survey %s", tgt, group_id)
+            continue
+        trans_rows.append(
+            {
+                **base,
+                "title": title,
+                "question_text": question,
+                "options": options,
+                "lang": tgt,
+                "group_id": group_id,
+            }
+        )
+        options_by_lang[tgt] = options
+    if not trans_rows:
+        return
+
+    res = supabase_admin.table("surveys").insert(trans_rows).execute()
+    trans_items = []
+    for row in res.data or []:
+        tgt = row.get("lang")
+        for base_it, body in zip(base_items, options_by_lang.get(tgt, [])):
+            trans_items.append(
+                {
+                    "survey_id": row["id"],
+                    "position": base_it["position"],
+                    "body": body,
+                    "is_exclusive": base_it.get("is_exclusive", False),
+                    "lang": tgt,
+                    "is_active": base.get("is_active", True),
+                }
+            )
+    if trans_items:
+        supabase_admin.table("survey_items").insert(trans_items).execute()
+
+
 router = APIRouter(
     prefix="/admin/surveys",
     tags=["admin-surveys"],
@@ -132,63 +245,7 @@ def create_survey(payload: dict = Body(...)):
     if item_rows:
         supabase_admin.table("survey_items").insert(item_rows).execute()
 
-    # Determine target languages for translation
-    targets = list(SUPPORTED_LANGS)
-    if lang != "ja":
-        targets.append("ja")
-    if lang in targets:
-        targets.remove(lang)
-
-    # Prepare base texts for translation
-    base_title = row.get("title", "")
-    base_items = item_rows
-
-    for tgt in targets:
-        try:
-            translated_question = translate_with_openai(_build_prompt(question_text, tgt))
-            translated_title = (
-                translate_with_openai(_build_prompt(base_title, tgt)) if base_title else ""
-            )
-            translated_options = [
-                translate_with_openai(_build_prompt(it["body"], tgt)) for it in base_items
-            ]
-        except Exception as exc:  # pragma: no cover - network failures
-            logger.error("Translation %s failed for survey %s: %s", tgt, group_id, exc, exc_info=True)
-            continue
-
-        trans_row = {
-            "title": translated_title,
-            "question_text": translated_question,
-            "type": survey_type,
-            "options": translated_options,
-            "lang": tgt,
-            "target_countries": target_countries,
-            "target_genders": target_genders,
-            "description": payload.get("description"),
-            "is_active": is_active,
-            "status": status,
-            "user_id": payload.get("user_id"),
-            "is_single_choice": is_single_choice,
-            "group_id": group_id,
-        }
-        res_t = supabase_admin.table("surveys").insert(trans_row).execute()
-        if not (res_t.data):
-            continue
-        new_tid = res_t.data[0]["id"]
-        trans_items = []
-        for base_it, body in zip(base_items, translated_options):
-            trans_items.append(
-                {
-                    "survey_id": new_tid,
-                    "position": base_it["position"],
-                    "body": body,
-                    "is_exclusive": base_it.get("is_exclusive", False),
-                    "lang": tgt,
-                    "is_active": is_active,
-                }
-            )
-        if trans_items:
-            supabase_admin.table("survey_items").insert(trans_items).execute()
+    _insert_translations(row, item_rows, group_id)
 
     return {"id": new_id, "group_id": group_id}
 
@@ -223,8 +280,28 @@ def update_survey(survey_id: str, payload: dict = Body(...)):
     if not gid_resp.data:
         raise HTTPException(404, "survey not found")
     raw_gid = gid_resp.data[0].get("group_id")
+    group_rows: list[dict] = []
+    known: dict[tuple[str, str], str] = {}
     if raw_gid:
         group_id = str(raw_gid)
+        group_rows = (
+            supabase_admin.table("surveys")
+            .select("id,lang,title,question_text")
+            .eq("group_id", group_id)
+            .execute()
+            .data
+            or []
+        )
+        if gid_resp.data[0].get("lang") == lang and len(group_rows) > 1:
+            group_items = (
+                supabase_admin.table("survey_items")
+                .select("survey_id,position,body")
+                .in_("survey_id", [r["id"] for r in group_rows])
+                .execute()
+                .data
+                or []
+            )
+            known = _known_translations(group_rows, group_items, survey_id)
     else:
         group_id = str(uuid.uuid4())
         supabase_admin.table("surveys").update({"group_id": group_id}).eq("id", survey_id).execute()
@@ -274,78 +351,13 @@ def update_survey(survey_id: str, payload: dict = Body(...)):
     if item_rows:
         supabase_admin.table("survey_items").insert(item_rows).execute()
 
-    # Remove existing translations
-    others = (
-        supabase_admin.table("surveys")
-        .select("id,lang")
-        .eq("group_id", group_id)
-        .execute()
-        .data
-        or []
-    )
-    for row in others:
-        sid = row["id"]
-        if sid == survey_id:
-            continue
-        supabase_admin.table("survey_items").delete().eq("survey_id", sid).execute()
-        supabase_admin.table("surveys").delete().eq("id", sid).execute()
-
-    # Determine target languages for translation
-    targets = list(SUPPORTED_LANGS)
-    if lang != "ja":
-        targets.append("ja")
-    if lang in targets:
-        targets.remove(lang)
-
-    base_title = data.get("title", "")
-    base_items = item_rows
-
-    for tgt in targets:
-        try:
-            translated_question = translate_with_openai(_build_prompt(question_text, tgt))
-            translated_title = (
-                translate_with_openai(_build_prompt(base_title, tgt)) if base_title else ""
-            )
-            translated_options = [
-                translate_with_openai(_build_prompt(it["body"], tgt)) for it in base_items
-            ]
-        except Exception as exc:  # pragma: no cover
-            logger.error("Translation %s failed for survey %s: %s", tgt, group_id, exc, exc_info=True)
-            continue
+    # Replace existing translations, reusing those whose source text is unchanged
+    other_ids = [r["id"] for r in group_rows if r["id"] != survey_id]
+    if other_ids:
+        supabase_admin.table("survey_items").delete().in_("survey_id", other_ids).execute()
+        supabase_admin.table("surveys").delete().in_("id", other_ids).execute()
 
-        trans_row = {
-            "title": translated_title,
-            "question_text": translated_question,
-            "type": survey_type,
-            "options": translated_options,
-            "lang": tgt,
-            "target_countries": target_countries,
-            "target_genders": target_genders,
-            "description": payload.get("description"),
-            "is_active": is_active,
-            "status": status,
-            "user_id": payload.get("user_id"),
-            "is_single_choice": is_single_choice,
-            "group_id": group_id,
-        }
-        res_t = supabase_admin.table("surveys").insert(trans_row).execute()
-        if not (res_t.data):
-            continue
-        new_tid = res_t.data[0]["id"]
-        trans_items = []
-        for base_it, body in zip(base_items, translated_options):
-            trans_items.append(
-                {
-                    "survey_id": new_tid,
-                    "position": base_it["position"],
-                    "body": body,
-                    "is_exclusive": base_it.get("is_exclusive", False),
-                    "lang": tgt,
-                    "is_active": is_active,
-                }
-            )
-        if trans_items:
-            supabase_admin.table("survey_items").insert(trans_items).execute()
+    _insert_translations(data, item_rows, group_id, known)
 
     return {"id": survey_id, "group_id": group_id}
 
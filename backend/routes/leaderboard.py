@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Header, Query, HTTPException
 from backend.deps.supabase_client import get_supabase_client
 from backend.deps.auth import get_current_user as _get_current_user, User
 from backend.utils.num import safe_float, to_2f
-from backend.services import db_read
+from backend.services import db_read, leaderboard
 from fastapi.responses import JSONResponse
 import math
 
@@ -22,24 +22,11 @@ async def maybe_user(authorization: str = Header(None)) -> User | None:
 async def get_leaderboard(limit: int = Query(100), user: User | None = Depends(maybe_user)):
     supabase = get_supabase_client()
     limit = max(1, min(limit, 10000))
-    resp = (
-        supabase.table("leaderboard_best")
-        .select("user_id,best_iq")
-        .order("best_iq", desc=True)
-        .execute()
+    page = leaderboard.leaderboard_page(
+        supabase, limit, user.get("hashed_id") if user else None
     )
-    rows = resp.data or []
-    if not rows:
-        rows = (
-            supabase.table("user_best_iq_unified")
-            .select("user_id,best_iq")
-            .execute()
-            .data
-            or []
-        )
-        rows.sort(key=lambda r: safe_float(r.get("best_iq")) or -math.inf, reverse=True)
-    total_users = len(rows)
-    top = rows[:limit]
+    total_users = page["total_users"]
+    top = page["rows"]
 
     user_ids = [r.get("user_id") for r in top if r.get("user_id")]
     name_map: dict[str, str | None] = {}
@@ -73,13 +60,7 @@ async def get_leaderboard(limit: int = Query(100), user: User | None = Depends(m
             }
         )
 
-    my_rank = None
-    if user:
-        uid = user.get("hashed_id")
-        my_rank = next(
-            (idx + 1 for idx, r in enumerate(rows) if r.get("user_id") == uid),
-            None,
-        )
+    my_rank = page["my_rank"]
 
     payload = {"total_users": total_users, "items": items, "my_rank": my_rank}
     return JSONResponse(payload, headers=db_read.cache_headers(payload))
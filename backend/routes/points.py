@@ -37,6 +37,7 @@ async def get_points(user_id: str):
         ).data
         if not exists:
             supabase.table("app_users").upsert({"id": user_id, "hashed_id": user_id}).execute()
+            db.invalidate_user(user_id)
     except Exception:
         # Never block login on failure
         pass
@@ -1,8 +1,6 @@
 import os
-import json
 import logging
 import uuid
-from pathlib import Path
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, HTTPException, Request, Depends
@@ -10,7 +8,7 @@ from starlette.responses import RedirectResponse
 import random
 from pydantic import BaseModel
 from backend.deps.supabase_client import get_supabase_client
-from backend.db import update_user
+from backend.db import record_score, score_summary
 from backend.questions_loader import (
     get_question_sets,
     get_questions_for_set,
@@ -32,6 +30,10 @@ from backend.db import (  # noqa: E402
     spend_points,
 )
 from backend.utils.settings import get_setting_int, get_setting_bool
+from backend.services.score_index import get_score_index
+from backend.services.demographic_cube import get_demographic_cube
+from backend.services.norms import get_norms
+from backend.services.party_stats import get_party_aggregates, latest_parties
 from backend.schemas.quiz import (
     AttemptStartResponse,
     AttemptQuestionsResponse,
@@ -45,9 +47,7 @@ NUM_QUESTIONS = int(os.getenv("NUM_QUESTIONS", "20"))
 # Default quiz duration: 5 minutes unless overridden via env var
 QUIZ_DURATION_MINUTES = int(os.getenv("QUIZ_DURATION_MINUTES", "5"))
 
-_dist_path = Path(__file__).resolve().parents[1] / "data" / "normative_distribution.json"
-with _dist_path.open() as f:
-    NORMATIVE_DIST = json.load(f)
+NORMATIVE_DIST = get_norms()
 
 
 def _generate_set_id(length: int = 12) -> str:
@@ -333,20 +333,10 @@ async def submit_quiz(
     theta = estimate_theta(responses)
     iq = iq_score(theta)
     pct = percentile(theta, NORMATIVE_DIST)
+    NORMATIVE_DIST.record(theta)
     ability = ability_summary(theta)
     se = standard_error(theta, responses)
     share_url = generate_share_image(user["hashed_id"], iq, pct)
-    try:
-        supabase.from_("user_scores").insert(
-            {
-                "user_id": user["hashed_id"],
-                "session_id": payload.attempt_id,
-                "iq": iq,
-                "percentile": pct,
-            }
-        ).execute()
-    except Exception as e:  # pragma: no cover - best effort only
-        logging.getLogger(__name__).warning("Could not store user score: %s", e)
     start_time = getattr(request.app.state, "session_started", {}).get(payload.attempt_id)
     duration = None
     if start_time:
@@ -365,15 +355,11 @@ async def submit_quiz(
     except Exception:  # pragma: no cover - best effort only
         pass
     try:
-        scores = (user.get("scores") or []) + [
-            {
-                "iq": iq,
-                "percentile": pct,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-        ]
-        plays = (user.get("plays") or 0) + 1
-        update_user(supabase, user["hashed_id"], {"scores": scores, "plays": plays})
+        summary = record_score(supabase, user, iq, pct, session_id=payload.attempt_id)
+        get_demographic_cube(fresh=False).add(user.get("demographic"), iq)
+        get_party_aggregates(fresh=False).record_score(
+            latest_parties(user), score_summary(user), summary
+        )
     except Exception as e:  # pragma: no cover - best effort only
         logging.getLogger(__name__).warning("Could not update user record: %s", e)
 
@@ -402,6 +388,7 @@ async def submit_quiz(
             ).execute()
     except Exception:  # pragma: no cover - best effort only
         pass
+    get_score_index(fresh=False).record(user["hashed_id"], iq)
 
     if payload.surveys:
         rows = [
@@ -1,3 +1,5 @@
+import os
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from backend.db import get_supabase, with_retries
@@ -6,6 +8,9 @@ from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
+ANSWER_PAGE_SIZE = int(os.getenv("SURVEY_ANSWER_PAGE_SIZE", "1000"))
+BEST_IQ_LOOKUP_BATCH = 200
+
 
 class SurveyOptionAvg(BaseModel):
     option_index: int
@@ -21,6 +26,79 @@ class SurveyStatsResponse(BaseModel):
     items: list[SurveyOptionAvg]
 
 
+def _answer_pages(supabase, survey_id: str):
+    """Yield the survey's answers in ``id``-ordered pages."""
+
+    last_id = None
+    while True:
+        query = (
+            supabase.table("survey_answers")
+            .select("id,user_id,survey_item_id")
+            .eq("survey_id", survey_id)
+            .order("id")
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        page = with_retries(lambda: query.limit(ANSWER_PAGE_SIZE).execute().data or [])
+        if page:
+            yield page
+        if len(page) < ANSWER_PAGE_SIZE:
+            return
+        last_id = page[-1]["id"]
+
+
+def _best_iq_for(supabase, user_ids: list[str]) -> dict[str, float]:
+    """Best IQ for ``user_ids`` from the materialized view, then the live one."""
+
+    found: dict[str, float] = {}
+    for view in ("m_user_best_iq", "user_best_iq_unified"):
+        pending = [u for u in user_ids if u not in found]
+        # Keep each ``in.(...)`` filter short enough for a request URL.
+        for i in range(0, len(pending), BEST_IQ_LOOKUP_BATCH):
+            batch = pending[i : i + BEST_IQ_LOOKUP_BATCH]
+            best_rows = with_retries(
+                lambda: supabase.table(view)
+                .select("user_id,best_iq")
+                .in_("user_id", batch)
+                .execute()
+                .data
+                or []
+            )
+            for r in best_rows:
+                if r.get("user_id") and r.get("best_iq") is not None:
+                    found[r["user_id"]] = float(r["best_iq"])
+    return found
+
+
+def _iq_by_item_from_answers(supabase, survey_id: str) -> list[dict]:
+    """Aggregate best IQ per survey item when the stats view has no rows.
+
+    Only users who answered the survey are looked up, one page of answers at
+    a time, so the cost follows the survey's answer count rather than the
+    size of the user base.
+    """
+
+    best: dict[str, float | None] = {}
+    sums: dict[str, float] = {}
+    counts: dict[str, int] = {}
+    for page in _answer_pages(supabase, survey_id):
+        new_ids = list({a["user_id"] for a in page if a.get("user_id") and a["user_id"] not in best})
+        if new_ids:
+            found = _best_iq_for(supabase, new_ids)
+            best.update({uid: found.get(uid) for uid in new_ids})
+        for a in page:
+            iq = best.get(a.get("user_id"))
+            item_id = a.get("survey_item_id")
+            if iq is None or not item_id:
+                continue
+            sums[item_id] = sums.get(item_id, 0.0) + iq
+            counts[item_id] = counts.get(item_id, 0) + 1
+    return [
+        {"survey_item_id": k, "responses_count": n, "avg_iq": sums[k] / n}
+        for k, n in counts.items()
+    ]
+
+
 @router.get("/surveys/{survey_id}/iq_by_option", response_model=SurveyStatsResponse)
 def survey_iq_by_option(survey_id: str):
     supabase = get_supabase()
@@ -43,42 +121,7 @@ def survey_iq_by_option(survey_id: str):
         or []
     )
     if not rows:
-        best_rows = (
-            supabase.table("m_user_best_iq")
-            .select("user_id,best_iq")
-            .execute()
-            .data
-            or []
-        )
-        if not best_rows:
-            best_rows = (
-                supabase.table("user_best_iq_unified")
-                .select("user_id,best_iq")
-                .execute()
-                .data
-                or []
-            )
-        best_map: dict[str, float] = {
-            r["user_id"]: float(r["best_iq"]) for r in best_rows if r.get("user_id") and r.get("best_iq") is not None
-        }
-        ans = (
-            supabase.table("survey_answers")
-            .select("user_id,survey_item_id")
-            .eq("survey_id", survey_id)
-            .execute()
-            .data
-            or []
-        )
-        buckets: dict[str, list[float]] = {}
-        for a in ans:
-            uid = a.get("user_id")
-            item_id = a.get("survey_item_id")
-            if uid in best_map and item_id:
-                buckets.setdefault(item_id, []).append(best_map[uid])
-        rows = [
-            {"survey_item_id": k, "responses_count": len(v), "avg_iq": (sum(v) / len(v) if v else None)}
-            for k, v in buckets.items()
-        ]
+        rows = _iq_by_item_from_answers(supabase, survey_id)
     stat_map = {r["survey_item_id"]: r for r in rows}
     resp_items: list[SurveyOptionAvg] = []
     for it in items:
@@ -13,6 +13,7 @@ from backend.deps.auth import get_current_user
 from backend.deps.supabase_client import get_supabase_client
 from backend.utils.settings import get_setting_int
 from backend import db
+from backend.services.view_refresh import note_stats_write
 
 
 router = APIRouter(prefix="/surveys", tags=["surveys"])
@@ -150,6 +151,7 @@ def respond(
     except TypeError:
         # Test double lacks upsert kwargs support
         supabase.table("survey_answers").upsert(answer_rows).execute()
+    note_stats_write(len(answer_rows))
     return Response(status_code=201)
 
 
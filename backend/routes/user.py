@@ -1,3 +1,8 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
 from fastapi import APIRouter, HTTPException, Depends, Response
 from pydantic import BaseModel
 from backend.deps.supabase_client import get_supabase_client
@@ -63,30 +68,66 @@ async def get_credits(user: dict = Depends(get_current_user)):
     }
 
 
+HISTORY_STATUSES = ("submitted", "timeout", "abandoned")
+HISTORY_COLUMNS = "id,created_at,set_id,iq_score,percentile,duration"
+MAX_HISTORY_PAGE_SIZE = 100
+
+
+def _encode_cursor(row: dict) -> str:
+    raw = json.dumps([row.get("created_at"), row.get("id")], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, attempt_id = json.loads(base64.urlsafe_b64decode(padded))
+        datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        attempt_id = str(uuid.UUID(attempt_id))
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, attempt_id
+
+
 @router.get("/history")
 async def get_history(
     page: int = 1,
     page_size: int = 20,
+    cursor: str | None = None,
     user: dict = Depends(get_current_user),
 ):
+    """Return finished attempts, newest first, one page at a time.
+
+    Pages are keyed on ``(created_at, id)``: pass the returned ``next_cursor``
+    to get the following page. ``page`` is still accepted for old clients but
+    is only used when no cursor is given.
+    """
     supabase = get_supabase_client()
-    rows = (
+    page_size = max(1, min(page_size, MAX_HISTORY_PAGE_SIZE))
+    query = (
         supabase.table("quiz_attempts")
-        .select("*")
+        .select(HISTORY_COLUMNS)
         .eq("user_id", user.get("hashed_id"))
+        .in_("status", list(HISTORY_STATUSES))
+    )
+    if cursor:
+        created_at, attempt_id = _decode_cursor(cursor)
+        # (created_at, id) < cursor, written so the index range scan on
+        # created_at still applies.
+        query = query.lte("created_at", created_at).or_(
+            f'created_at.lt."{created_at}",id.lt."{attempt_id}"'
+        )
+    elif page > 1:
+        query = query.offset((page - 1) * page_size)
+    rows = (
+        query.order("created_at", desc=True)
+        .order("id", desc=True)
+        .limit(page_size + 1)
         .execute()
         .data
         or []
     )
-    rows = [
-        r
-        for r in rows
-        if r.get("status") in {"submitted", "timeout", "abandoned"}
-    ]
-    rows.sort(key=lambda r: r.get("created_at") or "", reverse=True)
-    start = (page - 1) * page_size
-    end = start + page_size
-    sliced = rows[start:end]
+    next_cursor = _encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
     attempts = [
         {
             "date": r.get("created_at"),
@@ -95,7 +136,6 @@ async def get_history(
             "percentile": r.get("percentile"),
             "duration": r.get("duration"),
         }
-        for r in sliced
+        for r in rows[:page_size]
     ]
-    return {"attempts": attempts}
-
+    return {"attempts": attempts, "next_cursor": next_cursor}
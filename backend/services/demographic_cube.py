@@ -0,0 +1,149 @@
+"""Pre-aggregated IQ statistics per demographic cell for the ``/data/iq`` API.
+
+Every score is added to ``(count, sum, sum of squares)`` counters for its
+``(age_band, gender, income_band)`` cell and for each roll-up of that cell
+(any subset of dimensions replaced by :data:`ANY`). A query for any
+combination of filters is therefore a single dictionary lookup. Submits
+update the cube as they happen and it is periodically rebuilt from each
+user's ``app_users.score_summary`` so demographic edits and other workers'
+writes are picked up.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from backend import db
+from backend.utils.cache import PeriodicRebuild
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ("age_band", "gender", "income_band")
+# Placeholder for a rolled-up dimension. Users who left a field blank are
+# stored under ``None``, which stays distinct from "any value".
+ANY = "*"
+DEMOGRAPHIC_CUBE_REBUILD_SECONDS = float(os.getenv("DEMOGRAPHIC_CUBE_REBUILD_SECONDS", "300"))
+
+_ROLLUPS = list(itertools.product((True, False), repeat=len(DIMENSIONS)))
+
+
+@dataclass
+class Cell:
+    count: int = 0
+    total: float = 0.0
+    total_sq: float = 0.0
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    @property
+    def variance(self) -> Optional[float]:
+        if not self.count:
+            return None
+        mean = self.total / self.count
+        return max(self.total_sq / self.count - mean * mean, 0.0)
+
+
+def _cell_key(demographic: Mapping[str, Any]) -> Tuple[Any, ...]:
+    return tuple(demographic.get(d) for d in DIMENSIONS)
+
+
+def query_key(**filters: Optional[str]) -> Tuple[str, ...]:
+    """Return the cube key for ``filters``; omitted or ``None`` means any."""
+
+    unknown = set(filters) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown dimensions: {sorted(unknown)}")
+    return tuple(ANY if filters.get(d) is None else filters[d] for d in DIMENSIONS)
+
+
+class DemographicCube:
+    """``Cell`` counters for every demographic cell and all of its roll-ups."""
+
+    def __init__(self):
+        self._cells: Dict[Tuple[Any, ...], Cell] = {}
+        self._lock = threading.Lock()
+        self._schedule = PeriodicRebuild(
+            self.rebuild, DEMOGRAPHIC_CUBE_REBUILD_SECONDS, "demographic-cube-rebuild"
+        )
+
+    @staticmethod
+    def _add(cells: Dict[Tuple[Any, ...], Cell], key: Tuple[Any, ...], part: Cell) -> None:
+        for keep in _ROLLUPS:
+            rolled = tuple(v if k else ANY for v, k in zip(key, keep))
+            cell = cells.get(rolled)
+            if cell is None:
+                cell = cells[rolled] = Cell()
+            cell.count += part.count
+            cell.total += part.total
+            cell.total_sq += part.total_sq
+
+    def add(self, demographic: Optional[Mapping[str, Any]], score: float) -> None:
+        """Count one ``score`` for a user with ``demographic``."""
+
+        score = float(score)
+        key = _cell_key(demographic or {})
+        with self._lock:
+            self._add(self._cells, key, Cell(1, score, score * score))
+
+    def replace(self, rows: Iterable[Tuple[Optional[Mapping[str, Any]], Cell]]) -> None:
+        """Rebuild the cube from ``(demographic, cell)`` pairs, one per user."""
+
+        cells: Dict[Tuple[Any, ...], Cell] = {}
+        for demographic, part in rows:
+            self._add(cells, _cell_key(demographic or {}), part)
+        with self._lock:
+            self._cells = cells
+
+    def cell(self, **filters: Optional[str]) -> Cell:
+        """Return the counters for ``filters``; see :func:`query_key`."""
+
+        key = query_key(**filters)
+        with self._lock:
+            cell = self._cells.get(key)
+            return Cell(cell.count, cell.total, cell.total_sq) if cell else Cell()
+
+    def rebuild(self) -> bool:
+        """Re-add every user's score summary, keeping the cube on failure.
+
+        A score submitted while the table is being read may be missing until
+        the next rebuild; replaying it could count it twice.
+        """
+
+        try:
+            rows = []
+            for user in db.iter_users("demographic,score_summary,scores"):
+                summary = db.score_summary(user)
+                if summary:
+                    part = Cell(summary["count"], summary["sum"], summary["sum_sq"])
+                    rows.append((user.get("demographic"), part))
+        except Exception as exc:
+            logger.warning("demographic cube rebuild failed: %s", exc)
+            return False
+        self.replace(rows)
+        return True
+
+    def ensure_fresh(self) -> None:
+        self._schedule.ensure_fresh()
+
+
+_cube: Optional[DemographicCube] = None
+_cube_lock = threading.Lock()
+
+
+def get_demographic_cube(fresh: bool = True) -> DemographicCube:
+    """Return the process-wide cube, loading or refreshing it if ``fresh``."""
+
+    global _cube
+    with _cube_lock:
+        if _cube is None:
+            _cube = DemographicCube()
+    if fresh:
+        _cube.ensure_fresh()
+    return _cube
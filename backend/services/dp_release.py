@@ -0,0 +1,134 @@
+"""Cached differentially private releases.
+
+A noisy answer is drawn once per ``(query key, epsilon, data version)`` and
+served from memory afterwards, so repeating a query costs no work and cannot
+be used to average the noise away. ``version`` identifies the data behind
+the answer; callers here pass the exact aggregate ``(count, total)``, so a
+release is redrawn exactly when its inputs change.
+
+Requested epsilons are rounded down to the nearest value in
+``DP_ALLOWED_EPSILONS``, so a caller cannot get fresh noise by nudging a
+query-string epsilon; values below the smallest allowed one are rejected.
+Each fresh release spends its epsilon against the query key. Once a key has
+spent ``DP_KEY_EPSILON_BUDGET`` (``0`` disables the limit) it keeps serving
+its latest release instead of drawing new noise. At most
+``DP_RELEASE_CACHE_SIZE`` releases are kept, least recently used first out.
+Releases and budgets are per process.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from backend.dp import laplace_noises
+from backend.utils.cache import TTLCache
+
+DP_KEY_EPSILON_BUDGET = float(os.getenv("DP_KEY_EPSILON_BUDGET", "0"))
+DP_ALLOWED_EPSILONS = tuple(
+    sorted(
+        float(e) for e in os.getenv("DP_ALLOWED_EPSILONS", "0.1,0.5,1,2").split(",") if e.strip()
+    )
+)
+DP_RELEASE_CACHE_SIZE = int(os.getenv("DP_RELEASE_CACHE_SIZE", "4096"))
+
+# (query key, data version, true value, sensitivity)
+Query = Tuple[Hashable, Hashable, float, float]
+
+
+@dataclass
+class Release:
+    value: float
+    version: Hashable
+    epsilon: float
+
+
+def quantize_epsilon(epsilon: float, allowed: Sequence[float] = DP_ALLOWED_EPSILONS) -> float:
+    """Round ``epsilon`` down to the nearest allowed value.
+
+    Rounding down never weakens the requested privacy. Raises ``ValueError``
+    when ``epsilon`` is below every allowed value.
+    """
+
+    chosen = None
+    for value in allowed:
+        if value <= epsilon:
+            chosen = value
+    if chosen is None:
+        raise ValueError(f"epsilon must be at least {min(allowed)}")
+    return chosen
+
+
+class DPReleaseStore:
+    """Noisy releases and epsilon spent, per query key."""
+
+    def __init__(
+        self,
+        budget: float = DP_KEY_EPSILON_BUDGET,
+        allowed_epsilons: Sequence[float] = DP_ALLOWED_EPSILONS,
+        max_releases: int = DP_RELEASE_CACHE_SIZE,
+    ):
+        self.budget = budget
+        self.allowed_epsilons = tuple(sorted(allowed_epsilons))
+        self._releases = TTLCache(maxsize=max_releases)
+        self._latest: Dict[Hashable, Release] = {}
+        self._spent: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def spent(self, key: Hashable) -> float:
+        with self._lock:
+            return self._spent.get(key, 0.0)
+
+    def release_many(self, queries: Sequence[Query], epsilon: float) -> List[Optional[float]]:
+        """Return a noisy value per query, drawing noise only for new versions.
+
+        ``epsilon`` is rounded down with :func:`quantize_epsilon`. ``None``
+        means the key's budget cannot cover even one release.
+        """
+
+        epsilon = quantize_epsilon(epsilon, self.allowed_epsilons)
+        out: List[Optional[float]] = [None] * len(queries)
+        with self._lock:
+            fresh = []
+            for i, (key, version, _, _) in enumerate(queries):
+                cached = self._releases.get((key, epsilon))
+                if cached is not None and cached.version == version:
+                    out[i] = cached.value
+                elif self.budget and self._spent.get(key, 0.0) + epsilon > self.budget:
+                    latest = self._latest.get(key)
+                    out[i] = latest.value if latest else None
+                else:
+                    fresh.append(i)
+            noise = laplace_noises([queries[i][3] / epsilon for i in fresh])
+            for i, n in zip(fresh, noise):
+                key, version, value, _ = queries[i]
+                release = Release(value + n, version, epsilon)
+                self._releases.set((key, epsilon), release)
+                self._latest[key] = release
+                self._spent[key] = self._spent.get(key, 0.0) + epsilon
+                out[i] = release.value
+        return out
+
+    def release(
+        self,
+        key: Hashable,
+        version: Hashable,
+        value: float,
+        epsilon: float,
+        sensitivity: float = 1.0,
+    ) -> Optional[float]:
+        return self.release_many([(key, version, value, sensitivity)], epsilon)[0]
+
+
+_store: Optional[DPReleaseStore] = None
+_store_lock = threading.Lock()
+
+
+def get_dp_releases() -> DPReleaseStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DPReleaseStore()
+        return _store
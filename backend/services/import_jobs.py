@@ -0,0 +1,406 @@
+"""Background jobs for bulk question imports.
+
+Uploads are parsed incrementally, validated and inserted in chunks of
+``IMPORT_CHUNK_SIZE`` rows while a bounded pool of workers translates each
+inserted Japanese chunk into the target languages. Job state lives in process
+memory, so progress is only visible from the worker that accepted the upload.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import translator
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "200"))
+IMPORT_TRANSLATION_WORKERS = int(os.getenv("IMPORT_TRANSLATION_WORKERS", "4"))
+# Finished jobs kept for status queries before the oldest are dropped.
+IMPORT_JOB_HISTORY = int(os.getenv("IMPORT_JOB_HISTORY", "50"))
+# Per-job cap on stored error entries; the total is still counted.
+MAX_JOB_ERRORS = 1000
+# Same model as the other admin translation paths (``translate_with_openai``).
+IMPORT_TRANSLATION_MODEL = os.getenv("OPENAI_TRANSLATION_MODEL", "gpt-5-mini")
+
+LANG_DISPLAY = {
+    "en": "English",
+    "tr": "Turkish",
+    "ru": "Russian",
+    "zh": "Chinese",
+    "ko": "Korean",
+    "es": "Spanish",
+    "fr": "French",
+    "it": "Italian",
+    "de": "German",
+    "ar": "Arabic",
+    "ja": "Japanese",
+}
+
+_READ_SIZE = 64 * 1024
+_WHITESPACE = " \t\r\n"
+
+
+class ImportFormatError(ValueError):
+    """Raised when the upload is not a well-formed JSON array."""
+
+
+def iter_json_array(fp: BinaryIO, read_size: int = _READ_SIZE) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array read from ``fp``.
+
+    Only one element plus one read buffer is held in memory at a time.
+    """
+
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = fp.read(read_size)
+        if not chunk:
+            eof = True
+            buf = buf[pos:] + utf8.decode(b"", final=True)
+        else:
+            buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+        return True
+
+    def skip_ws() -> Optional[str]:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return None
+
+    if skip_ws() != "[":
+        raise ImportFormatError("JSON must be an array")
+    pos += 1
+    count = 0
+    while True:
+        ch = skip_ws()
+        if ch is None:
+            raise ImportFormatError("Unterminated JSON array")
+        if ch == "]":
+            return
+        if count:
+            if ch != ",":
+                raise ImportFormatError(f"Expected ',' after element {count - 1}")
+            pos += 1
+            if skip_ws() is None:
+                raise ImportFormatError("Unterminated JSON array")
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as exc:
+                if fill():
+                    continue
+                raise ImportFormatError(f"Invalid JSON: {exc.msg}") from exc
+            # A scalar ending exactly at the buffer edge may continue in the
+            # next read, so only accept it once more input has been seen.
+            if end == len(buf) and not eof and fill():
+                continue
+            break
+        pos = end
+        count += 1
+        yield value
+
+
+def validate_item(idx: int, item: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Return ``(record, None)`` for a valid item or ``(None, error)``."""
+
+    if not isinstance(item, dict):
+        return None, f"Item {idx} must be object"
+    required = {"id", "question", "options", "answer", "irt"}
+    if not required.issubset(item):
+        return None, f"Missing keys in item {idx}"
+    options = item["options"]
+    if not isinstance(options, list) or len(options) != 4:
+        return None, f"Options in item {idx} must be list of 4"
+    answer = item["answer"]
+    if not isinstance(answer, int) or answer < 0 or answer > 3:
+        return None, f"Answer in item {idx} must be 0-3"
+    irt = item["irt"]
+    if not isinstance(irt, dict) or "a" not in irt or "b" not in irt:
+        return None, f"IRT in item {idx} must contain a and b"
+    image_val = item.get("image")
+    if image_val is not None and not isinstance(image_val, str):
+        return None, f"Image in item {idx} must be a string"
+
+    incoming_id = item["id"]
+    if not isinstance(incoming_id, (int, str)):
+        incoming_id = str(incoming_id)
+    return {
+        "orig_id": incoming_id,
+        "group_id": str(uuid.uuid4()),
+        "question": item["question"],
+        "options": options,
+        "answer": answer,
+        "irt_a": irt["a"],
+        "irt_b": irt["b"],
+        "lang": item.get("lang") or item.get("language", "ja"),
+        "image_prompt": item.get("image_prompt"),
+        "image": image_val,
+    }, None
+
+
+class ImportJob:
+    """Progress of one import, safe to read while the job is running."""
+
+    def __init__(self, filename: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = "queued"
+        self.parsed = 0
+        self.inserted = 0
+        self.translated = 0
+        self.pending_translations = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add_error(self, message: str, item: Optional[int] = None, **extra: Any) -> None:
+        with self._lock:
+            self.error_count += 1
+            if len(self.errors) < MAX_JOB_ERRORS:
+                self.errors.append({"item": item, "error": message, **extra})
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "parsed": self.parsed,
+            "inserted": self.inserted,
+            "translated": self.translated,
+            "pending_translations": self.pending_translations,
+            "errors": self.error_count,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_jobs: Dict[str, ImportJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def create_job(filename: Optional[str] = None) -> ImportJob:
+    job = ImportJob(filename)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        finished = [j for j in _jobs.values() if j.finished_at is not None]
+        finished.sort(key=lambda j: j.finished_at or 0)
+        for old in finished[: max(0, len(finished) - IMPORT_JOB_HISTORY)]:
+            _jobs.pop(old.id, None)
+    return job
+
+
+def get_job(job_id: str) -> Optional[ImportJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def _insert_rows(supabase, job: ImportJob, rows: List[Dict[str, Any]], items: List[int]) -> List[int]:
+    """Insert ``rows`` in one call, isolating failures row by row.
+
+    Returns the positions in ``rows`` that were stored.
+    """
+
+    if not rows:
+        return []
+    try:
+        supabase.table("questions").insert(rows).execute()
+        return list(range(len(rows)))
+    except Exception as exc:
+        logger.warning("Chunk insert of %d questions failed, retrying per row: %s", len(rows), exc)
+    stored = []
+    for i, row in enumerate(rows):
+        try:
+            supabase.table("questions").insert(row).execute()
+            stored.append(i)
+        except Exception as exc:
+            logger.error(
+                "Failed to insert record (lang=%s, orig_id=%s): %s",
+                row["lang"],
+                row["orig_id"],
+                exc,
+            )
+            job.add_error(str(exc), item=items[i], lang=row["lang"])
+    return stored
+
+
+def translation_hint(tgt: str) -> str:
+    return (
+        "You are a professional translator. "
+        f"Translate the following into {LANG_DISPLAY.get(tgt, tgt)}. "
+        "Keep math symbols, numbers, and answer labels intact."
+    )
+
+
+async def translate_questions(questions: List[Dict[str, Any]], tgt: str) -> List[Dict[str, Any]]:
+    """Translate Japanese ``questions`` into ``tgt`` the way every import does.
+
+    Both import endpoints go through here so the same content gets the same
+    model, prompt and translation cache entries.
+    """
+
+    return await translator.translate_batch(
+        questions,
+        "ja",
+        tgt,
+        model=IMPORT_TRANSLATION_MODEL,
+        system_hint=translation_hint(tgt),
+    )
+
+
+async def _translate_chunk(
+    supabase,
+    job: ImportJob,
+    rows: List[Dict[str, Any]],
+    items: List[int],
+    explanations: List[str],
+    tgt: str,
+) -> None:
+    questions = [
+        {
+            "prompt": r["question"],
+            "options": r["options"],
+            "answer_index": r["answer"],
+            "explanation": e,
+        }
+        for r, e in zip(rows, explanations)
+    ]
+    try:
+        translated = await translate_questions(questions, tgt)
+    except Exception as exc:
+        logger.error("Translation %s failed for %d questions: %s", tgt, len(rows), exc, exc_info=True)
+        for i in items:
+            job.add_error(f"Translation failed: {exc}", item=i, lang=tgt)
+        return
+
+    out_rows, out_items = [], []
+    for row, idx, tr in zip(rows, items, translated):
+        if not tr.get("prompt") or len(tr.get("options") or []) != len(row["options"]):
+            job.add_error("Translation incomplete", item=idx, lang=tgt)
+            continue
+        out_rows.append(
+            {**row, "question": tr["prompt"], "options": tr["options"], "lang": tgt}
+        )
+        out_items.append(idx)
+    stored = await asyncio.to_thread(_insert_rows, supabase, job, out_rows, out_items)
+    job.inserted += len(stored)
+    job.translated += len(stored)
+
+
+async def run_import(
+    job: ImportJob,
+    fp: BinaryIO,
+    supabase,
+    target_languages: List[str],
+    *,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    on_done: Optional[Callable[[], None]] = None,
+) -> ImportJob:
+    """Stream ``fp`` into the ``questions`` table, updating ``job`` as it goes."""
+
+    size = max(1, chunk_size or IMPORT_CHUNK_SIZE)
+    n_workers = max(1, workers or IMPORT_TRANSLATION_WORKERS)
+    # Bounded so parsing pauses instead of queueing the whole file in memory.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=n_workers * 2)
+
+    async def worker() -> None:
+        while True:
+            task = await queue.get()
+            if task is None:
+                return
+            try:
+                await _translate_chunk(supabase, job, *task)
+            finally:
+                job.pending_translations -= 1
+
+    async def flush(batch: List[Tuple[int, Dict[str, Any], str]]) -> None:
+        items = [b[0] for b in batch]
+        rows = [b[1] for b in batch]
+        stored = await asyncio.to_thread(_insert_rows, supabase, job, rows, items)
+        job.inserted += len(stored)
+        ja = [batch[i] for i in stored if rows[i]["lang"] == "ja"]
+        if not ja:
+            return
+        for tgt in target_languages:
+            job.pending_translations += 1
+            await queue.put(
+                ([b[1] for b in ja], [b[0] for b in ja], [b[2] for b in ja], tgt)
+            )
+
+    job.status = "running"
+    pool = [asyncio.create_task(worker()) for _ in range(n_workers)]
+    failed = False
+    try:
+        elements = iter_json_array(fp)
+        while True:
+            # Parsing reads from disk, so pull a chunk at a time off the loop.
+            try:
+                raw = await asyncio.to_thread(_take, elements, size)
+            except ImportFormatError as exc:
+                job.add_error(str(exc), item=job.parsed)
+                failed = True
+                break
+            batch: List[Tuple[int, Dict[str, Any], str]] = []
+            for item in raw:
+                idx = job.parsed
+                job.parsed += 1
+                record, error = validate_item(idx, item)
+                if error:
+                    job.add_error(error, item=idx)
+                    continue
+                batch.append((idx, record, item.get("explanation", "") or ""))
+            if batch:
+                await flush(batch)
+            if len(raw) < size:
+                break
+        # Let already inserted chunks finish translating before reporting.
+        for _ in pool:
+            await queue.put(None)
+        await asyncio.gather(*pool)
+    except Exception as exc:  # pragma: no cover - unexpected failures
+        logger.exception("Import job %s failed", job.id)
+        job.add_error(str(exc))
+        failed = True
+        for task in pool:
+            task.cancel()
+    finally:
+        if failed:
+            job.status = "failed"
+        else:
+            job.status = "completed_with_errors" if job.error_count else "completed"
+        job.finished_at = time.time()
+        if on_done:
+            on_done()
+    return job
+
+
+def _take(elements: Iterator[Any], n: int) -> List[Any]:
+    out = []
+    for value in elements:
+        out.append(value)
+        if len(out) >= n:
+            break
+    return out
@@ -0,0 +1,126 @@
+"""Bounded leaderboard queries.
+
+The page is built from three independent reads so the payload depends on the
+requested ``limit`` only: the top ``limit`` rows, the number of ranked
+players, and the caller's rank. When the ``leaderboard_page`` database
+function is deployed all three come back in one round trip; otherwise each is
+a bounded PostgREST query (``order``/``limit``, ``count=exact`` and a count
+of players ranked above the caller). Both paths skip null scores and break
+ties by ``user_id``, so ranks and page boundaries do not depend on whether
+the function is deployed.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional
+
+from backend.db import rpc_missing
+from backend.utils.num import safe_float
+
+PRIMARY_SOURCE = "leaderboard_best"
+FALLBACK_SOURCE = "user_best_iq_unified"
+
+
+def _top(supabase, source: str, limit: int) -> List[Dict[str, Any]]:
+    return (
+        supabase.table(source)
+        .select("user_id,best_iq")
+        .not_.is_("best_iq", "null")
+        .order("best_iq", desc=True)
+        .order("user_id")
+        .limit(limit)
+        .execute()
+        .data
+        or []
+    )
+
+
+def _count(supabase, source: str) -> int:
+    resp = (
+        supabase.table(source)
+        .select("user_id", count="exact")
+        .not_.is_("best_iq", "null")
+        .limit(1)
+        .execute()
+    )
+    if resp.count is not None:
+        return resp.count
+    return len(resp.data or [])
+
+
+def _rank_of(supabase, source: str, user_id: str) -> Optional[int]:
+    """Return ``1 +`` the number of players ranked above ``user_id``.
+
+    A player ranks above when their best score is higher, or equal with a
+    smaller ``user_id``.
+    """
+
+    row = (
+        supabase.table(source)
+        .select("best_iq")
+        .eq("user_id", user_id)
+        .limit(1)
+        .execute()
+        .data
+        or []
+    )
+    best = safe_float(row[0].get("best_iq")) if row else None
+    if best is None or not math.isfinite(best):
+        return None
+    resp = (
+        supabase.table(source)
+        .select("user_id", count="exact")
+        .gte("best_iq", best)
+        .or_(f'best_iq.gt.{best},user_id.lt."{user_id}"')
+        .limit(1)
+        .execute()
+    )
+    above = resp.count if resp.count is not None else len(resp.data or [])
+    return above + 1
+
+
+def _page_rpc(supabase, limit: int, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    try:
+        res = supabase.rpc(
+            "leaderboard_page", {"p_limit": limit, "p_user_id": user_id}
+        ).execute()
+    except Exception as exc:
+        if rpc_missing(exc):
+            return None
+        raise
+    data = res.data
+    if isinstance(data, list):
+        data = data[0] if data else None
+    if not isinstance(data, dict):
+        return None
+    return {
+        "rows": data.get("items") or [],
+        "total_users": int(data.get("total_users") or 0),
+        "my_rank": data.get("my_rank"),
+    }
+
+
+def leaderboard_page(supabase, limit: int, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """Return ``{"rows", "total_users", "my_rank"}`` for the top ``limit`` players.
+
+    ``rows`` are ``{"user_id", "best_iq"}`` dicts ordered best first.
+    """
+
+    page = _page_rpc(supabase, limit, user_id)
+    if page is not None:
+        return page
+    source = PRIMARY_SOURCE
+    rows = _top(supabase, source, limit)
+    if not rows:
+        source = FALLBACK_SOURCE
+        rows = _top(supabase, source, limit)
+    my_rank = None
+    if user_id:
+        # The list uses the same order as _rank_of, so a visible position
+        # saves the count queries.
+        my_rank = next(
+            (i for i, r in enumerate(rows, start=1) if r.get("user_id") == user_id),
+            None,
+        ) or _rank_of(supabase, source, user_id)
+    return {"rows": rows, "total_users": _count(supabase, source), "my_rank": my_rank}
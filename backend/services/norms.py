@@ -0,0 +1,212 @@
+"""Normative ability distribution kept as a mergeable fixed-width sketch.
+
+Percentiles are computed against every theta ever scored rather than a
+rolling window. Thetas are counted in ``NORMS_BIN_WIDTH`` bins over
+``[-NORMS_THETA_LIMIT, NORMS_THETA_LIMIT]``: a few hundred integers cover any
+number of scores, rank error is bounded by one bin (0.15 IQ points at the
+default width), and two sketches merge by adding counts.
+
+Each worker records submits into its in-memory view and a pending delta. The
+delta is merged into ``NORMS_SKETCH_PATH`` under a file lock every
+``NORMS_FLUSH_SECONDS``, and the merged file then becomes the worker's view,
+so workers pick up each other's scores. An empty path keeps the sketch in
+memory only.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+NORMS_SKETCH_PATH = os.getenv("NORMS_SKETCH_PATH", str(_DATA_DIR / "normative_sketch.json"))
+NORMS_FLUSH_SECONDS = float(os.getenv("NORMS_FLUSH_SECONDS", "60"))
+NORMS_BIN_WIDTH = 0.01
+NORMS_THETA_LIMIT = 6.0
+# Raw theta samples used to seed the sketch the first time it is created.
+LEGACY_DISTRIBUTION_PATH = _DATA_DIR / "normative_distribution.json"
+
+
+class NormSketch:
+    """Counts of values per fixed-width bin with rank and percentile lookups."""
+
+    def __init__(self, width: float = NORMS_BIN_WIDTH, counts: Optional[Dict[int, int]] = None):
+        self.width = width
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.total = sum(self.counts.values())
+        self._keys: Optional[List[int]] = None
+        self._cumulative: List[int] = []
+
+    def _bin(self, value: float) -> int:
+        value = min(max(value, -NORMS_THETA_LIMIT), NORMS_THETA_LIMIT)
+        return math.floor(value / self.width)
+
+    def add(self, value: float, n: int = 1) -> None:
+        b = self._bin(value)
+        self.counts[b] = self.counts.get(b, 0) + n
+        self.total += n
+        self._keys = None
+
+    def update(self, values: Iterable[float]) -> None:
+        for v in values:
+            self.add(v)
+
+    def merge(self, other: "NormSketch") -> None:
+        if other.width != self.width:
+            raise ValueError("Cannot merge sketches with different bin widths")
+        for b, n in other.counts.items():
+            self.counts[b] = self.counts.get(b, 0) + n
+        self.total += other.total
+        self._keys = None
+
+    def rank(self, value: float) -> float:
+        """Approximate number of values ``<= value``."""
+
+        if self._keys is None:
+            self._keys = sorted(self.counts)
+            running = 0
+            self._cumulative = []
+            for b in self._keys:
+                running += self.counts[b]
+                self._cumulative.append(running)
+        b = self._bin(value)
+        i = bisect.bisect_left(self._keys, b)
+        below = self._cumulative[i - 1] if i else 0
+        if i < len(self._keys) and self._keys[i] == b:
+            # Assume values are spread evenly inside the bin.
+            fraction = min(max(value / self.width - b, 0.0), 1.0)
+            below += self.counts[b] * fraction
+        return below
+
+    def percentile(self, value: float) -> float:
+        if not self.total:
+            return 50.0
+        return 100 * self.rank(value) / self.total
+
+    def to_dict(self) -> dict:
+        return {"width": self.width, "counts": {str(b): n for b, n in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NormSketch":
+        return cls(data["width"], {int(b): int(n) for b, n in data["counts"].items()})
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - non-POSIX
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class Norms:
+    """This worker's view of the shared sketch plus its unflushed scores."""
+
+    def __init__(self, path: Optional[str] = NORMS_SKETCH_PATH, flush_interval: float = NORMS_FLUSH_SECONDS):
+        self.path = Path(path) if path else None
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self.sketch = self._read() or self._seed()
+        self._delta = NormSketch(self.sketch.width)
+        self._flushed_at = time.monotonic()
+
+    def _read(self) -> Optional[NormSketch]:
+        if self.path is None or not self.path.exists():
+            return None
+        try:
+            return NormSketch.from_dict(json.loads(self.path.read_text()))
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Could not read norms sketch %s: %s", self.path, exc)
+            return None
+
+    @staticmethod
+    def _seed() -> NormSketch:
+        sketch = NormSketch()
+        try:
+            with open(LEGACY_DISTRIBUTION_PATH) as f:
+                sketch.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        return sketch
+
+    def _write(self, sketch: NormSketch) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(sketch.to_dict(), separators=(",", ":")))
+        os.replace(tmp, self.path)
+
+    def percentile(self, theta: float) -> float:
+        with self._lock:
+            return self.sketch.percentile(theta)
+
+    def record(self, theta: float) -> None:
+        with self._lock:
+            self.sketch.add(theta)
+            self._delta.add(theta)
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Merge pending scores into the shared file and reload the merged view."""
+
+        with self._lock:
+            delta, self._delta = self._delta, NormSketch(self.sketch.width)
+            self._flushed_at = time.monotonic()
+        if self.path is None:
+            return
+        try:
+            with _locked(self.path):
+                shared = self._read() or self._seed()
+                shared.merge(delta)
+                self._write(shared)
+        except OSError as exc:
+            logger.warning("Could not flush norms sketch: %s", exc)
+            with self._lock:
+                self._delta.merge(delta)
+            return
+        with self._lock:
+            # Keep scores recorded while the file was being written.
+            shared.merge(self._delta)
+            self.sketch = shared
+
+    def replace(self, thetas: Iterable[float]) -> int:
+        """Rebuild the shared sketch from ``thetas``; return how many were added."""
+
+        sketch = NormSketch()
+        sketch.update(thetas)
+        if self.path is not None:
+            with _locked(self.path):
+                self._write(sketch)
+        with self._lock:
+            self.sketch = sketch
+            self._delta = NormSketch(sketch.width)
+        return sketch.total
+
+
+_norms: Optional[Norms] = None
+_norms_lock = threading.Lock()
+
+
+def get_norms() -> Norms:
+    global _norms
+    with _norms_lock:
+        if _norms is None:
+            _norms = Norms()
+        return _norms
@@ -8,8 +8,13 @@ from typing import Any, Sequence
 from httpx import HTTPError
 from openai import OpenAI
 
+from backend.services.translation_cache import get_translation_cache
+
 log = logging.getLogger(__name__)
 
+# Bump when the request shape changes in a way that alters translations.
+PROMPT_VERSION = "1"
+
 
 def extract_response_text(resp: Any) -> str:
     """
@@ -103,6 +108,7 @@ def translate_with_openai(prompt: str, *, model_env: str = "OPENAI_TRANSLATION_M
     - Uses model from env (default: gpt-5-mini) with Responses API.
     - Omits 'temperature' for gpt-5* models to avoid 400.
     - Retries transient 5xx once with backoff.
+    - Results are memoised in the shared translation cache.
     """
     # When running in an environment without an API key we simply echo the
     # prompt back.  This keeps the rest of the application functioning in tests
@@ -127,13 +133,21 @@ def translate_with_openai(prompt: str, *, model_env: str = "OPENAI_TRANSLATION_M
     if model.startswith("gpt-5"):
         kwargs["reasoning"] = {"effort": "medium"}
 
-    # One retry on transient errors
-    for attempt in range(2):
-        try:
-            resp = _client.responses.create(**kwargs)
-            return extract_response_text(resp)
-        except HTTPError as e:
-            if attempt == 0 and (getattr(e.response, "status_code", 0) >= 500):
-                time.sleep(0.6)
-                continue
-            raise
+    def _call() -> str:
+        # One retry on transient errors
+        for attempt in range(2):
+            try:
+                resp = _client.responses.create(**kwargs)
+                return extract_response_text(resp)
+            except HTTPError as e:
+                if attempt == 0 and (getattr(e.response, "status_code", 0) >= 500):
+                    time.sleep(0.6)
+                    continue
+                raise
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    # The prompt already embeds the source text and target language, so it is
+    # the content address; src/tgt are wildcards for this entry point.
+    return get_translation_cache().get_or_translate(
+        prompt, "*", "*", model, PROMPT_VERSION, _call
+    )
@@ -0,0 +1,147 @@
+"""Running per-party IQ aggregates for the party leaderboard.
+
+Each user counts toward every party in their latest ``party_log`` entry with
+their average score. Per party the aggregates keep ``Cell`` counters over
+those averages, so the leaderboard reads a few dozen counters instead of
+scanning ``app_users``. A new score shifts the user's average in place, a
+party change moves it between parties, and the table is periodically rebuilt
+from ``app_users`` to pick up other workers' writes.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from backend import db
+from backend.services.demographic_cube import Cell
+from backend.utils.cache import PeriodicRebuild
+
+logger = logging.getLogger(__name__)
+
+PARTY_STATS_REBUILD_SECONDS = float(os.getenv("PARTY_STATS_REBUILD_SECONDS", "300"))
+
+
+def latest_parties(user: Mapping[str, Any]) -> List[int]:
+    log = user.get("party_log") or []
+    return list(log[-1].get("party_ids") or []) if log else []
+
+
+def user_average(summary: Optional[Mapping[str, Any]]) -> Optional[float]:
+    if not summary or not summary.get("count"):
+        return None
+    return summary["sum"] / summary["count"]
+
+
+class PartyAggregates:
+    """``Cell`` counters of user average scores per party id."""
+
+    def __init__(self):
+        self._parties: Dict[int, Cell] = {}
+        self._lock = threading.Lock()
+        self._schedule = PeriodicRebuild(
+            self.rebuild, PARTY_STATS_REBUILD_SECONDS, "party-stats-rebuild"
+        )
+
+    @staticmethod
+    def _shift(
+        parties: Dict[int, Cell],
+        party_ids: Iterable[int],
+        old: Optional[float],
+        new: Optional[float],
+    ) -> None:
+        for pid in party_ids:
+            cell = parties.get(pid)
+            if cell is None:
+                cell = parties[pid] = Cell()
+            if old is not None:
+                cell.count -= 1
+                cell.total -= old
+                cell.total_sq -= old * old
+            if new is not None:
+                cell.count += 1
+                cell.total += new
+                cell.total_sq += new * new
+            if cell.count <= 0:
+                del parties[pid]
+
+    def record_score(
+        self,
+        party_ids: Iterable[int],
+        old_summary: Optional[Mapping[str, Any]],
+        new_summary: Mapping[str, Any],
+    ) -> None:
+        """Move a user's average from ``old_summary`` to ``new_summary``."""
+
+        with self._lock:
+            self._shift(
+                self._parties, party_ids, user_average(old_summary), user_average(new_summary)
+            )
+
+    def move(
+        self,
+        old_parties: Iterable[int],
+        new_parties: Iterable[int],
+        summary: Optional[Mapping[str, Any]],
+    ) -> None:
+        """Move a user with ``summary`` from ``old_parties`` to ``new_parties``."""
+
+        average = user_average(summary)
+        if average is None:
+            return
+        with self._lock:
+            self._shift(self._parties, old_parties, average, None)
+            self._shift(self._parties, new_parties, None, average)
+
+    def replace(self, rows: Iterable[Tuple[Iterable[int], float]]) -> None:
+        """Rebuild from ``(party_ids, average)`` pairs, one per user."""
+
+        parties: Dict[int, Cell] = {}
+        for party_ids, average in rows:
+            self._shift(parties, party_ids, None, average)
+        with self._lock:
+            self._parties = parties
+
+    def parties(self) -> Dict[int, Cell]:
+        with self._lock:
+            return {
+                pid: Cell(cell.count, cell.total, cell.total_sq)
+                for pid, cell in self._parties.items()
+            }
+
+    def rebuild(self) -> bool:
+        """Re-read every user's parties and summary, keeping state on failure."""
+
+        try:
+            rows = []
+            for user in db.iter_users("party_log,score_summary,scores"):
+                party_ids = latest_parties(user)
+                average = user_average(db.score_summary(user))
+                if party_ids and average is not None:
+                    rows.append((party_ids, average))
+        except Exception as exc:
+            logger.warning("party stats rebuild failed: %s", exc)
+            return False
+        self.replace(rows)
+        return True
+
+    def ensure_fresh(self) -> None:
+        self._schedule.ensure_fresh()
+
+
+_aggregates: Optional[PartyAggregates] = None
+_aggregates_lock = threading.Lock()
+
+
+def get_party_aggregates(fresh: bool = True) -> PartyAggregates:
+    """Return the process-wide aggregates, loading or refreshing them if ``fresh``."""
+
+    global _aggregates
+    with _aggregates_lock:
+        if _aggregates is None:
+            _aggregates = PartyAggregates()
+    if fresh:
+        _aggregates.ensure_fresh()
+    return _aggregates
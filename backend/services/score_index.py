@@ -0,0 +1,179 @@
+"""In-process index of every user's best IQ score.
+
+``/stats/iq_histogram`` and ``/stats/distribution`` only need each user's best
+score. The index keeps those in a sorted array, fixed-width bucket counters and
+a running sum, so percentiles are a binary search and histograms are read from
+the counters instead of scanning every user per request. ``/quiz/submit``
+records new scores as they happen and the whole index is periodically rebuilt
+from ``user_best_iq`` to pick up writes made by other workers.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend import db
+from backend.utils.cache import PeriodicRebuild
+
+logger = logging.getLogger(__name__)
+
+SCORE_BUCKET_WIDTH = 5
+# Seconds between rebuilds from ``user_best_iq``; the stale index keeps
+# answering while a rebuild runs in the background.
+SCORE_INDEX_RECONCILE_SECONDS = float(os.getenv("SCORE_INDEX_RECONCILE_SECONDS", "300"))
+
+
+def bucket_of(score: float, width: int = SCORE_BUCKET_WIDTH) -> int:
+    return int(score // width * width)
+
+
+class ScoreIndex:
+    """Best IQ per user with O(log n) rank queries and O(1) bucket updates."""
+
+    def __init__(self, bucket_width: int = SCORE_BUCKET_WIDTH):
+        self.bucket_width = bucket_width
+        self._best: Dict[str, float] = {}
+        self._sorted: List[float] = []
+        self._buckets: Dict[int, int] = {}
+        self._total = 0.0
+        self._lock = threading.Lock()
+        # Scores recorded while a rebuild is reading the table, replayed on top
+        # of the rebuilt state so they are not lost.
+        self._recent: Optional[Dict[str, float]] = None
+        self._schedule = PeriodicRebuild(
+            self.reconcile, SCORE_INDEX_RECONCILE_SECONDS, "score-index-reconcile"
+        )
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def _add(self, score: float) -> None:
+        bisect.insort(self._sorted, score)
+        b = bucket_of(score, self.bucket_width)
+        self._buckets[b] = self._buckets.get(b, 0) + 1
+        self._total += score
+
+    def _remove(self, score: float) -> None:
+        del self._sorted[bisect.bisect_left(self._sorted, score)]
+        b = bucket_of(score, self.bucket_width)
+        if self._buckets[b] == 1:
+            del self._buckets[b]
+        else:
+            self._buckets[b] -= 1
+        self._total -= score
+
+    def record(self, user_id: str, score: float) -> bool:
+        """Record ``score`` for ``user_id``; return ``True`` if it is a new best."""
+
+        score = float(score)
+        with self._lock:
+            if self._recent is not None:
+                self._recent[user_id] = max(score, self._recent.get(user_id, score))
+            current = self._best.get(user_id)
+            if current is not None and score <= current:
+                return False
+            if current is not None:
+                self._remove(current)
+            self._best[user_id] = score
+            self._add(score)
+            return True
+
+    def replace(self, rows: Iterable[Tuple[str, float]]) -> None:
+        """Rebuild the index from ``(user_id, best)`` pairs."""
+
+        best: Dict[str, float] = {}
+        for user_id, score in rows:
+            score = float(score)
+            if score > best.get(user_id, float("-inf")):
+                best[user_id] = score
+        with self._lock:
+            for user_id, score in (self._recent or {}).items():
+                if score > best.get(user_id, float("-inf")):
+                    best[user_id] = score
+            self._recent = None
+            self._best = best
+            self._sorted = sorted(best.values())
+            self._buckets = {}
+            for score in self._sorted:
+                b = bucket_of(score, self.bucket_width)
+                self._buckets[b] = self._buckets.get(b, 0) + 1
+            self._total = sum(self._sorted)
+
+    def best(self, user_id: str) -> Optional[float]:
+        return self._best.get(user_id)
+
+    def percentile(self, score: float) -> Optional[float]:
+        """Percentage of users whose best score is ``<= score``."""
+
+        with self._lock:
+            if not self._sorted:
+                return None
+            return bisect.bisect_right(self._sorted, score) / len(self._sorted) * 100
+
+    def histogram(self) -> List[Tuple[int, int]]:
+        """Non-empty ``(bucket_start, count)`` pairs in ascending order."""
+
+        with self._lock:
+            return sorted(self._buckets.items())
+
+    def summary(self) -> Tuple[int, float]:
+        """Return ``(count, sum)`` of the best scores."""
+
+        with self._lock:
+            return len(self._sorted), self._total
+
+    def reconcile(self, page_size: Optional[int] = None) -> bool:
+        """Rebuild from ``user_best_iq``, keeping the current index on failure."""
+
+        with self._lock:
+            self._recent = {}
+        try:
+            rows = list(_iter_best_iq(page_size or db.USER_PAGE_SIZE))
+        except Exception as exc:
+            with self._lock:
+                self._recent = None
+            logger.warning("score index reconcile failed: %s", exc)
+            return False
+        self.replace(rows)
+        return True
+
+    def ensure_fresh(self) -> None:
+        """Load on first use, then rebuild in the background once stale."""
+
+        self._schedule.ensure_fresh()
+
+
+def _iter_best_iq(page_size: int) -> Iterable[Tuple[str, float]]:
+    supabase = db.get_supabase()
+    last_id = None
+    while True:
+        query = supabase.table("user_best_iq").select("user_id,best_iq").order("user_id")
+        if last_id is not None:
+            query = query.gt("user_id", last_id)
+        rows = query.limit(page_size).execute().data or []
+        for row in rows:
+            if row.get("best_iq") is not None:
+                yield row["user_id"], row["best_iq"]
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["user_id"]
+
+
+_index: Optional[ScoreIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_score_index(fresh: bool = True) -> ScoreIndex:
+    """Return the process-wide index, loading or refreshing it if ``fresh``."""
+
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ScoreIndex()
+    if fresh:
+        _index.ensure_fresh()
+    return _index
@@ -1,14 +1,18 @@
 import os
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 
 from openai import OpenAI, BadRequestError, APIError, RateLimitError
 
+from .translation_cache import get_translation_cache, text_hash
+
 logger = logging.getLogger(__name__)
 
 _MODEL = os.getenv("TRANSLATION_MODEL", "gpt-5")
 _FALLBACK_MODEL = os.getenv("TRANSLATION_FALLBACK_MODEL", "gpt-4o")
 _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", "test"))
+# Bump when the prompt below changes in a way that alters translations.
+PROMPT_VERSION = "1"
 
 
 def is_reasoning(model: str) -> bool:
@@ -21,15 +25,45 @@ def translate_text(
     src_lang: str,
     dst_lang: str,
     system_hint: Optional[str] = None,
+    model: Optional[str] = None,
 ) -> str:
     """Translate arbitrary text using OpenAI models.
 
     For reasoning models like gpt-5 the Responses API is used without any sampling
     parameters. If the primary model is unavailable or returns a BadRequestError
     (such as unsupported parameters), the function retries and falls back to the
-    model defined by ``TRANSLATION_FALLBACK_MODEL``.
+    model defined by ``TRANSLATION_FALLBACK_MODEL``. Results are memoised in the
+    shared translation cache under the model that produced them, so fallback
+    output is never served for the primary model. ``model`` overrides
+    ``TRANSLATION_MODEL`` as the primary model.
     """
 
+    primary = model or _MODEL
+
+    version = PROMPT_VERSION
+    if system_hint:
+        version = f"{PROMPT_VERSION}:{text_hash(system_hint)[:12]}"
+    cache = get_translation_cache()
+    cached = cache.get(text, src_lang, dst_lang, primary, version)
+    if cached is not None:
+        return cached
+    result, answered = _translate_uncached(text, src_lang, dst_lang, system_hint, primary)
+    if result:
+        cache.put(text, src_lang, dst_lang, answered, version, result)
+    return result
+
+
+def _translate_uncached(
+    text: str,
+    src_lang: str,
+    dst_lang: str,
+    system_hint: Optional[str] = None,
+    model: Optional[str] = None,
+) -> Tuple[str, str]:
+    """Return the translation and the model that produced it."""
+
+    primary = model or _MODEL
+
     sys = system_hint or (
         "You are a professional translator. Preserve meaning and tone, avoid adding explanations."
     )
@@ -61,27 +95,27 @@ def translate_text(
         )
         return comp.choices[0].message.content.strip()
 
+    def _fallback() -> Tuple[str, str]:
+        try:
+            return _responses_call(_FALLBACK_MODEL), _FALLBACK_MODEL
+        except Exception:
+            return _chat_call(_FALLBACK_MODEL), _FALLBACK_MODEL
+
     try:
-        if is_reasoning(_MODEL):
-            return _responses_call(_MODEL)
-        return _chat_call(_MODEL)
+        if is_reasoning(primary):
+            return _responses_call(primary), primary
+        return _chat_call(primary), primary
     except BadRequestError as e:
         logger.warning("Retrying without sampling due to: %s", e)
         try:
-            return _responses_call(_MODEL)
+            return _responses_call(primary), primary
         except Exception as inner:
             logger.warning("Falling back to %s due to: %s", _FALLBACK_MODEL, inner)
-            try:
-                return _responses_call(_FALLBACK_MODEL)
-            except Exception:
-                return _chat_call(_FALLBACK_MODEL)
+            return _fallback()
     except APIError as e:
         if getattr(e, "status_code", None) in (403, 404):
             logger.warning("Falling back to %s due to: %s", _FALLBACK_MODEL, e)
-            try:
-                return _responses_call(_FALLBACK_MODEL)
-            except Exception:
-                return _chat_call(_FALLBACK_MODEL)
+            return _fallback()
         raise
     except RateLimitError:
         raise
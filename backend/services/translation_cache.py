@@ -0,0 +1,155 @@
+"""Persistent, content-addressed cache for machine translations.
+
+Entries are keyed by ``(sha256(source), src, tgt, model, prompt_version)`` and
+stored in a local SQLite file with an in-memory LRU in front of it, so the
+backend and the CLI tools share results across restarts and re-imports.
+Set ``TRANSLATION_CACHE_PATH`` to an empty string to keep the cache in memory
+only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from backend.utils.cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parents[1] / "data" / "translation_cache.sqlite3"
+
+_SCHEMA = """
+create table if not exists translations (
+    text_hash text not null,
+    src text not null,
+    tgt text not null,
+    model text not null,
+    prompt_version text not null,
+    translation text not null,
+    created_at real not null,
+    primary key (text_hash, src, tgt, model, prompt_version)
+)
+"""
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """Two-level translation cache: process LRU backed by SQLite."""
+
+    def __init__(self, path: str | os.PathLike | None, lru_size: int = 4096):
+        self._lru = TTLCache(maxsize=lru_size)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(path), check_same_thread=False, timeout=5.0)
+                conn.execute("pragma journal_mode=wal")
+                conn.execute(_SCHEMA)
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as exc:  # pragma: no cover - unwritable disk
+                log.warning("Translation cache disabled for %s: %s", path, exc)
+
+    @staticmethod
+    def _key(text: str, src: str, tgt: str, model: str, prompt_version: str) -> tuple:
+        return (text_hash(text), src, tgt, model, prompt_version)
+
+    def get(
+        self, text: str, src: str, tgt: str, model: str, prompt_version: str
+    ) -> Optional[str]:
+        key = self._key(text, src, tgt, model, prompt_version)
+        hit = self._lru.get(key)
+        if hit is not None or self._conn is None:
+            return hit
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "select translation from translations where text_hash=? and src=?"
+                    " and tgt=? and model=? and prompt_version=?",
+                    key,
+                ).fetchone()
+            except sqlite3.Error as exc:  # pragma: no cover - disk errors
+                log.warning("Translation cache read failed: %s", exc)
+                return None
+        if row is None:
+            return None
+        self._lru.set(key, row[0])
+        return row[0]
+
+    def put(
+        self,
+        text: str,
+        src: str,
+        tgt: str,
+        model: str,
+        prompt_version: str,
+        translation: str,
+    ) -> None:
+        key = self._key(text, src, tgt, model, prompt_version)
+        self._lru.set(key, translation)
+        if self._conn is None:
+            return
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "insert or replace into translations values (?, ?, ?, ?, ?, ?, ?)",
+                    (*key, translation, time.time()),
+                )
+                self._conn.commit()
+            except sqlite3.Error as exc:  # pragma: no cover - disk errors
+                log.warning("Translation cache write failed: %s", exc)
+
+    def get_or_translate(
+        self,
+        text: str,
+        src: str,
+        tgt: str,
+        model: str,
+        prompt_version: str,
+        translate: Callable[[], str],
+    ) -> str:
+        """Return the cached translation or compute, store and return it."""
+
+        cached = self.get(text, src, tgt, model, prompt_version)
+        if cached is not None:
+            return cached
+        result = translate()
+        if result:
+            self.put(text, src, tgt, model, prompt_version, result)
+        return result
+
+    def clear(self) -> None:
+        self._lru.clear()
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("delete from translations")
+            self._conn.commit()
+
+
+_cache: Optional[TranslationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_translation_cache() -> TranslationCache:
+    """Return the process-wide translation cache."""
+
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            path = os.getenv("TRANSLATION_CACHE_PATH", str(DEFAULT_PATH))
+            _cache = TranslationCache(
+                path or None,
+                lru_size=int(os.getenv("TRANSLATION_CACHE_LRU_SIZE", "4096")),
+            )
+        return _cache
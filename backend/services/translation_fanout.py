@@ -0,0 +1,51 @@
+"""Concurrent, de-duplicated translation of many (text, language) pairs."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]
+
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "8"))
+
+
+def content_hash(text: str) -> str:
+    """Return a stable hash identifying ``text`` regardless of where it lives."""
+
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def translate_pairs(
+    pairs: Iterable[Pair],
+    translate: Callable[[str, str], str],
+    *,
+    max_workers: int | None = None,
+) -> Dict[Pair, Optional[str]]:
+    """Translate every ``(text, target_lang)`` pair under one worker pool.
+
+    Duplicate pairs are translated once. Failed translations map to ``None`` so
+    callers can decide whether to drop the affected language.
+    """
+
+    unique = list(dict.fromkeys(p for p in pairs if p[0]))
+    if not unique:
+        return {}
+    workers = max(1, min(max_workers or TRANSLATION_CONCURRENCY, len(unique)))
+
+    def run(pair: Pair) -> Optional[str]:
+        text, tgt = pair
+        try:
+            return translate(text, tgt)
+        except Exception as exc:  # pragma: no cover - network failures
+            log.error("Translation to %s failed: %s", tgt, exc, exc_info=True)
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, unique))
+    return dict(zip(unique, results))
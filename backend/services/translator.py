@@ -1,7 +1,95 @@
 import asyncio
+import json
+import logging
+import os
+import time
+import weakref
 from typing import Dict, Any, List, Optional
 
+from openai import RateLimitError
+
+from . import translation
 from .translation import translate_text
+from .translation_cache import get_translation_cache, text_hash
+
+logger = logging.getLogger(__name__)
+
+# Questions per structured request; 1 disables batching.
+BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", "20"))
+# Upper bound on model requests in flight across all batch translations.
+MAX_CONCURRENCY = int(os.getenv("TRANSLATION_MAX_CONCURRENCY", "4"))
+# Sustained request rate; bursts up to MAX_CONCURRENCY are allowed.
+REQUESTS_PER_MINUTE = float(os.getenv("TRANSLATION_REQUESTS_PER_MINUTE", "60"))
+RATE_LIMIT_RETRIES = 4
+# Cache prompt version for batched results; bump when the instructions in
+# ``_request_batch`` change in a way that alters translations.
+BATCH_PROMPT_VERSION = "batch-1"
+
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    "prompt": {"type": "string"},
+                    "options": {"type": "array", "items": {"type": "string"}},
+                    "explanation": {"type": "string"},
+                },
+                "required": ["index", "prompt", "options", "explanation"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["items"],
+    "additionalProperties": False,
+}
+
+
+class _TokenBucket:
+    """Async token bucket pacing outbound requests."""
+
+    def __init__(self, rate_per_sec: float, capacity: float):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def drain(self) -> None:
+        """Empty the bucket after the server signalled a rate limit."""
+
+        self.tokens = 0
+        self.updated = time.monotonic()
+
+
+# Limits are bound per event loop since asyncio primitives cannot be shared.
+_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loop_limits() -> tuple:
+    key = asyncio.get_running_loop()
+    if key not in _limits:
+        _limits[key] = (
+            asyncio.Semaphore(max(1, MAX_CONCURRENCY)),
+            _TokenBucket(REQUESTS_PER_MINUTE / 60.0, max(1, MAX_CONCURRENCY)),
+        )
+    return _limits[key]
 
 
 def _normalize(q: Dict[str, Any]) -> Dict[str, Any]:
@@ -18,19 +106,18 @@ async def translate_one(
     src_lang: str,
     tgt_lang: str,
     model: Optional[str] = None,
+    system_hint: Optional[str] = None,
 ) -> Dict[str, Any]:
     base = _normalize(q)
-    tasks = [
-        asyncio.to_thread(translate_text, base["prompt"], src_lang, tgt_lang),
-        *[
-            asyncio.to_thread(translate_text, opt, src_lang, tgt_lang)
-            for opt in base["options"]
-        ],
-    ]
-    if base["explanation"]:
-        tasks.append(
-            asyncio.to_thread(translate_text, base["explanation"], src_lang, tgt_lang)
+
+    def field(text: str):
+        return asyncio.to_thread(
+            translate_text, text, src_lang, tgt_lang, system_hint=system_hint, model=model
         )
+
+    tasks = [field(base["prompt"]), *[field(opt) for opt in base["options"]]]
+    if base["explanation"]:
+        tasks.append(field(base["explanation"]))
     results = await asyncio.gather(*tasks)
     prompt_tr = results[0]
     options_tr = results[1 : 1 + len(base["options"])]
@@ -43,14 +130,199 @@ async def translate_one(
     }
 
 
+def _batch_version(system_hint: Optional[str]) -> str:
+    if not system_hint:
+        return BATCH_PROMPT_VERSION
+    return f"{BATCH_PROMPT_VERSION}:{text_hash(system_hint)[:12]}"
+
+
+def _request_batch(
+    chunk: List[Dict[str, Any]],
+    src_lang: str,
+    tgt_lang: str,
+    model: str,
+    system_hint: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    payload = [
+        {
+            "index": i,
+            "prompt": q["prompt"],
+            "options": q["options"],
+            "explanation": q["explanation"],
+        }
+        for i, q in enumerate(chunk)
+    ]
+    instructions = (
+        f"Translate every item from {src_lang} to {tgt_lang}. Preserve placeholders, "
+        "formatting, numbers, option order and the index field. Leave empty strings "
+        "empty. Return ONLY JSON following the schema."
+    )
+    if system_hint:
+        instructions = f"{system_hint}\n\n{instructions}"
+    resp = translation._client.responses.create(
+        model=model,
+        instructions=instructions,
+        input=json.dumps({"items": payload}, ensure_ascii=False),
+        text={
+            "format": {
+                "type": "json_schema",
+                "name": "QuestionBatch",
+                "schema": BATCH_SCHEMA,
+                "strict": True,
+            }
+        },
+    )
+    return json.loads(resp.output_text).get("items") or []
+
+
+def _fields(q: Dict[str, Any]) -> List[str]:
+    return [q["prompt"], *q["options"], q["explanation"]]
+
+
+def _cached(
+    base: Dict[str, Any], src_lang: str, tgt_lang: str, model: str, version: str
+) -> Optional[Dict[str, Any]]:
+    """Return ``base`` translated from the cache, or ``None`` if any field is missing."""
+
+    cache = get_translation_cache()
+    out = []
+    for text in _fields(base):
+        hit = cache.get(text, src_lang, tgt_lang, model, version) if text else ""
+        if hit is None:
+            return None
+        out.append(hit)
+    return {
+        "prompt": out[0],
+        "options": out[1:-1],
+        "answer_index": base["answer_index"],
+        "explanation": out[-1],
+    }
+
+
+def _store(pairs: List[tuple], src_lang: str, tgt_lang: str, model: str, version: str) -> None:
+    """Write validated ``(base, translated)`` pairs back to the cache per field."""
+
+    cache = get_translation_cache()
+    for base, out in pairs:
+        for text, tr in zip(_fields(base), _fields(out)):
+            if text and tr:
+                cache.put(text, src_lang, tgt_lang, model, version, tr)
+
+
+def _validate(base: Dict[str, Any], out: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the translated question if ``out`` is structurally sound."""
+
+    if not isinstance(out, dict):
+        return None
+    prompt = out.get("prompt")
+    options = out.get("options")
+    explanation = out.get("explanation") or ""
+    if not isinstance(prompt, str) or not prompt.strip():
+        return None
+    if not isinstance(options, list) or len(options) != len(base["options"]):
+        return None
+    if not all(isinstance(o, str) and (o.strip() or not src) for o, src in zip(options, base["options"])):
+        return None
+    if base["explanation"] and not (isinstance(explanation, str) and explanation.strip()):
+        return None
+    return {
+        "prompt": prompt,
+        "options": options,
+        "answer_index": base["answer_index"],
+        "explanation": explanation if base["explanation"] else "",
+    }
+
+
+async def _translate_chunk(
+    chunk: List[Dict[str, Any]],
+    src_lang: str,
+    tgt_lang: str,
+    model: str,
+    system_hint: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    version = _batch_version(system_hint)
+    results: List[Optional[Dict[str, Any]]] = await asyncio.to_thread(
+        lambda: [_cached(base, src_lang, tgt_lang, model, version) for base in chunk]
+    )
+    misses = [i for i, r in enumerate(results) if r is None]
+    if misses:
+        pending = [chunk[i] for i in misses]
+        semaphore, bucket = _loop_limits()
+        returned: List[Dict[str, Any]] = []
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            await bucket.acquire()
+            try:
+                async with semaphore:
+                    returned = await asyncio.to_thread(
+                        _request_batch, pending, src_lang, tgt_lang, model, system_hint
+                    )
+                break
+            except RateLimitError:
+                bucket.drain()
+                if attempt == RATE_LIMIT_RETRIES:
+                    logger.warning("Batch translation rate limited; falling back per field")
+                    break
+                await asyncio.sleep(min(2 ** attempt, 30))
+            except Exception as exc:
+                logger.warning("Batch translation to %s failed: %s", tgt_lang, exc)
+                break
+
+        by_index = {o.get("index"): o for o in returned if isinstance(o, dict)}
+        valid = []
+        for j, i in enumerate(misses):
+            results[i] = _validate(chunk[i], by_index.get(j))
+            if results[i] is not None:
+                valid.append((chunk[i], results[i]))
+        await asyncio.to_thread(_store, valid, src_lang, tgt_lang, model, version)
+    failed = [i for i, r in enumerate(results) if r is None]
+    if failed:
+        logger.info("Falling back to per-field translation for %d item(s)", len(failed))
+        fallbacks = await asyncio.gather(
+            *(
+                translate_one(chunk[i], src_lang, tgt_lang, model=model, system_hint=system_hint)
+                for i in failed
+            )
+        )
+        for i, res in zip(failed, fallbacks):
+            results[i] = res
+    return results  # type: ignore[return-value]
+
+
 async def translate_batch(
     items: List[Dict[str, Any]],
     src_lang: str,
     tgt_lang: str,
     model: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    system_hint: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for q in items:
-        out.append(await translate_one(q, src_lang, tgt_lang, model=model))
-    return out
+    """Translate ``items`` with one structured request per ``batch_size`` questions.
+
+    ``system_hint`` is prepended to the batch instructions and passed to the
+    per-field fallback; it is part of the cache key.
 
+    Questions whose fields are all in the translation cache are served from
+    it; only the rest are sent, and validated results are written back.
+    Chunks run concurrently under the module-wide concurrency limit and token
+    bucket. Questions missing from a response or failing validation are
+    retried with per-field :func:`translate_one` calls.
+    """
+
+    size = batch_size or BATCH_SIZE
+    if size <= 1:
+        out: List[Dict[str, Any]] = []
+        for q in items:
+            out.append(
+                await translate_one(q, src_lang, tgt_lang, model=model, system_hint=system_hint)
+            )
+        return out
+
+    bases = [_normalize(q) for q in items]
+    chunks = [bases[i : i + size] for i in range(0, len(bases), size)]
+    translated = await asyncio.gather(
+        *(
+            _translate_chunk(c, src_lang, tgt_lang, model or translation._MODEL, system_hint)
+            for c in chunks
+        )
+    )
+    return [q for chunk in translated for q in chunk]
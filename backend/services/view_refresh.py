@@ -0,0 +1,177 @@
+"""Change-driven refresh of the ``*_v2`` statistics materialized views.
+
+Writes that affect the v2 stats (quiz submits, survey answers) are counted
+with :func:`note_stats_write`. A background thread refreshes the views through
+the ``refresh_stats_views_v2`` database function, which runs
+``REFRESH MATERIALIZED VIEW CONCURRENTLY`` on each view, when either
+
+* ``VIEW_REFRESH_WRITE_THRESHOLD`` writes are pending and no new write has
+  arrived for ``VIEW_REFRESH_DEBOUNCE_SECONDS`` (bursts coalesce), or
+* the oldest pending write is ``VIEW_REFRESH_MAX_STALENESS_SECONDS`` old.
+
+Nothing is refreshed while no writes are pending. :func:`get_view_refresher`
+``.status()`` reports the age and duration of the last refresh.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+VIEW_REFRESH_WRITE_THRESHOLD = int(os.getenv("VIEW_REFRESH_WRITE_THRESHOLD", "50"))
+VIEW_REFRESH_DEBOUNCE_SECONDS = float(os.getenv("VIEW_REFRESH_DEBOUNCE_SECONDS", "5"))
+VIEW_REFRESH_MAX_STALENESS_SECONDS = float(os.getenv("VIEW_REFRESH_MAX_STALENESS_SECONDS", "300"))
+VIEW_REFRESH_RPC = "refresh_stats_views_v2"
+
+
+def _refresh_via_rpc() -> None:
+    from backend.db import get_supabase
+
+    get_supabase().rpc(VIEW_REFRESH_RPC, {}).execute()
+
+
+class ViewRefreshScheduler:
+    """Decide when pending writes justify a refresh and run it off-request."""
+
+    def __init__(
+        self,
+        refresh: Callable[[], None] = _refresh_via_rpc,
+        write_threshold: int = VIEW_REFRESH_WRITE_THRESHOLD,
+        debounce: float = VIEW_REFRESH_DEBOUNCE_SECONDS,
+        max_staleness: float = VIEW_REFRESH_MAX_STALENESS_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.refresh = refresh
+        self.write_threshold = write_threshold
+        self.debounce = debounce
+        self.max_staleness = max_staleness
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.pending = 0
+        self.first_pending_at: Optional[float] = None
+        self.last_write_at: Optional[float] = None
+        self.last_refresh_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.refreshes = 0
+        self._retry_at = 0.0
+
+    def note_write(self, n: int = 1) -> None:
+        now = self.clock()
+        with self._lock:
+            first = self.pending == 0
+            if first:
+                self.first_pending_at = now
+            self.pending += n
+            self.last_write_at = now
+            reached = self.pending >= self.write_threshold
+        # The loop sleeps until the next deadline; both events move it earlier.
+        if first or reached:
+            self._wake.set()
+
+    def next_due(self) -> Optional[float]:
+        """Clock time at which a refresh becomes due, or ``None`` if idle."""
+
+        with self._lock:
+            if not self.pending:
+                return None
+            due = self.first_pending_at + self.max_staleness
+            if self.pending >= self.write_threshold:
+                due = min(due, self.last_write_at + self.debounce)
+            return max(due, self._retry_at)
+
+    def run_due(self) -> bool:
+        """Refresh if one is due now; return whether a refresh ran."""
+
+        due = self.next_due()
+        if due is None or self.clock() < due:
+            return False
+        self.run_now()
+        return True
+
+    def run_now(self) -> None:
+        with self._lock:
+            # Writes landing during the refresh stay pending for the next one.
+            taken = self.pending
+            self.pending = 0
+            first, self.first_pending_at = self.first_pending_at, None
+        started = self.clock()
+        try:
+            self.refresh()
+        except Exception as exc:
+            logger.warning("stats view refresh failed: %s", exc)
+            with self._lock:
+                self.pending += taken
+                if first is not None and (
+                    self.first_pending_at is None or first < self.first_pending_at
+                ):
+                    self.first_pending_at = first
+                self.last_error = str(exc)
+                self._retry_at = self.clock() + max(self.debounce, 1.0)
+            return
+        finished = self.clock()
+        with self._lock:
+            self.last_refresh_at = finished
+            self.last_duration = finished - started
+            self.last_error = None
+            self.refreshes += 1
+
+    def status(self) -> Dict[str, Any]:
+        now = self.clock()
+        with self._lock:
+            return {
+                "pending_writes": self.pending,
+                "last_refresh_age": None if self.last_refresh_at is None else now - self.last_refresh_at,
+                "last_refresh_duration": self.last_duration,
+                "last_error": self.last_error,
+                "refreshes": self.refreshes,
+            }
+
+    def _loop(self) -> None:
+        while not self._stopping:
+            due = self.next_due()
+            timeout = self.max_staleness if due is None else max(due - self.clock(), 0.0)
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if not self._stopping:
+                self.run_due()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._loop, name="stats-view-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_refresher: Optional[ViewRefreshScheduler] = None
+_refresher_lock = threading.Lock()
+
+
+def get_view_refresher() -> ViewRefreshScheduler:
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = ViewRefreshScheduler()
+        return _refresher
+
+
+def note_stats_write(n: int = 1) -> None:
+    """Count ``n`` writes that change the v2 statistics views."""
+
+    get_view_refresher().note_write(n)
@@ -7,10 +7,13 @@ os.environ.setdefault("SUPABASE_URL", "http://localhost")
 os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "dummy")
 os.environ.setdefault("OPENAI_API_KEY", "test")
 os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("TRANSLATION_CACHE_PATH", "")
+os.environ.setdefault("NORMS_SKETCH_PATH", "")
 
 class DummyResponse:
-    def __init__(self, data=None):
+    def __init__(self, data=None, count=None):
         self.data = data
+        self.count = count
         self.error = None
 
 class DummyTable:
@@ -26,8 +29,9 @@ class DummyTable:
         self._offset = None
         self._or_filters = []
 
-    def select(self, *columns):
+    def select(self, *columns, count=None):
         self._select = True
+        self._count = count
         return self
 
     def insert(self, data, returning=None):
@@ -76,7 +80,7 @@ class DummyTable:
                 column, op, value = cond.split(".", 2)
             except ValueError:
                 continue
-            parts.append((op, column, value))
+            parts.append((op, column, value.strip('"')))
         if parts:
             self._or_filters.append(parts)
         return self
@@ -90,6 +94,29 @@ class DummyTable:
         self._filters.append(("in", column, tuple(values)))
         return self
 
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def is_(self, column, value):
+        op = "not.is" if getattr(self, "_negate", False) else "is"
+        self._negate = False
+        self._filters.append((op, column, value))
+        return self
+
+    def gt(self, column, value):
+        self._filters.append(("gt", column, value))
+        return self
+
+    def gte(self, column, value):
+        self._filters.append(("gte", column, value))
+        return self
+
+    def lte(self, column, value):
+        self._filters.append(("lte", column, value))
+        return self
+
     def limit(self, n):
         self._limit = n
         return self
@@ -99,7 +126,7 @@ class DummyTable:
         return self
 
     def order(self, column, desc=False):
-        self._order = (column, desc)
+        self._order = (getattr(self, '_order', None) or []) + [(column, desc)]
         return self
 
     def single(self):
@@ -108,6 +135,12 @@ class DummyTable:
 
     def execute(self):
         def _match_cond(field, op, val):
+            # ``or_`` expressions carry values as text, as in PostgREST URLs.
+            if isinstance(val, str) and isinstance(field, (int, float)) and not isinstance(field, bool):
+                try:
+                    val = float(val)
+                except ValueError:
+                    pass
             if op == "eq":
                 return field == val
             if op == "ilike":
@@ -120,6 +153,17 @@ class DummyTable:
                 return isinstance(field, list) and val[0] in field
             if op == "in":
                 return field in val
+            if op == "gt":
+                return field is not None and field > val
+            if op == "lt":
+                return field is not None and field < val
+            if op == "gte":
+                return field is not None and field >= val
+            if op in ("is", "not.is"):
+                matched = field is None if val == "null" else field is val
+                return matched if op == "is" else not matched
+            if op == "lte":
+                return field is not None and field <= val
             return False
 
         def _matches(row):
@@ -156,17 +200,18 @@ class DummyTable:
             return DummyResponse(None)
         if self._select:
             res = [r for r in self.rows if _matches(r)]
+            count = len(res) if getattr(self, '_count', None) else None
             if getattr(self, '_order', None) and isinstance(res, list):
-                col, desc = self._order
-                res = sorted(res, key=lambda x: x.get(col), reverse=desc)
+                for col, desc in reversed(self._order):
+                    res = sorted(res, key=lambda x: x.get(col), reverse=desc)
             if self._single:
                 res = res[0] if res else None
-            if self._limit is not None and isinstance(res, list):
-                res = res[: self._limit]
             if self._offset is not None and isinstance(res, list):
                 res = res[self._offset :]
+            if self._limit is not None and isinstance(res, list):
+                res = res[: self._limit]
             self._reset()
-            return DummyResponse(res)
+            return DummyResponse(res, count)
         self._reset()
         return DummyResponse(None)
 
@@ -181,11 +226,32 @@ class DummyTable:
         self._order = None
         self._or_filters = []
         self._offset = None
+        self._count = None
+
+class DummyRpc:
+    """RPC call against a project where no database functions are deployed."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def execute(self):
+        from postgrest.exceptions import APIError
+
+        raise APIError(
+            {
+                "code": "PGRST202",
+                "message": f"Could not find the function public.{self.name} in the schema cache",
+            }
+        )
+
 
 class DummySupabase:
     def __init__(self):
         self.tables = {"app_users": []}
 
+    def rpc(self, name, params=None):
+        return DummyRpc(name)
+
     def from_(self, table):
         if table not in self.tables:
             self.tables[table] = []
@@ -196,6 +262,9 @@ class DummySupabase:
 
 @pytest.fixture(autouse=True)
 def fake_supabase(monkeypatch):
+    from backend.utils.cache import clear_all_caches
+
+    clear_all_caches()
     supa = DummySupabase()
     monkeypatch.setattr("db.get_supabase", lambda: supa, raising=False)
     monkeypatch.setattr("backend.db.get_supabase", lambda: supa, raising=False)
@@ -208,3 +277,23 @@ def fake_supabase(monkeypatch):
     monkeypatch.setattr("routes.admin_surveys.supabase_admin", supa, raising=False)
     monkeypatch.setattr("backend.routes.stats.get_supabase", lambda: supa, raising=False)
     return supa
+
+
+@pytest.fixture
+def pg_conn():
+    """Autocommit connection to a disposable local Postgres database.
+
+    Set ``TEST_DATABASE_URL`` (e.g. ``postgresql://postgres:pg@localhost:5432/postgres``
+    for ``docker run -e POSTGRES_PASSWORD=pg -p 5432:5432 postgres:16``) and
+    install ``psycopg`` to run these tests; they are skipped otherwise. Tests
+    create and drop their own objects in the ``public`` schema.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+    psycopg = pytest.importorskip("psycopg")
+    conn = psycopg.connect(url, autocommit=True)
+    try:
+        yield conn
+    finally:
+        conn.close()
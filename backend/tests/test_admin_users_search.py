@@ -28,7 +28,7 @@ def test_search_users_handles_special_chars(monkeypatch, fake_supabase, query):
     monkeypatch.setattr(db, "get_user", lambda _id: {"hashed_id": "admin", "is_admin": True})
     monkeypatch.setattr(auth_deps, "get_user", lambda _id: {"hashed_id": "admin", "is_admin": True})
     monkeypatch.setattr(db, "get_points", lambda _id: 0)
-    monkeypatch.setattr(auth_deps, "get_points", lambda _id: 0)
+    monkeypatch.setattr(auth_deps, "ensure_signup_reward", lambda user: user)
     monkeypatch.setattr(admin_users_route, "get_supabase", lambda: fake_supabase)
     monkeypatch.setattr(admin_users_route_pkg, "get_supabase", lambda: fake_supabase)
 
@@ -67,7 +67,7 @@ def test_search_users_raises_on_query_error(monkeypatch):
     monkeypatch.setattr(db, "get_user", lambda _id: {"hashed_id": "admin", "is_admin": True})
     monkeypatch.setattr(auth_deps, "get_user", lambda _id: {"hashed_id": "admin", "is_admin": True})
     monkeypatch.setattr(db, "get_points", lambda _id: 0)
-    monkeypatch.setattr(auth_deps, "get_points", lambda _id: 0)
+    monkeypatch.setattr(auth_deps, "ensure_signup_reward", lambda user: user)
     monkeypatch.setattr(admin_users_route, "get_supabase", lambda: BrokenSupabase())
     monkeypatch.setattr(admin_users_route_pkg, "get_supabase", lambda: BrokenSupabase())
 
@@ -0,0 +1,102 @@
+import os
+import sys
+
+import pytest
+from postgrest.exceptions import APIError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend import db
+
+
+def _count_tables(monkeypatch, supa):
+    calls: list[str] = []
+    original = supa.table
+
+    def table(name):
+        calls.append(name)
+        return original(name)
+
+    monkeypatch.setattr(supa, "table", table)
+    return calls
+
+
+def test_insert_daily_answer_hits_caches(monkeypatch, fake_supabase):
+    fake_supabase.table("app_users").insert({"id": "uuid1", "hashed_id": "u1"}).execute()
+    fake_supabase.table("surveys").insert({"id": "s1", "group_id": "g1"}).execute()
+    for i in range(2):
+        fake_supabase.table("survey_items").insert({"id": f"q{i}", "survey_id": "s1"}).execute()
+
+    db.insert_daily_answer("u1", "q0")
+    calls = _count_tables(monkeypatch, fake_supabase)
+
+    db.insert_daily_answer("u1", "q0")
+    assert calls == ["survey_answers"]
+
+    calls.clear()
+    db.insert_daily_answer("u1", "q1")
+    assert "app_users" not in calls
+    assert calls.count("survey_answers") == 1
+
+    rows = fake_supabase.tables["survey_answers"]
+    assert [(r["user_id"], r["survey_id"], r["survey_group_id"]) for r in rows] == [
+        ("uuid1", "s1", "g1")
+    ] * 3
+
+
+def test_unknown_item_is_not_cached(fake_supabase):
+    supa = fake_supabase
+    assert db.get_survey_item_meta(supa, "missing") is None
+    supa.table("surveys").insert({"id": "s1", "group_id": "g1"}).execute()
+    supa.table("survey_items").insert({"id": "missing", "survey_id": "s1"}).execute()
+    assert db.get_survey_item_meta(supa, "missing") == ("s1", "g1")
+
+
+def test_daily_count_is_cached_and_written_through(monkeypatch, fake_supabase):
+    fake_supabase.table("app_users").insert({"id": "uuid1", "hashed_id": "u1"}).execute()
+    for i in range(3):
+        fake_supabase.table("surveys").insert({"id": f"s{i}", "group_id": f"g{i}"}).execute()
+        fake_supabase.table("survey_items").insert({"id": f"q{i}", "survey_id": f"s{i}"}).execute()
+
+    assert db.get_daily_answer_count("u1") == 0
+    db.insert_daily_answer("u1", "q0")
+    db.insert_daily_answer("u1", "q1")
+
+    calls = _count_tables(monkeypatch, fake_supabase)
+    assert db.get_daily_answer_count("u1") == 2
+    assert calls == []
+
+    db.insert_daily_answer("u1", "q1")
+    db.insert_daily_answer("u1", "q2")
+    assert db.get_daily_answer_count("u1") == 3
+    assert calls.count("survey_answers") == 2
+
+
+def test_rows_keyed_by_hashed_id_do_not_skew_cached_count(fake_supabase):
+    fake_supabase.table("app_users").insert({"id": "uuid1", "hashed_id": "u1"}).execute()
+    assert db.get_daily_answer_count("u1") == 0
+
+    db.insert_survey_answers(
+        [
+            {
+                "user_id": "u1",
+                "survey_id": "s1",
+                "survey_group_id": "g1",
+                "answer": {"id": "q1", "selections": [0]},
+            }
+        ]
+    )
+    warm = db.get_daily_answer_count("u1")
+    db._daily_groups_cache.clear()
+    assert warm == db.get_daily_answer_count("u1") == 0
+
+
+def test_rpc_errors_other_than_missing_function_propagate(monkeypatch, fake_supabase):
+    class FailingRpc:
+        def execute(self):
+            raise APIError({"code": "57014", "message": "canceling statement due to statement timeout"})
+
+    monkeypatch.setattr(fake_supabase, "rpc", lambda name, params=None: FailingRpc())
+    with pytest.raises(APIError):
+        db._fetch_daily_answer_groups(fake_supabase, "uuid1", "2025-01-01")
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services import demographic_cube
+
+
+def test_cells_roll_up_across_dimensions():
+    cube = demographic_cube.DemographicCube()
+    cube.add({"age_band": "20s", "gender": "f", "income_band": "low"}, 100)
+    cube.add({"age_band": "20s", "gender": "m", "income_band": "low"}, 110)
+    cube.add({"age_band": "30s", "gender": "f"}, 120)
+    cube.add(None, 90)
+
+    assert cube.cell().count == 4
+    assert cube.cell(age_band="20s").total == 210
+    assert cube.cell(gender="f").mean == 110
+    assert cube.cell(age_band="20s", income_band="low").count == 2
+    assert cube.cell(gender="f", income_band="low").total_sq == 100 * 100
+    assert cube.cell(age_band="40s").count == 0
+    assert cube.cell(age_band="20s", gender="f", income_band="low").variance == 0
+    with pytest.raises(ValueError):
+        cube.cell(country="jp")
+
+
+def test_data_api_reads_rolled_up_cell(monkeypatch, fake_supabase):
+    import main
+
+    for i in range(3):
+        fake_supabase.table("app_users").insert(
+            {
+                "hashed_id": f"h{i}",
+                "demographic": {"age_band": "20s", "gender": "f" if i else "m"},
+                "scores": [{"iq": 100 + i}, {"iq": 110}],
+            }
+        ).execute()
+    monkeypatch.setattr(demographic_cube, "_cube", None)
+    monkeypatch.setattr(main, "MIN_BUCKET_SIZE", 4)
+    monkeypatch.setattr(main, "dp_mean", lambda total, count, eps, min_count, key=None: total / count)
+    monkeypatch.setenv("DATA_API_KEY", "k")
+    client = TestClient(main.app)
+
+    r = client.get("/data/iq", params={"api_key": "k", "age_band": "20s"})
+    assert r.json() == {"count": 6, "avg_iq": 105.5}
+    r = client.get("/data/iq", params={"api_key": "k", "gender": "f"})
+    assert r.json()["count"] == 4
+    assert client.get("/data/iq", params={"api_key": "k", "gender": "m"}).status_code == 400
+
+
+def test_data_api_keys_release_by_rolled_up_cell(monkeypatch, fake_supabase):
+    import main
+
+    fake_supabase.table("app_users").insert(
+        {"hashed_id": "h0", "demographic": {"age_band": "20s"}, "scores": [{"iq": 100}]}
+    ).execute()
+    monkeypatch.setattr(demographic_cube, "_cube", None)
+    monkeypatch.setattr(main, "MIN_BUCKET_SIZE", 1)
+    keys = []
+    monkeypatch.setattr(
+        main, "dp_mean", lambda total, count, eps, min_count, key=None: keys.append(key) or 100.0
+    )
+    monkeypatch.setenv("DATA_API_KEY", "k")
+    client = TestClient(main.app)
+
+    for params in ({}, {"gender": "*"}, {"gender": ""}, {"age_band": "*", "income_band": "*"}):
+        assert client.get("/data/iq", params={"api_key": "k", **params}).status_code == 200
+    assert set(keys) == {("data_iq", "*", "*", "*")}
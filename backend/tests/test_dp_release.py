@@ -0,0 +1,93 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services import dp_release
+from backend.services.dp_release import DPReleaseStore
+
+
+def test_release_is_cached_per_version_and_epsilon():
+    store = DPReleaseStore()
+    first = store.release("k", (10, 1000.0), 100.0, 1.0)
+    assert store.release("k", (10, 1000.0), 100.0, 1.0) == first
+    assert store.spent("k") == 1.0
+
+    store.release("k", (10, 1000.0), 100.0, 0.5)
+    assert store.spent("k") == 1.5
+    assert store.release("k", (10, 1000.0), 100.0, 1.0) == first
+
+    store.release("k", (11, 1100.0), 100.0, 1.0)
+    assert store.spent("k") == 2.5
+
+
+def test_exhausted_budget_serves_latest_release():
+    store = DPReleaseStore(budget=1.0)
+    first = store.release("k", 1, 100.0, 1.0)
+    assert store.release("k", 2, 120.0, 1.0) == first
+    assert store.spent("k") == 1.0
+    assert store.release("other", 1, 100.0, 2.0) is None
+
+
+def test_release_many_draws_only_missing():
+    store = DPReleaseStore()
+    a = store.release("a", 1, 5.0, 1.0, sensitivity=0.01)
+    out = store.release_many([("a", 1, 5.0, 0.01), ("b", 1, 7.0, 0.01)], 1.0)
+    assert out[0] == a
+    assert abs(out[1] - 7.0) < 5
+    assert store.spent("a") == store.spent("b") == 1.0
+    with pytest.raises(ValueError):
+        store.release("a", 1, 5.0, 0)
+
+
+def test_epsilon_is_quantized_and_releases_bounded():
+    store = DPReleaseStore(allowed_epsilons=(0.5, 1.0), max_releases=2)
+    first = store.release("k", 1, 100.0, 1.0)
+    assert store.release("k", 1, 100.0, 1.0001) == first
+    assert store.release("k", 1, 100.0, 1.7) == first
+    assert store.spent("k") == 1.0
+    with pytest.raises(ValueError):
+        store.release("k", 1, 100.0, 0.49)
+
+    for key in ("a", "b", "c"):
+        store.release(key, 1, 100.0, 0.5)
+    assert len(store._releases) == 2
+
+
+def test_distribution_rejects_tiny_epsilon(fake_supabase):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    resp = client.get("/stats/distribution", params={"user_id": "u0", "epsilon": 0.001})
+    assert resp.status_code == 400
+    assert client.get("/stats/distribution", params={"user_id": "u0", "epsilon": 1.5}).status_code == 200
+
+
+def test_leaderboard_by_party_repeats_release(monkeypatch, fake_supabase):
+    import features
+    from backend.services import party_stats
+
+    monkeypatch.setattr(dp_release, "_store", None)
+    monkeypatch.setattr(party_stats, "_aggregates", None)
+    monkeypatch.setattr(features, "MIN_BUCKET_SIZE", 2)
+    for i in range(3):
+        fake_supabase.table("app_users").insert(
+            {
+                "hashed_id": f"h{i}",
+                "party_log": [{"party_ids": [1]}],
+                "scores": [{"iq": 100 + i}],
+            }
+        ).execute()
+
+    first = asyncio.run(features.leaderboard_by_party())
+    assert [r["n"] for r in first] == [3]
+    assert asyncio.run(features.leaderboard_by_party()) == first
+
+    party_stats.get_party_aggregates().record_score([1], None, {"count": 1, "sum": 130})
+    assert asyncio.run(features.leaderboard_by_party())[0]["n"] == 4
+    assert dp_release.get_dp_releases().spent(("party_avg", 1)) == 2.0
@@ -1,3 +1,5 @@
+import base64
+import json
 import os
 import sys
 from fastapi import FastAPI
@@ -58,3 +60,82 @@ def test_history_descending(monkeypatch, fake_supabase):
         resp = client.get("/user/history")
         attempts = resp.json()["attempts"]
         assert [a["set"] for a in attempts] == ["B", "A"]
+
+
+def test_leaderboard_fetches_only_top_k(monkeypatch, fake_supabase):
+    app = make_app(monkeypatch, fake_supabase, user_id="u7")
+    supa = fake_supabase
+    supa.table("user_best_iq_unified").insert(
+        [{"user_id": f"u{i}", "best_iq": 80 + i * 5} for i in range(10)]
+    ).execute()
+    limits = []
+    table_cls = type(supa.table("user_best_iq_unified"))
+    original = table_cls.execute
+
+    def execute(self):
+        if self._select and self.name == "user_best_iq_unified":
+            limits.append(self._limit)
+        return original(self)
+
+    monkeypatch.setattr(table_cls, "execute", execute)
+    with TestClient(app) as client:
+        payload = client.get("/leaderboard?limit=2").json()
+    assert [i["user_id"] for i in payload["items"]] == ["u9", "u8"]
+    assert payload["total_users"] == 10
+    assert payload["my_rank"] == 3
+    assert None not in limits and max(limits) <= 2
+
+
+def test_leaderboard_fallback_breaks_ties_by_user_id(monkeypatch, fake_supabase):
+    supa = fake_supabase
+    supa.table("user_best_iq_unified").insert(
+        [
+            {"user_id": "ud", "best_iq": 110},
+            {"user_id": "ua", "best_iq": 120},
+            {"user_id": "uc", "best_iq": 110},
+            {"user_id": "un", "best_iq": None},
+            {"user_id": "ub", "best_iq": 110},
+        ]
+    ).execute()
+    ranks = {}
+    for uid in ("ub", "uc", "ud", "un"):
+        app = make_app(monkeypatch, supa, user_id=uid)
+        with TestClient(app) as client:
+            payload = client.get("/leaderboard?limit=2").json()
+        assert [i["user_id"] for i in payload["items"]] == ["ua", "ub"]
+        assert payload["total_users"] == 4
+        ranks[uid] = payload["my_rank"]
+    assert ranks == {"ub": 2, "uc": 3, "ud": 4, "un": None}
+
+
+def test_history_keyset_pages(monkeypatch, fake_supabase):
+    user_id = "u1"
+    app = make_app(monkeypatch, fake_supabase, user_id)
+    supa = fake_supabase
+    supa.table("quiz_attempts").insert(
+        [
+            {"id": f"00000000-0000-4000-8000-00000000000{i}", "user_id": user_id, "created_at": f"2025-01-0{i // 2 + 1}T00:00:00Z", "set_id": str(i), "status": "submitted"}
+            for i in range(7)
+        ]
+        + [
+            {"id": "00000000-0000-4000-8000-0000000000b0", "user_id": user_id, "created_at": "2025-01-09T00:00:00Z", "set_id": "x", "status": "started"},
+            {"id": "00000000-0000-4000-8000-0000000000c0", "user_id": "u2", "created_at": "2025-01-09T00:00:00Z", "set_id": "y", "status": "submitted"},
+        ]
+    ).execute()
+    seen = []
+    cursor = None
+    with TestClient(app) as client:
+        while True:
+            params = {"page_size": 3, **({"cursor": cursor} if cursor else {})}
+            body = client.get("/user/history", params=params).json()
+            seen.extend(a["set"] for a in body["attempts"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        for bad in ("!!", ["x", "y"], [1, 2], ["2025-01-01T00:00:00Z", "a1"], {"a": 1}):
+            if not isinstance(bad, str):
+                raw = json.dumps(bad).encode()
+                bad = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+            assert client.get("/user/history", params={"cursor": bad}).status_code == 400
+        assert [a["set"] for a in client.get("/user/history?page=2&page_size=3").json()["attempts"]] == ["3", "2", "1"]
+    assert seen == ["6", "5", "4", "3", "2", "1", "0"]
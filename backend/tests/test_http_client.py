@@ -1,18 +1,27 @@
+import asyncio
+
 import httpx
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from backend.http_client import get_client, close_client
+from backend.http_client import (
+    close_async_client,
+    close_client,
+    get_async_client,
+    get_client,
+)
 
 
-def _lifespan(transport):
+def _lifespan(transport, async_transport=None):
     from contextlib import asynccontextmanager
 
     @asynccontextmanager
     async def lifespan(app):
         get_client(transport=transport)
+        get_async_client(transport=async_transport)
         yield
         close_client()
+        await close_async_client()
 
     return lifespan
 
@@ -22,8 +31,11 @@ def test_client_closed_on_shutdown():
     app = FastAPI(lifespan=_lifespan(transport))
     with TestClient(app):
         client = get_client()
+        async_client = get_async_client()
         assert not client.is_closed
+        assert not async_client.is_closed
     assert client.is_closed
+    assert async_client.is_closed
 
 
 def test_retry_on_read_error():
@@ -42,3 +54,35 @@ def test_retry_on_read_error():
     assert resp.json() == {"ok": True}
     assert calls["n"] == 2
     close_client()
+
+
+def test_async_retry_and_concurrent_requests():
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        if request.url.path.endswith("/flaky") and calls["n"] == 1:
+            raise httpx.ReadError("boom", request=request)
+        if request.url.path.endswith("/busy"):
+            return httpx.Response(503)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    async def run():
+        client = get_async_client(transport=httpx.MockTransport(handler))
+        try:
+            first = await client.get("/flaky")
+            assert first.json()["path"].endswith("/flaky")
+            assert calls["n"] == 2
+            pages = await asyncio.gather(*(client.get(f"/t{i}") for i in range(5)))
+            assert [r.status_code for r in pages] == [200] * 5
+            try:
+                await client.post("/busy")
+            except httpx.HTTPStatusError as exc:
+                assert exc.response.status_code == 503
+            else:  # pragma: no cover
+                raise AssertionError("expected HTTPStatusError")
+            assert calls["n"] == 8
+        finally:
+            await close_async_client()
+
+    asyncio.run(run())
@@ -0,0 +1,141 @@
+import asyncio
+import io
+import json
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services import import_jobs, translator
+
+
+def _item(i, **extra):
+    item = {
+        "id": i,
+        "question": f"問題{i}",
+        "options": ["1", "2", "3", "4"],
+        "answer": 1,
+        "irt": {"a": 1.0, "b": 0.0},
+    }
+    item.update(extra)
+    return item
+
+
+def _fake_translate(calls):
+    async def fake(items, src, tgt, model=None, batch_size=None, system_hint=None):
+        calls.append((tgt, len(items)))
+        return [
+            {
+                "prompt": f"{tgt}:{q['prompt']}",
+                "options": [f"{tgt}:{o}" for o in q["options"]],
+                "answer_index": q["answer_index"],
+                "explanation": "",
+            }
+            for q in items
+        ]
+
+    return fake
+
+
+def test_iter_json_array_across_small_reads():
+    data = [{"q": "日本語テキスト", "n": 12345}, 67890, "x,]", [1, 2], None]
+    raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    assert list(import_jobs.iter_json_array(io.BytesIO(raw), read_size=3)) == data
+    assert list(import_jobs.iter_json_array(io.BytesIO(b" [ ] "))) == []
+
+
+def test_iter_json_array_rejects_bad_input():
+    for raw in (b'{"a": 1}', b'[{"a": 1}', b'[{"a": 1} {"b": 2}]', b""):
+        try:
+            list(import_jobs.iter_json_array(io.BytesIO(raw), read_size=4))
+        except import_jobs.ImportFormatError:
+            continue
+        raise AssertionError(raw)
+
+
+def test_run_import_chunks_and_translates(monkeypatch, fake_supabase):
+    calls = []
+    monkeypatch.setattr(translator, "translate_batch", _fake_translate(calls))
+    inserts = []
+    original = fake_supabase.table
+
+    def table(name):
+        t = original(name)
+        real_insert = t.insert
+
+        def insert(data, returning=None):
+            inserts.append(len(data) if isinstance(data, list) else 1)
+            return real_insert(data, returning)
+
+        t.insert = insert
+        return t
+
+    monkeypatch.setattr(fake_supabase, "table", table)
+
+    items = [_item(i) for i in range(5)] + [_item(5, answer=9), _item(6, lang="en")]
+    fp = io.BytesIO(json.dumps(items).encode())
+    job = import_jobs.create_job("q.json")
+    asyncio.run(
+        import_jobs.run_import(job, fp, fake_supabase, ["en", "ko"], chunk_size=3, workers=2)
+    )
+
+    rows = fake_supabase.tables["questions"]
+    assert job.status == "completed_with_errors"
+    assert job.parsed == 7
+    assert [e["item"] for e in job.errors] == [5]
+    assert len([r for r in rows if r["lang"] == "ja"]) == 5
+    assert len([r for r in rows if r["lang"] == "ko"]) == 5
+    assert job.inserted == len(rows) == 16
+    assert job.translated == 10 and job.pending_translations == 0
+    # Three base chunks plus one translated chunk per language per ja chunk.
+    assert len(inserts) == 3 + 2 * 2
+    assert sorted(calls) == [("en", 2), ("en", 3), ("ko", 2), ("ko", 3)]
+    ko = next(r for r in rows if r["lang"] == "ko" and r["orig_id"] == 0)
+    ja = next(r for r in rows if r["lang"] == "ja" and r["orig_id"] == 0)
+    assert ko["group_id"] == ja["group_id"] and ko["question"] == "ko:問題0"
+
+
+def test_import_endpoint_reports_progress(monkeypatch, fake_supabase):
+    from main import app
+    from routes import admin_import_questions
+    from routes.dependencies import require_admin
+
+    monkeypatch.setattr(translator, "translate_batch", _fake_translate([]))
+    monkeypatch.setattr(admin_import_questions, "get_supabase_client", lambda: fake_supabase)
+    monkeypatch.setattr(admin_import_questions, "target_languages", ["en"])
+    app.dependency_overrides[require_admin] = lambda: True
+    try:
+        client = TestClient(app)
+        body = json.dumps([_item(0), {"id": 1}]).encode()
+        r = client.post("/admin/import_questions", files={"file": ("q.json", body)})
+        assert r.status_code == 202
+        job_id = r.json()["job_id"]
+
+        status = client.get(f"/admin/import_jobs/{job_id}").json()
+        assert status["status"] == "completed_with_errors"
+        assert status["inserted"] == 2 and status["errors"] == 1
+        errors = client.get(f"/admin/import_jobs/{job_id}/errors").json()
+        assert errors["errors"][0]["error"] == "Missing keys in item 1"
+
+        r = client.post("/admin/import_questions", files={"file": ("q.json", b'{"a": 1}')})
+        assert r.status_code == 400
+        assert client.get("/admin/import_jobs/missing").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_translate_questions_uses_import_model_and_prompt(monkeypatch):
+    seen = {}
+
+    async def fake(items, src, tgt, model=None, batch_size=None, system_hint=None):
+        seen.update(src=src, tgt=tgt, model=model, hint=system_hint)
+        return []
+
+    monkeypatch.setattr(translator, "translate_batch", fake)
+    asyncio.run(import_jobs.translate_questions([], "de"))
+    assert seen["src"] == "ja" and seen["tgt"] == "de"
+    assert seen["model"] == import_jobs.IMPORT_TRANSLATION_MODEL
+    assert "German" in seen["hint"]
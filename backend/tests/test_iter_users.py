@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend import db
+
+
+def test_iter_users_pages_with_keyset_and_projection(monkeypatch, fake_supabase):
+    for i in range(7):
+        fake_supabase.table("app_users").insert(
+            {"id": f"id{i}", "hashed_id": f"h{i}", "scores": [{"iq": 100 + i}], "party_log": []}
+        ).execute()
+    selects = []
+    table_cls = type(fake_supabase.table("app_users"))
+    original = table_cls.select
+
+    def select(self, *columns):
+        selects.append(columns)
+        return original(self, *columns)
+
+    monkeypatch.setattr(table_cls, "select", select)
+
+    pages = db.iter_users("hashed_id, scores", page_size=3)
+    first = next(pages)
+    assert first["hashed_id"] == "h0"
+    assert len(selects) == 1
+    rest = list(pages)
+    assert [u["hashed_id"] for u in [first, *rest]] == [f"h{i}" for i in range(7)]
+    assert selects == [("hashed_id,scores,id",)] * 3
@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.deps import supabase_jwt
+
+
+def _keypair(kid):
+    private = ec.generate_private_key(ec.SECP256R1())
+    jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(private.public_key()))
+    jwk.update({"kid": kid, "alg": "ES256", "use": "sig"})
+    return private, jwk
+
+
+def _token(private, kid, sub="u1"):
+    return jwt.encode({"sub": sub}, private, algorithm="ES256", headers={"kid": kid})
+
+
+class _Endpoint:
+    def __init__(self, *jwks):
+        self.keys = list(jwks)
+        self.calls = 0
+        self.down = False
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(0.01)
+        if self.down:
+            raise RuntimeError("jwks endpoint down")
+        return {"keys": list(self.keys)}
+
+
+def _install(monkeypatch, endpoint, **kwargs):
+    cache = supabase_jwt.JWKSCache("https://example.test/jwks", fetch=endpoint, **kwargs)
+    monkeypatch.setattr(supabase_jwt, "_jwks_cache", cache)
+    monkeypatch.setattr(supabase_jwt, "SUPABASE_JWKS_URL", "https://example.test/jwks")
+    return cache
+
+
+def test_verification_is_in_memory_after_first_fetch(monkeypatch):
+    private, jwk = _keypair("k1")
+    endpoint = _Endpoint(jwk)
+    _install(monkeypatch, endpoint)
+
+    for _ in range(5):
+        assert supabase_jwt.decode_supabase_jwt(_token(private, "k1"))["sub"] == "u1"
+    assert endpoint.calls == 1
+
+
+def test_unknown_kid_refetches_once_for_a_burst(monkeypatch):
+    old_private, old_jwk = _keypair("old")
+    new_private, new_jwk = _keypair("new")
+    endpoint = _Endpoint(old_jwk)
+    cache = _install(monkeypatch, endpoint, min_refresh_interval=0)
+    cache.refresh()
+    endpoint.keys.append(new_jwk)
+
+    token = _token(new_private, "new")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(supabase_jwt.decode_supabase_jwt(token)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 8
+    assert endpoint.calls == 2
+
+
+def test_stale_keys_served_when_endpoint_down(monkeypatch):
+    private, jwk = _keypair("k1")
+    endpoint = _Endpoint(jwk)
+    cache = _install(monkeypatch, endpoint, ttl=0, min_refresh_interval=0)
+    cache.refresh()
+    endpoint.down = True
+
+    assert supabase_jwt.decode_supabase_jwt(_token(private, "k1"))["sub"] == "u1"
+    time.sleep(0.05)
+    assert supabase_jwt.decode_supabase_jwt(_token(private, "k1"))["sub"] == "u1"
+    assert endpoint.calls >= 2
+
+    other, _ = _keypair("k2")
+    with pytest.raises(HTTPException):
+        supabase_jwt.decode_supabase_jwt(_token(other, "k2"))
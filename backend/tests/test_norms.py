@@ -0,0 +1,78 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.irt import percentile
+from backend.services.norms import Norms, NormSketch
+
+
+def _exact(values, x):
+    return 100 * sum(1 for v in values if v <= x) / len(values)
+
+
+def test_sketch_percentile_close_to_exact():
+    rng = random.Random(7)
+    values = [rng.gauss(0, 1) for _ in range(20000)]
+    sketch = NormSketch()
+    sketch.update(values)
+    for x in (-2.5, -1.0, -0.1, 0.0, 0.7, 1.96, 3.0):
+        assert abs(sketch.percentile(x) - _exact(values, x)) < 0.5
+
+
+def test_sketch_merge_matches_combined():
+    rng = random.Random(1)
+    a_vals = [rng.gauss(-0.5, 1) for _ in range(3000)]
+    b_vals = [rng.gauss(0.5, 1) for _ in range(2000)]
+    a, b, both = NormSketch(), NormSketch(), NormSketch()
+    a.update(a_vals)
+    b.update(b_vals)
+    both.update(a_vals + b_vals)
+    a.merge(b)
+    assert a.counts == both.counts
+    assert a.percentile(0.2) == both.percentile(0.2)
+
+
+def test_sketch_round_trip_and_clamp():
+    sketch = NormSketch()
+    sketch.update([-20.0, 0.0, 20.0])
+    restored = NormSketch.from_dict(sketch.to_dict())
+    assert restored.counts == sketch.counts
+    assert restored.total == 3
+    assert restored.percentile(10.0) == 100
+    assert NormSketch().percentile(1.0) == 50.0
+
+
+def test_irt_percentile_accepts_norms():
+    norms = Norms(path="")
+    norms.replace([-1.0, 0.0, 1.0, 2.0])
+    assert percentile(1.5, norms) == norms.percentile(1.5)
+    assert percentile(1.5, [-1.0, 0.0, 1.0, 2.0]) == 75.0
+
+
+def test_workers_share_scores_through_file(tmp_path):
+    path = str(tmp_path / "sketch.json")
+    first = Norms(path=path, flush_interval=3600)
+    first.replace([0.0] * 10)
+    second = Norms(path=path, flush_interval=3600)
+    assert second.sketch.total == 10
+
+    first.record(1.0)
+    second.record(-1.0)
+    second.record(-1.0)
+    first.flush()
+    second.flush()
+    assert second.sketch.total == 13
+    first.flush()
+    assert first.sketch.total == 13
+    assert Norms(path=path).sketch.counts == first.sketch.counts
+
+
+def test_record_flushes_when_due(tmp_path):
+    path = str(tmp_path / "sketch.json")
+    norms = Norms(path=path, flush_interval=0)
+    norms.replace([])
+    norms.record(0.5)
+    assert Norms(path=path).sketch.total == 1
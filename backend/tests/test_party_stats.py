@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services import party_stats
+
+
+def test_scores_and_moves_update_counters():
+    agg = party_stats.PartyAggregates()
+    agg.record_score([1, 2], None, {"count": 1, "sum": 100})
+    agg.record_score([1], None, {"count": 2, "sum": 240})
+    assert agg.parties()[1].count == 2
+    assert agg.parties()[1].total == 220
+
+    # Second score for the first user: average 100 -> 110, still one user.
+    agg.record_score([1, 2], {"count": 1, "sum": 100}, {"count": 2, "sum": 220})
+    assert agg.parties()[1].total == 230
+    assert agg.parties()[2].count == 1
+
+    agg.move([1, 2], [3], {"count": 2, "sum": 220})
+    parties = agg.parties()
+    assert 2 not in parties
+    assert parties[1].count == 1 and parties[1].total == 120
+    assert parties[3].mean == 110
+
+    agg.move([], [4], None)
+    assert 4 not in agg.parties()
+
+
+def test_rebuild_matches_full_scan(fake_supabase):
+    users = [
+        {"hashed_id": "a", "party_log": [{"party_ids": [1]}, {"party_ids": [2]}], "scores": [{"iq": 100}, {"iq": 120}]},
+        {"hashed_id": "b", "party_log": [{"party_ids": [2, 3]}], "score_summary": {"best": 90, "latest": 90, "count": 1, "sum": 90, "sum_sq": 8100}},
+        {"hashed_id": "c", "party_log": [{"party_ids": [3]}]},
+        {"hashed_id": "d", "scores": [{"iq": 130}]},
+    ]
+    for u in users:
+        fake_supabase.table("app_users").insert(u).execute()
+    agg = party_stats.PartyAggregates()
+    assert agg.rebuild()
+    parties = agg.parties()
+    assert sorted(parties) == [2, 3]
+    assert (parties[2].count, parties[2].total) == (2, 200)
+    assert (parties[3].count, parties[3].total) == (1, 90)
+
+
+def test_party_change_moves_user(monkeypatch, fake_supabase):
+    import party
+
+    monkeypatch.setattr(party_stats, "_aggregates", None)
+    past = (datetime.utcnow() - timedelta(days=40)).isoformat()
+    fake_supabase.table("app_users").insert(
+        {
+            "hashed_id": "u1",
+            "party_log": [{"timestamp": past, "party_ids": [1]}],
+            "scores": [{"iq": 110}],
+        }
+    ).execute()
+    agg = party_stats.get_party_aggregates()
+    assert agg.parties()[1].count == 1
+
+    asyncio.run(party.update_party_affiliation("u1", [5]))
+    parties = agg.parties()
+    assert 1 not in parties
+    assert parties[5].total == 110
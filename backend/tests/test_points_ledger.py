@@ -0,0 +1,108 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend import db
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _FakeRpc:
+    """Mimics the points_* SQL functions on top of the dummy tables."""
+
+    def __init__(self, supa):
+        self.supa = supa
+        self.calls = []
+
+    def __call__(self, name, params):
+        self.calls.append(name)
+        users = {u["hashed_id"]: u for u in self.supa.tables.get("app_users", [])}
+        user = users.get(params["p_user_id"])
+        ledger = self.supa.tables.setdefault("point_ledger", [])
+        data = None
+        if user is not None:
+            if name == "points_credit":
+                done = params["p_once_per_day"] and any(
+                    r["user_id"] == user["hashed_id"] and r["reason"] == params["p_reason"]
+                    for r in ledger
+                )
+                if not done:
+                    ledger.append({"user_id": user["hashed_id"], "delta": params["p_delta"], "reason": params["p_reason"]})
+                    user["points"] = user.get("points", 0) + params["p_delta"]
+                data = user["points"]
+            elif name == "points_spend":
+                if user.get("points", 0) >= params["p_amount"]:
+                    user["points"] -= params["p_amount"]
+                    ledger.append({"user_id": user["hashed_id"], "delta": -params["p_amount"], "reason": params["p_reason"]})
+                    data = user["points"]
+            else:
+                data = user.get("points", 0)
+        return type("Q", (), {"execute": lambda _self: _Result(data)})()
+
+
+def _count_tables(monkeypatch, supa):
+    calls: list[str] = []
+    original = supa.from_
+
+    def from_(name):
+        calls.append(name)
+        return original(name)
+
+    monkeypatch.setattr(supa, "from_", from_)
+    return calls
+
+
+def test_points_use_one_rpc_per_operation(monkeypatch, fake_supabase):
+    rpc = _FakeRpc(fake_supabase)
+    fake_supabase.rpc = rpc
+    fake_supabase.table("app_users").insert({"hashed_id": "u1", "points": 3}).execute()
+    tables = _count_tables(monkeypatch, fake_supabase)
+
+    assert db.credit_points("u1", 2, "ad", once_per_day=True) == 5
+    assert db.credit_points("u1", 2, "ad", once_per_day=True) == 5
+    assert db.spend_points("u1", 4) == 1
+    assert db.spend_points("u1", 4) is None
+    assert db.point_balance("u1") == 1
+    assert rpc.calls == ["points_credit", "points_credit", "points_spend", "points_spend", "points_balance"]
+    assert "point_ledger" not in tables
+    assert [r["delta"] for r in fake_supabase.tables["point_ledger"]] == [2, -4]
+
+
+def test_credit_unknown_user_returns_none(fake_supabase):
+    fake_supabase.rpc = _FakeRpc(fake_supabase)
+    assert db.credit_points("ghost", 1, "ad") is None
+    assert fake_supabase.tables.get("point_ledger", []) == []
+
+
+def test_fallback_without_database_functions(fake_supabase):
+    fake_supabase.table("app_users").insert({"hashed_id": "u2", "points": 1}).execute()
+    fake_supabase.table("point_ledger").insert({"user_id": "u2", "delta": 1, "reason": "signup"}).execute()
+    assert db.insert_point_ledger("u2", 2, "ad") == 3
+    assert db.spend_points("u2", 5) is None
+    assert db.point_balance("u2") == 3
+
+
+def test_signup_reward_checked_once_per_user(monkeypatch, fake_supabase):
+    fake_supabase.table("app_users").insert({"hashed_id": "u4", "points": 0}).execute()
+    fake_supabase.table("app_users").insert(
+        {"hashed_id": "u5", "points": 2, "signup_reward_granted": True}
+    ).execute()
+    tables = _count_tables(monkeypatch, fake_supabase)
+
+    assert db.get_points("u5") == 2
+    assert tables == ["app_users"]
+
+    tables.clear()
+    assert db.get_points("u4") == 1
+    assert "point_ledger" in tables
+    tables.clear()
+    db.invalidate_user("u4")
+    assert db.get_points("u4") == 1
+    assert tables == ["app_users"]
+    signup = [r for r in fake_supabase.tables["point_ledger"] if r["reason"] == "signup"]
+    assert len(signup) == 1
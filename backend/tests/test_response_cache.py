@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+
+from fastapi import FastAPI, Header
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.utils.response_cache import CacheRule, ResponseCacheMiddleware
+
+
+def make_app(**kwargs):
+    calls = []
+    app = FastAPI()
+
+    @app.get("/stats/{name}")
+    async def stats(name: str, authorization: str = Header(None)):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return {"name": name, "n": len(calls), "auth": authorization}
+
+    @app.get("/missing")
+    async def missing():
+        calls.append("missing")
+        return {}
+
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        rules=[CacheRule.path(r"/stats/[^/]+", vary_on_auth=True)],
+        **kwargs,
+    )
+    return app, calls
+
+
+def test_hits_and_conditional_requests_skip_handler():
+    app, calls = make_app()
+    client = TestClient(app)
+    first = client.get("/stats/a?x=1&y=2")
+    etag = first.headers["etag"]
+    assert client.get("/stats/a?y=2&x=1").json() == first.json()
+    assert calls == ["a"]
+
+    r = client.get("/stats/a?x=1&y=2", headers={"If-None-Match": f'"{etag}"'})
+    assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+    assert calls == ["a"]
+
+    assert client.get("/stats/a?x=1&y=2", headers={"Authorization": "Bearer t"}).json()["auth"] == "Bearer t"
+    client.get("/missing")
+    client.get("/missing")
+    assert calls == ["a", "a", "missing", "missing"]
+
+
+def test_stale_entries_are_served_while_revalidating():
+    app, calls = make_app(ttl=0, stale_while_revalidate=60)
+    with TestClient(app) as client:
+        assert client.get("/stats/a").json()["n"] == 1
+        # Expired: the stale copy is returned and one refresh runs behind it.
+        assert client.get("/stats/a").json()["n"] == 1
+        client.portal.call(asyncio.sleep, 0.05)
+        assert client.get("/stats/a").json()["n"] == 2
+
+
+def test_concurrent_misses_share_one_handler_call():
+    app, calls = make_app()
+    received = []
+
+    async def run():
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        def request():
+            async def send(message):
+                received.append(message)
+
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": "/stats/b",
+                "raw_path": b"/stats/b",
+                "query_string": b"",
+                "headers": [],
+                "scheme": "http",
+                "server": ("test", 80),
+                "client": ("test", 1),
+                "root_path": "",
+                "http_version": "1.1",
+            }
+            return app(scope, receive, send)
+
+        await asyncio.gather(*(request() for _ in range(5)))
+
+    asyncio.run(run())
+    assert calls == ["b"]
+    assert [m["status"] for m in received if m["type"] == "http.response.start"] == [200] * 5
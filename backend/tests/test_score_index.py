@@ -0,0 +1,62 @@
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services import score_index
+
+
+def test_record_keeps_best_and_counters():
+    index = score_index.ScoreIndex()
+    assert index.record("a", 100)
+    assert index.record("b", 112)
+    assert not index.record("a", 90)
+    assert index.record("a", 121)
+    assert index.best("a") == 121
+    assert index.histogram() == [(110, 1), (120, 1)]
+    assert index.summary() == (2, 233)
+    assert index.percentile(112) == 50
+    assert index.percentile(121) == 100
+
+
+def test_reconcile_pages_and_keeps_concurrent_records(monkeypatch, fake_supabase):
+    for i, iq in enumerate([95, 101, 104, 130, 88]):
+        fake_supabase.table("user_best_iq").insert({"user_id": f"u{i}", "best_iq": iq}).execute()
+    index = score_index.ScoreIndex()
+    index.record("stale", 150)
+    real = score_index._iter_best_iq
+
+    def iter_with_submit(page_size):
+        # A submit lands while the table is being read.
+        index.record("u4", 140)
+        return real(page_size)
+
+    monkeypatch.setattr(score_index, "_iter_best_iq", iter_with_submit)
+    assert index.reconcile(page_size=2)
+    assert index.best("stale") is None
+    assert index.best("u4") == 140
+    assert index.histogram() == [(95, 1), (100, 2), (130, 1), (140, 1)]
+    assert index.percentile(104) == 60
+
+
+def test_stats_endpoints_read_from_index(monkeypatch, fake_supabase):
+    from main import app
+
+    for i, iq in enumerate([90, 96, 99, 113]):
+        fake_supabase.table("user_best_iq").insert({"user_id": f"u{i}", "best_iq": iq}).execute()
+    monkeypatch.setattr(score_index, "_index", None)
+    client = TestClient(app)
+
+    hist = client.get("/stats/iq_histogram", params={"user_id": "u2"}).json()
+    assert hist["bucket_edges"] == [90, 95, 100, 105, 110, 115]
+    assert hist["histogram"] == [1, 2, 0, 0, 1]
+    assert hist["user_score"] == 99 and hist["user_percentile"] == 75
+
+    score_index.get_score_index(fresh=False).record("u0", 120)
+    dist = client.get("/stats/distribution", params={"user_id": "u0"}).json()
+    assert dist["histogram"] == [{"bin": 95, "count": 2}, {"bin": 110, "count": 1}, {"bin": 120, "count": 1}]
+    assert dist["percentile"] == 100
+    assert dist["mean"] is None
@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend import db
+
+
+def test_legacy_rows_are_summarised_from_inline_scores():
+    user = {"scores": [{"iq": 100}, {"iq": 120}, {"iq": 110}]}
+    assert db.score_summary(user) == {
+        "best": 120,
+        "latest": 110,
+        "count": 3,
+        "sum": 330,
+        "sum_sq": 100**2 + 120**2 + 110**2,
+    }
+    assert db.score_summary({"scores": []}) is None
+
+
+def test_record_score_keeps_row_size_constant(monkeypatch, fake_supabase):
+    monkeypatch.setattr(db, "SCORE_RING_SIZE", 3)
+    fake_supabase.table("app_users").insert(
+        {"hashed_id": "u1", "plays": 2, "scores": [{"iq": 90, "percentile": 20}, {"iq": 130, "percentile": 95}]}
+    ).execute()
+
+    for iq in (100, 105, 95):
+        user = db.get_user("u1")
+        db.record_score(fake_supabase, user, iq, 50, session_id=f"s{iq}")
+
+    row = db.get_user("u1")
+    assert [s["iq"] for s in row["scores"]] == [100, 105, 95]
+    assert row["plays"] == 5
+    assert row["score_summary"] == {
+        "best": 130,
+        "latest": 95,
+        "count": 5,
+        "sum": 520,
+        "sum_sq": 90**2 + 130**2 + 100**2 + 105**2 + 95**2,
+    }
+    history = fake_supabase.tables["user_scores"]
+    assert [(r["session_id"], r["iq"]) for r in history] == [("s100", 100), ("s105", 105), ("s95", 95)]
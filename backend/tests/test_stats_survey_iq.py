@@ -39,3 +39,37 @@ def test_survey_iq_by_option(fake_supabase):
         assert abs(items[0]["avg_iq"] - 90.0) < 0.01
         assert items[1]["count"] == 1
         assert items[1]["avg_iq"] == 80
+
+
+def test_fallback_looks_up_only_answering_users(monkeypatch, fake_supabase):
+    from backend.routes import stats
+
+    app = FastAPI()
+    app.include_router(stats_router)
+    supa = fake_supabase
+    monkeypatch.setattr(stats, "ANSWER_PAGE_SIZE", 2)
+    supa.table("surveys").insert({"id": "s1", "title": "S1"}).execute()
+    supa.table("survey_items").insert({"id": "i1", "survey_id": "s1", "position": 0, "body": "A"}).execute()
+    supa.table("m_user_best_iq").insert({"user_id": "u1", "best_iq": 120}).execute()
+    supa.table("user_best_iq_unified").insert(
+        [{"user_id": f"u{i}", "best_iq": 90 + i} for i in range(1, 50)]
+    ).execute()
+    supa.table("survey_answers").insert(
+        [{"user_id": u, "survey_id": "s1", "survey_item_id": "i1"} for u in ("u1", "u2", "u3", "u2", "ghost")]
+    ).execute()
+    lookups = []
+    table_cls = type(supa.table("m_user_best_iq"))
+    original = table_cls.execute
+
+    def execute(self):
+        if self._select and self.name in ("m_user_best_iq", "user_best_iq_unified"):
+            lookups.append(next(v for op, _c, v in self._filters if op == "in"))
+        return original(self)
+
+    monkeypatch.setattr(table_cls, "execute", execute)
+    with TestClient(app) as client:
+        item = client.get("/stats/surveys/s1/iq_by_option").json()["items"][0]
+    assert item["count"] == 4
+    assert item["avg_iq"] == (120 + 92 + 93 + 92) / 4
+    assert all(len(ids) <= 2 for ids in lookups)
+    assert sorted(u for ids in lookups for u in ids if u != "ghost") == ["u1", "u2", "u2", "u3", "u3"]
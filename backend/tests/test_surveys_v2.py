@@ -108,6 +108,41 @@ def test_translation_fanout(fake_supabase, monkeypatch):
         assert len(s_items) == 2
         assert all(it.get("lang") == s["lang"] for it in s_items)
 
+def test_update_reuses_unchanged_translations(fake_supabase, monkeypatch):
+    app.dependency_overrides[require_admin] = lambda: True
+    prompts: list[str] = []
+
+    def fake_translate(prompt):
+        prompts.append(prompt)
+        return "T"
+
+    monkeypatch.setattr("backend.routes.admin_surveys.translate_with_openai", fake_translate)
+    monkeypatch.setattr("routes.admin_surveys.translate_with_openai", fake_translate)
+    client = TestClient(app)
+    payload = {
+        "title": "Title",
+        "question_text": "What?",
+        "type": "sa",
+        "lang": "ja",
+        "items": [{"body": "A"}, {"body": "B"}],
+    }
+    r = client.post("/admin/surveys", json=payload)
+    assert r.status_code == 201
+    survey_id = r.json()["id"]
+    assert len(prompts) == 4 * len(SUPPORTED_LANGS)
+
+    prompts.clear()
+    payload["items"] = [{"body": "A"}, {"body": "C"}]
+    r = client.put(f"/admin/surveys/{survey_id}", json=payload)
+    assert r.status_code == 200
+    assert len(prompts) == len(SUPPORTED_LANGS)
+    assert all("C" in p for p in prompts)
+    surveys = fake_supabase.tables["surveys"]
+    assert len(surveys) == 1 + len(SUPPORTED_LANGS)
+    items = fake_supabase.tables["survey_items"]
+    assert len(items) == 2 * len(surveys)
+
+
 def test_admin_crud_and_user_flow(fake_supabase):
     app.dependency_overrides[require_admin] = lambda: True
     client = TestClient(app)
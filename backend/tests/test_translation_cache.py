@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.translation_cache import TranslationCache
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    calls = []
+
+    def translate():
+        calls.append(1)
+        return "こんにちは"
+
+    first = TranslationCache(path)
+    assert first.get_or_translate("hello", "en", "ja", "gpt-5", "1", translate) == "こんにちは"
+    assert first.get_or_translate("hello", "en", "ja", "gpt-5", "1", translate) == "こんにちは"
+    assert len(calls) == 1
+
+    second = TranslationCache(path)
+    assert second.get("hello", "en", "ja", "gpt-5", "1") == "こんにちは"
+    assert second.get("hello", "en", "ja", "gpt-5", "2") is None
+    assert second.get("hello", "en", "ja", "gpt-4o", "1") is None
+
+
+def test_empty_results_are_not_cached():
+    cache = TranslationCache(None)
+    assert cache.get_or_translate("hello", "en", "ja", "m", "1", lambda: "") == ""
+    assert cache.get("hello", "en", "ja", "m", "1") is None
@@ -1,13 +1,131 @@
 import asyncio
+import json
+
+import httpx
+from openai import RateLimitError
+
 from backend.services import translator
 
 
 def test_normalize_preserves_answer_index(monkeypatch):
     q = {"prompt": "1+1=?", "options": ["1", "2", "3"], "answer_index": 1, "explanation": ""}
 
-    async def fake_translate_one(q, src_lang, tgt_lang, model=None):
+    async def fake_translate_one(q, src_lang, tgt_lang, model=None, system_hint=None):
         return {"prompt": "１＋１＝？", "options": ["１", "２", "３"], "answer_index": 1, "explanation": ""}
 
     monkeypatch.setattr(translator, "translate_one", fake_translate_one)
-    out = asyncio.run(translator.translate_batch([q], "en", "ja"))
+    out = asyncio.run(translator.translate_batch([q], "en", "ja", batch_size=1))
     assert out[0]["answer_index"] == 1
+
+
+class _Resp:
+    def __init__(self, text):
+        self.output_text = text
+
+
+def test_translate_batch_uses_one_request_per_chunk(monkeypatch):
+    calls = []
+
+    def fake_create(**kwargs):
+        items = json.loads(kwargs["input"])["items"]
+        calls.append(len(items))
+        out = [
+            {
+                "index": it["index"],
+                "prompt": f"T:{it['prompt']}",
+                "options": [f"T:{o}" for o in it["options"]],
+                "explanation": "",
+            }
+            for it in items
+            if it["prompt"] != "bad"
+        ]
+        return _Resp(json.dumps({"items": out}))
+
+    fallbacks = []
+
+    async def fake_translate_one(q, src_lang, tgt_lang, model=None, system_hint=None):
+        fallbacks.append(q["prompt"])
+        return {"prompt": "F", "options": ["F"] * len(q["options"]), "answer_index": q["answer_index"], "explanation": ""}
+
+    monkeypatch.setattr(translator.translation._client.responses, "create", fake_create)
+    monkeypatch.setattr(translator, "translate_one", fake_translate_one)
+    qs = [{"prompt": f"q{i}", "options": ["a", "b"], "answer_index": 1} for i in range(45)]
+    qs[7]["prompt"] = "bad"
+    out = asyncio.run(translator.translate_batch(qs, "ja", "en", batch_size=20))
+
+    assert calls == [20, 20, 5]
+    assert fallbacks == ["bad"]
+    assert len(out) == 45
+    assert out[0] == {"prompt": "T:q0", "options": ["T:a", "T:b"], "answer_index": 1, "explanation": ""}
+    assert out[7]["prompt"] == "F"
+
+
+def _echo_batch(kwargs, prefix="T:"):
+    items = json.loads(kwargs["input"])["items"]
+    out = [
+        {
+            "index": it["index"],
+            "prompt": prefix + it["prompt"],
+            "options": [prefix + o if o else "" for o in it["options"]],
+            "explanation": prefix + it["explanation"] if it["explanation"] else "",
+        }
+        for it in items
+    ]
+    return _Resp(json.dumps({"items": out}))
+
+
+def test_translate_batch_reuses_cached_questions(monkeypatch):
+    sent = []
+
+    def fake_create(**kwargs):
+        sent.append([it["prompt"] for it in json.loads(kwargs["input"])["items"]])
+        return _echo_batch(kwargs)
+
+    monkeypatch.setattr(translator.translation._client.responses, "create", fake_create)
+    qs = [
+        {"prompt": "q0", "options": ["a", ""], "answer_index": 0, "explanation": "why"},
+        {"prompt": "q1", "options": ["c", "d"], "answer_index": 1},
+    ]
+    first = asyncio.run(translator.translate_batch(qs, "ja", "en", batch_size=20))
+    assert sent == [["q0", "q1"]]
+    assert first[0] == {"prompt": "T:q0", "options": ["T:a", ""], "answer_index": 0, "explanation": "T:why"}
+
+    qs.append({"prompt": "q2", "options": ["a", "d"], "answer_index": 0})
+    again = asyncio.run(translator.translate_batch(qs, "ja", "en", batch_size=20))
+    assert sent[1:] == [["q2"]]
+    assert again[:2] == first
+    cache = translator.get_translation_cache()
+    model = translator.translation._MODEL
+    assert cache.get("q2", "ja", "en", model, translator.BATCH_PROMPT_VERSION) == "T:q2"
+
+
+def test_rate_limited_batch_is_retried(monkeypatch):
+    calls = []
+
+    def fake_create(**kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+            raise RateLimitError("slow down", response=httpx.Response(429, request=request), body=None)
+        return _echo_batch(kwargs)
+
+    async def no_fallback(q, src_lang, tgt_lang, model=None, system_hint=None):  # pragma: no cover
+        raise AssertionError("should not fall back")
+
+    drained = []
+    original_drain = translator._TokenBucket.drain
+
+    def drain(self):
+        drained.append(1)
+        original_drain(self)
+
+    monkeypatch.setattr(translator, "REQUESTS_PER_MINUTE", 6000)
+    monkeypatch.setattr(translator._TokenBucket, "drain", drain)
+    monkeypatch.setattr(translator.translation._client.responses, "create", fake_create)
+    monkeypatch.setattr(translator, "translate_one", no_fallback)
+    qs = [{"prompt": "r0", "options": ["x"], "answer_index": 0}]
+    out = asyncio.run(translator.translate_batch(qs, "ja", "en", batch_size=20))
+
+    assert len(calls) == 2
+    assert drained == [1]
+    assert out[0]["prompt"] == "T:r0"
@@ -1,3 +1,4 @@
+import itertools
 import re
 
 from backend.db import upsert_user
@@ -28,14 +29,37 @@ def test_upsert_user_retries_on_duplicate(monkeypatch, fake_supabase):
         {"id": "e1", "hashed_id": "e1", "username": "Silly Donkey 11111"}
     ).execute()
 
-    names = iter([
-        "Silly Donkey 11111",
-        "Silly Donkey 11111",
-        "Chilly Ferret 22222",
-    ])
+    names = itertools.chain(
+        ["Silly Donkey 11111", "Silly Donkey 11111"],
+        itertools.repeat("Chilly Ferret 22222"),
+    )
     monkeypatch.setattr(db, "_random_username", lambda: next(names))
 
     upsert_user("u2")
     users = [r for r in fake_supabase.tables["app_users"] if r["id"] == "u2"]
     assert users and users[0]["username"] == "Chilly Ferret 22222"
 
+
+
+def test_username_candidates_checked_in_one_query(monkeypatch, fake_supabase):
+    import backend.db as db
+
+    for i in range(3):
+        fake_supabase.table("app_users").insert(
+            {"id": f"t{i}", "hashed_id": f"t{i}", "username": f"Odd Yak 0000{i}"}
+        ).execute()
+    names = itertools.cycle([f"Odd Yak 0000{i}" for i in range(4)])
+    monkeypatch.setattr(db, "_random_username", lambda: next(names))
+    lookups = []
+    original_in = type(fake_supabase.table("app_users")).in_
+
+    def in_(self, column, values):
+        lookups.append((column, list(values)))
+        return original_in(self, column, values)
+
+    monkeypatch.setattr(type(fake_supabase.table("app_users")), "in_", in_)
+    upsert_user("fresh")
+    users = [r for r in fake_supabase.tables["app_users"] if r["id"] == "fresh"]
+    assert users[0]["username"] == "Odd Yak 00003"
+    assert lookups == [("username", [f"Odd Yak 0000{i}" for i in range(4)])]
+    assert db._taken_usernames.get("Odd Yak 00001")
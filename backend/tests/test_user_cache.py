@@ -0,0 +1,84 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend import db
+from backend.utils.cache import request_scope
+
+
+def _count_lookups(monkeypatch, supa):
+    calls: list[str] = []
+    original = supa.from_
+
+    def from_(name):
+        calls.append(name)
+        return original(name)
+
+    monkeypatch.setattr(supa, "from_", from_)
+    return calls
+
+
+def test_get_user_is_cached_by_id_and_hashed_id(monkeypatch, fake_supabase):
+    fake_supabase.table("app_users").insert({"id": "uuid1", "hashed_id": "h1", "points": 2}).execute()
+    calls = _count_lookups(monkeypatch, fake_supabase)
+
+    user = db.get_user("uuid1")
+    user["points"] = 99
+    assert db.get_user("h1")["points"] == 2
+    assert db.get_user("uuid1")["points"] == 2
+    assert calls == ["app_users"]
+
+
+def test_writes_invalidate_cached_user(monkeypatch, fake_supabase):
+    fake_supabase.table("app_users").insert({"id": "uuid1", "hashed_id": "h1", "points": 2}).execute()
+    assert db.get_user("uuid1")["points"] == 2
+
+    db.update_user(fake_supabase, "h1", {"points": 5})
+    assert db.get_user("uuid1")["points"] == 5
+    db.insert_point_ledger("h1", 1, "ad")
+    assert db.get_user("h1")["points"] == 6
+
+
+def test_request_scope_reuses_rows(monkeypatch, fake_supabase):
+    fake_supabase.table("app_users").insert({"id": "uuid1", "hashed_id": "h1"}).execute()
+    calls = _count_lookups(monkeypatch, fake_supabase)
+
+    with request_scope():
+        db.get_user("h1")
+        db._user_cache.clear()
+        db.get_user("uuid1")
+        assert calls == ["app_users"]
+    db._user_cache.clear()
+    db.get_user("h1")
+    assert calls == ["app_users", "app_users"]
+
+
+def test_unknown_users_are_negatively_cached(monkeypatch, fake_supabase):
+    calls = _count_lookups(monkeypatch, fake_supabase)
+
+    assert db.get_user("nobody") is None
+    assert db.get_user("nobody") is None
+    assert calls == ["app_users"]
+
+    db.create_user({"id": "nobody", "hashed_id": "nobody"})
+    assert db.get_user("nobody")["hashed_id"] == "nobody"
+
+
+def test_legacy_users_table_behind_switch(monkeypatch, fake_supabase):
+    fake_supabase.table("users").insert({"id": "old", "hashed_id": "old"}).execute()
+    assert db.get_user("old") is None
+
+    db.invalidate_user("old")
+    monkeypatch.setattr(db, "LEGACY_USERS_FALLBACK", True)
+    assert db.get_user("old")["hashed_id"] == "old"
+
+
+def test_id_alias_resolves_to_hashed_id(monkeypatch, fake_supabase):
+    fake_supabase.table("app_users").insert({"id": "uuid1", "hashed_id": "h1", "points": 1}).execute()
+    db.get_user("uuid1")
+    assert db._user_alias_cache.get("uuid1") == "h1"
+
+    db.update_user(fake_supabase, "h1", {"points": 4})
+    assert db.get_user("uuid1")["points"] == 4
@@ -0,0 +1,132 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.view_refresh import ViewRefreshScheduler
+
+MIGRATION = Path(__file__).resolve().parents[2] / "supabase" / "migrations" / "20251016_refresh_stats_views_v2.sql"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(refresh, **kwargs):
+    clock = Clock()
+    opts = {"write_threshold": 3, "debounce": 2, "max_staleness": 60, "clock": clock}
+    opts.update(kwargs)
+    return ViewRefreshScheduler(refresh, **opts), clock
+
+
+def test_threshold_waits_for_quiet_period():
+    calls = []
+    sched, clock = make_scheduler(lambda: calls.append(clock.now))
+    assert not sched.run_due()
+    sched.note_write(2)
+    assert sched.next_due() == 1060
+    sched.note_write()
+    clock.now += 1
+    sched.note_write()
+    assert not sched.run_due()
+    clock.now += 2
+    assert sched.run_due()
+    assert calls == [1003.0]
+    assert sched.status()["pending_writes"] == 0
+    assert sched.next_due() is None
+
+
+def test_max_staleness_and_failure_backoff():
+    outcomes = [RuntimeError("locked"), None]
+
+    def refresh():
+        result = outcomes.pop(0)
+        if result:
+            raise result
+
+    sched, clock = make_scheduler(refresh)
+    sched.note_write()
+    clock.now += 59
+    assert not sched.run_due()
+    clock.now += 1
+    assert sched.run_due()
+    status = sched.status()
+    assert status["last_error"] == "locked" and status["pending_writes"] == 1
+    assert not sched.run_due()
+    clock.now += 2
+    assert sched.run_due()
+    status = sched.status()
+    assert status["refreshes"] == 1 and status["last_error"] is None
+    assert status["last_refresh_age"] == 0 and status["last_refresh_duration"] == 0
+
+
+STAND_IN_SCHEMA = """
+create table user_best_iq (user_id text primary key, best_iq double precision);
+create table survey_answers (
+    id bigserial primary key,
+    user_id text,
+    survey_id text,
+    survey_group_id text,
+    survey_item_id text
+);
+create materialized view user_best_iq_unified_v2 as
+    select user_id, best_iq from user_best_iq;
+create unique index on user_best_iq_unified_v2 (user_id);
+create materialized view survey_choice_iq_stats_v2 as
+    select a.survey_group_id as group_id, a.survey_id, a.survey_item_id,
+           count(*) as responses_count, avg(b.best_iq) as avg_iq
+    from survey_answers a join user_best_iq b using (user_id)
+    group by 1, 2, 3;
+create unique index on survey_choice_iq_stats_v2 (survey_id, survey_item_id);
+create materialized view survey_group_choice_iq_stats_v2 as
+    select * from survey_choice_iq_stats_v2;
+create unique index on survey_group_choice_iq_stats_v2 (survey_id, survey_item_id);
+"""
+
+DROP_SCHEMA = """
+drop function if exists refresh_stats_views_v2();
+drop materialized view if exists survey_group_choice_iq_stats_v2;
+drop materialized view if exists survey_choice_iq_stats_v2;
+drop materialized view if exists user_best_iq_unified_v2;
+drop table if exists survey_answers;
+drop table if exists user_best_iq;
+"""
+
+
+def test_refresh_function_against_postgres(pg_conn):
+    pg_conn.execute(DROP_SCHEMA)
+    pg_conn.execute(STAND_IN_SCHEMA)
+    for role in ("anon", "authenticated", "service_role"):
+        pg_conn.execute(
+            f"do $$ begin if not exists (select 1 from pg_roles where rolname = '{role}') "
+            f"then create role {role}; end if; end $$;"
+        )
+    pg_conn.execute(MIGRATION.read_text())
+    try:
+        sched, clock = make_scheduler(lambda: pg_conn.execute("select refresh_stats_views_v2()"))
+        pg_conn.execute("insert into user_best_iq values ('u1', 100), ('u2', 120)")
+        pg_conn.execute(
+            "insert into survey_answers (user_id, survey_id, survey_group_id, survey_item_id) "
+            "values ('u1', 's1', 'g1', 'i1'), ('u2', 's1', 'g1', 'i1'), ('u2', 's1', 'g1', 'i2')"
+        )
+        sched.note_write(5)
+        count = lambda view: pg_conn.execute(f"select count(*) from {view}").fetchone()[0]
+        assert count("survey_choice_iq_stats_v2") == 0
+
+        clock.now += 2
+        assert sched.run_due()
+        assert count("survey_choice_iq_stats_v2") == 2
+        assert count("survey_group_choice_iq_stats_v2") == 2
+        assert count("user_best_iq_unified_v2") == 2
+        avg = pg_conn.execute(
+            "select avg_iq from survey_choice_iq_stats_v2 where survey_item_id = 'i1'"
+        ).fetchone()[0]
+        assert avg == 110
+    finally:
+        pg_conn.execute(DROP_SCHEMA)
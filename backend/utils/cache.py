@@ -0,0 +1,174 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+_MISSING = object()
+_registry: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+_named: "dict[str, TTLCache]" = {}
+_named_lock = threading.Lock()
+_request_scope: "ContextVar[Optional[Dict[str, dict]]]" = ContextVar(
+    "request_scope", default=None
+)
+
+
+class TTLCache:
+    """Thread-safe LRU mapping with optional per-entry expiry.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is reached.
+    When ``ttl`` is ``None`` entries never expire on their own, which suits
+    immutable lookups such as id resolution.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        _registry.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def shared_cache(name: str, maxsize: int = 1024, ttl: Optional[float] = None) -> TTLCache:
+    """Return the process-wide cache registered under ``name``.
+
+    The app is importable both as ``db`` and ``backend.db``; looking caches up
+    by name keeps both module copies pointed at the same entries.
+    """
+
+    with _named_lock:
+        cache = _named.get(name)
+        if cache is None:
+            cache = _named[name] = TTLCache(maxsize=maxsize, ttl=ttl)
+        return cache
+
+
+def clear_all_caches() -> None:
+    """Drop every entry from all live :class:`TTLCache` instances."""
+
+    for cache in list(_registry):
+        cache.clear()
+
+
+class PeriodicRebuild:
+    """Run ``rebuild`` on first use and again in the background once stale.
+
+    ``rebuild`` returns ``True`` on success. The first call blocks so callers
+    never see an empty structure; later rebuilds run in a daemon thread while
+    the previous state keeps serving. Attempts, failed or not, are spaced at
+    least ``interval`` seconds apart.
+    """
+
+    def __init__(self, rebuild: Callable[[], bool], interval: float, name: str):
+        self.rebuild = rebuild
+        self.interval = interval
+        self.name = name
+        self.loaded_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def run(self) -> bool:
+        self._last_attempt = time.monotonic()
+        ok = self.rebuild()
+        if ok:
+            self.loaded_at = time.monotonic()
+        return ok
+
+    def _due(self, now: float) -> bool:
+        return self._last_attempt is None or now - self._last_attempt >= self.interval
+
+    def ensure_fresh(self) -> None:
+        now = time.monotonic()
+        if self.loaded_at is None:
+            with self._lock:
+                if self.loaded_at is None and self._due(now):
+                    self.run()
+            return
+        if now - self.loaded_at < self.interval or not self._due(now):
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+
+        def target() -> None:
+            try:
+                self.run()
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=target, name=self.name, daemon=True).start()
+
+
+@contextmanager
+def request_scope() -> Iterator[None]:
+    """Give the enclosed code (one HTTP request) its own identity maps."""
+
+    token = _request_scope.set({})
+    try:
+        yield
+    finally:
+        _request_scope.reset(token)
+
+
+def request_map(name: str) -> Optional[dict]:
+    """Return the identity map ``name`` for the current request, if any.
+
+    Outside :func:`request_scope` (scripts, background jobs) this is ``None``
+    and callers skip request-level memoisation.
+    """
+
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    return scope.setdefault(name, {})
+
+
+class RequestScopeMiddleware:
+    """ASGI middleware running each HTTP request inside :func:`request_scope`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_scope():
+            await self.app(scope, receive, send)
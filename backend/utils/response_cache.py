@@ -0,0 +1,215 @@
+"""Shared cache of encoded JSON responses for read-heavy public endpoints.
+
+:class:`ResponseCacheMiddleware` keeps the status, headers and body of
+successful ``GET`` responses for configured paths, keyed by path, query string
+and (for endpoints whose payload depends on the caller) a hash of the
+``Authorization`` header. Within ``ttl`` the stored response is replayed
+without calling the handler; for a further ``stale_while_revalidate`` seconds
+it is still replayed while one background request refreshes it. Requests
+whose ``If-None-Match`` matches the stored ``ETag`` get an empty ``304``.
+Concurrent misses for the same key wait for a single handler call.
+
+The middleware must sit inside compression and CORS middleware so stored
+bodies are uncompressed and CORS headers are computed per request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from .cache import TTLCache, request_scope
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+RESPONSE_CACHE_SWR = float(os.getenv("RESPONSE_CACHE_SWR", "300"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+
+
+@dataclass(frozen=True)
+class CacheRule:
+    """Cache responses for paths matching ``pattern``.
+
+    ``vary_on_auth`` keys entries by the caller's ``Authorization`` header, for
+    payloads such as ``/leaderboard`` that include caller-specific fields.
+    """
+
+    pattern: Pattern[str]
+    vary_on_auth: bool = False
+
+    @classmethod
+    def path(cls, regex: str, vary_on_auth: bool = False) -> "CacheRule":
+        return cls(re.compile(regex), vary_on_auth)
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    etag: str
+    stored_at: float
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == etag:
+            return True
+    return False
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving cached responses for the configured ``rules``."""
+
+    def __init__(
+        self,
+        app,
+        rules: Iterable[CacheRule],
+        ttl: float = RESPONSE_CACHE_TTL,
+        stale_while_revalidate: float = RESPONSE_CACHE_SWR,
+        maxsize: int = RESPONSE_CACHE_SIZE,
+    ):
+        self.app = app
+        self.rules = list(rules)
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl + stale_while_revalidate)
+        self._inflight: Dict[tuple, "asyncio.Future[CachedResponse]"] = {}
+
+    def _rule_for(self, path: str) -> Optional[CacheRule]:
+        return next((r for r in self.rules if r.pattern.fullmatch(path)), None)
+
+    @staticmethod
+    def _header(scope, name: bytes) -> Optional[str]:
+        for key, value in scope.get("headers") or []:
+            if key.lower() == name:
+                return value.decode("latin-1")
+        return None
+
+    def _key(self, scope, rule: CacheRule) -> tuple:
+        query = "&".join(sorted(scope.get("query_string", b"").decode("latin-1").split("&")))
+        auth = None
+        if rule.vary_on_auth:
+            header = self._header(scope, b"authorization")
+            if header:
+                auth = hashlib.sha256(header.encode()).hexdigest()
+        return (scope["path"], query, auth)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        rule = self._rule_for(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = self._key(scope, rule)
+        entry = self.entries.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at >= self.ttl:
+            self._refresh_in_background(key, scope)
+        if entry is None:
+            entry = await self._fetch(key, scope, receive)
+        await self._replay(entry, self._header(scope, b"if-none-match"), send)
+
+    async def _fetch(self, key: tuple, scope, receive) -> CachedResponse:
+        """Call the handler once per key; concurrent callers share the result.
+
+        Only ``200`` responses are stored, but errors are still shared with
+        the requests that were waiting on the same call.
+        """
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future: "asyncio.Future[CachedResponse]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await self._call_app(scope, receive)
+            if entry.status == 200:
+                self.entries.set(key, entry)
+            future.set_result(entry)
+            return entry
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Followers re-raise; mark the exception retrieved for the leader.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _refresh_in_background(self, key: tuple, scope) -> None:
+        if key in self._inflight:
+            return
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def refresh():
+            with request_scope():
+                try:
+                    await self._fetch(key, scope, receive)
+                except Exception:  # pragma: no cover - keep serving the stale copy
+                    pass
+
+        asyncio.get_running_loop().create_task(refresh())
+
+    @staticmethod
+    def _revalidate_headers(scope) -> list:
+        return [
+            (k, v)
+            for k, v in scope.get("headers") or []
+            if k.lower() not in (b"if-none-match", b"if-modified-since")
+        ]
+
+    async def _call_app(self, scope, receive) -> CachedResponse:
+        start: dict = {}
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        scope = dict(scope, headers=self._revalidate_headers(scope))
+        await self.app(scope, receive, capture)
+        status = start.get("status", 500)
+        headers = [
+            (k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"
+        ]
+        body = b"".join(chunks)
+        etag = next((v.decode("latin-1") for k, v in headers if k.lower() == b"etag"), None)
+        if etag is None and status == 200:
+            etag = hashlib.sha256(body).hexdigest()
+            headers.append((b"etag", etag.encode("latin-1")))
+        return CachedResponse(status, headers, body, (etag or "").strip('"'), time.monotonic())
+
+    async def _replay(self, entry: CachedResponse, if_none_match: Optional[str], send) -> None:
+        age = str(int(time.monotonic() - entry.stored_at)).encode()
+        if entry.status == 200 and _etag_matches(if_none_match, entry.etag):
+            headers = [
+                (k, v)
+                for k, v in entry.headers
+                if k.lower() in (b"etag", b"cache-control", b"vary")
+            ]
+            await send({"type": "http.response.start", "status": 304, "headers": headers + [(b"age", age)]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers = entry.headers + [
+            (b"content-length", str(len(entry.body)).encode()),
+            (b"age", age),
+        ]
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
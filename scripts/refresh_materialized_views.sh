@@ -1,8 +1,5 @@
 #!/bin/sh
-# Refresh materialized views for v2 statistics.
+# Refresh materialized views for v2 statistics by hand. The backend normally
+# does this itself (backend/services/view_refresh.py).
 set -e
-psql "$DATABASE_URL" <<'SQL'
-REFRESH MATERIALIZED VIEW CONCURRENTLY survey_choice_iq_stats_v2;
-REFRESH MATERIALIZED VIEW CONCURRENTLY survey_group_choice_iq_stats_v2;
-REFRESH MATERIALIZED VIEW CONCURRENTLY user_best_iq_unified_v2;
-SQL
+psql "$DATABASE_URL" -c "select refresh_stats_views_v2();"
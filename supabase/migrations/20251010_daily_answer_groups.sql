@@ -0,0 +1,16 @@
+-- Distinct survey groups a user answered on a given UTC day.
+-- Backs db.get_daily_answer_count so quota checks never transfer answer rows.
+create or replace function public.daily_answer_groups(p_user_id uuid, p_day date)
+returns table(survey_group_id uuid)
+language sql
+stable
+as $$
+    select distinct survey_group_id
+    from public.survey_answers
+    where user_id = p_user_id
+      and answered_on = p_day
+      and survey_group_id is not null;
+$$;
+
+create index if not exists idx_survey_answers_user_day
+    on public.survey_answers (user_id, answered_on);
@@ -0,0 +1,95 @@
+-- Atomic point ledger operations used by backend/db.py.
+-- Each function locks the app_users row, writes the ledger entry and returns
+-- the new balance in one round trip, so concurrent requests cannot double
+-- spend or lose credits.
+
+create or replace function public.points_credit(
+    p_user_id text,
+    p_delta integer,
+    p_reason text,
+    p_expires_at timestamptz default null,
+    p_once_per_day boolean default false
+)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_points integer;
+begin
+    select coalesce(points, 0) into v_points
+    from app_users
+    where hashed_id = p_user_id
+    for update;
+    if not found then
+        return null;
+    end if;
+
+    if p_once_per_day and exists (
+        select 1 from point_ledger
+        where user_id = p_user_id
+          and reason = p_reason
+          and created_at >= date_trunc('day', now() at time zone 'utc') at time zone 'utc'
+    ) then
+        return v_points;
+    end if;
+
+    insert into point_ledger (user_id, delta, reason, expires_at)
+    values (p_user_id, p_delta, p_reason, p_expires_at);
+
+    update app_users
+    set points = v_points + p_delta
+    where hashed_id = p_user_id
+    returning points into v_points;
+    return v_points;
+end;
+$$;
+
+create or replace function public.points_spend(
+    p_user_id text,
+    p_amount integer,
+    p_reason text default 'consume'
+)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_points integer;
+begin
+    update app_users
+    set points = points - p_amount
+    where hashed_id = p_user_id
+      and coalesce(points, 0) >= p_amount
+    returning points into v_points;
+    if not found then
+        return null;
+    end if;
+
+    insert into point_ledger (user_id, delta, reason)
+    values (p_user_id, -p_amount, p_reason);
+    return v_points;
+end;
+$$;
+
+create or replace function public.points_balance(p_user_id text)
+returns integer
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select coalesce(points, 0) from app_users where hashed_id = p_user_id;
+$$;
+
+create index if not exists idx_point_ledger_user_reason_created
+    on public.point_ledger (user_id, reason, created_at);
+
+revoke all on function public.points_credit(text, integer, text, timestamptz, boolean) from public, anon, authenticated;
+revoke all on function public.points_spend(text, integer, text) from public, anon, authenticated;
+revoke all on function public.points_balance(text) from public, anon, authenticated;
+grant execute on function public.points_credit(text, integer, text, timestamptz, boolean) to service_role;
+grant execute on function public.points_spend(text, integer, text) to service_role;
+grant execute on function public.points_balance(text) to service_role;
@@ -0,0 +1,35 @@
+-- Durable marker for the one-time signup reward so authenticated requests no
+-- longer probe point_ledger on every call.
+alter table public.app_users
+    add column if not exists signup_reward_granted boolean not null default false;
+
+update public.app_users u
+set signup_reward_granted = true
+where not u.signup_reward_granted
+  and exists (
+      select 1 from public.point_ledger l
+      where l.user_id = u.hashed_id and l.reason = 'signup'
+  );
+
+-- Flip the flag and credit the reward in one transaction; returns the new
+-- balance, or null when the reward was already granted or the user is unknown.
+create or replace function public.points_grant_signup(p_user_id text, p_reward integer)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    update app_users
+    set signup_reward_granted = true
+    where hashed_id = p_user_id
+      and not signup_reward_granted;
+    if not found then
+        return null;
+    end if;
+    return points_credit(p_user_id, p_reward, 'signup');
+end;
+$$;
+
+revoke all on function public.points_grant_signup(text, integer) from public, anon, authenticated;
+grant execute on function public.points_grant_signup(text, integer) to service_role;
@@ -0,0 +1,55 @@
+-- One round trip for /leaderboard: the top p_limit players, the number of
+-- ranked players and the caller's rank, without returning the whole view.
+-- Ties are broken by user_id so item ranks and my_rank agree.
+
+create index if not exists idx_user_best_iq_best_iq
+    on public.user_best_iq (best_iq desc, user_id);
+
+create or replace function public.leaderboard_page(
+    p_limit integer,
+    p_user_id text default null
+)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    with ranked as (
+        select user_id, best_iq
+        from leaderboard_best
+        where best_iq is not null
+    )
+    select jsonb_build_object(
+        'total_users', (select count(*) from ranked),
+        'items', coalesce(
+            (
+                select jsonb_agg(
+                    jsonb_build_object('user_id', t.user_id, 'best_iq', t.best_iq)
+                    order by t.best_iq desc, t.user_id
+                )
+                from (
+                    select user_id, best_iq
+                    from ranked
+                    order by best_iq desc, user_id
+                    limit greatest(p_limit, 0)
+                ) t
+            ),
+            '[]'::jsonb
+        ),
+        'my_rank', (
+            select 1 + (
+                select count(*)
+                from ranked r
+                where r.best_iq > me.best_iq
+                   or (r.best_iq = me.best_iq and r.user_id < me.user_id)
+            )
+            from ranked me
+            where me.user_id = p_user_id
+            limit 1
+        )
+    );
+$$;
+
+revoke all on function public.leaderboard_page(integer, text) from public, anon, authenticated;
+grant execute on function public.leaderboard_page(integer, text) to service_role;
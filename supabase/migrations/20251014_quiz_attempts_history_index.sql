@@ -0,0 +1,5 @@
+-- /user/history pages through a user's attempts newest first with a
+-- (created_at, id) keyset cursor; this index serves each page as a short
+-- range scan.
+create index if not exists idx_quiz_attempts_user_created_id
+    on public.quiz_attempts (user_id, created_at desc, id desc);
@@ -0,0 +1,42 @@
+-- Running per-user score summary. app_users.scores now only keeps the last
+-- SCORE_RING_SIZE entries; every score is also appended to user_scores.
+
+create table if not exists public.user_scores (
+    id bigserial primary key,
+    user_id text not null,
+    session_id text,
+    iq double precision not null,
+    percentile double precision,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists idx_user_scores_user_created
+    on public.user_scores (user_id, created_at desc);
+create index if not exists idx_user_scores_created
+    on public.user_scores (created_at desc);
+
+alter table public.app_users
+    add column if not exists score_summary jsonb;
+
+-- Summarise the scores already stored inline. The arrays are trimmed on each
+-- user's next submit.
+update public.app_users u
+set score_summary = s.summary
+from (
+    select
+        a.hashed_id,
+        jsonb_build_object(
+            'best', max((e.value->>'iq')::double precision),
+            'latest', (array_agg((e.value->>'iq')::double precision order by e.ordinality desc))[1],
+            'count', count(*),
+            'sum', sum((e.value->>'iq')::double precision),
+            'sum_sq', sum(((e.value->>'iq')::double precision) ^ 2)
+        ) as summary
+    from public.app_users a
+    cross join lateral jsonb_array_elements(a.scores) with ordinality as e(value, ordinality)
+    where jsonb_typeof(a.scores) = 'array'
+      and e.value->>'iq' is not null
+    group by a.hashed_id
+) s
+where u.hashed_id = s.hashed_id
+  and u.score_summary is null;
@@ -0,0 +1,19 @@
+-- Called by the backend's view refresh scheduler (services/view_refresh.py)
+-- instead of scripts/refresh_materialized_views.sh. CONCURRENTLY keeps the
+-- views readable during the refresh; each view needs a unique index for it.
+
+create or replace function public.refresh_stats_views_v2()
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    refresh materialized view concurrently survey_choice_iq_stats_v2;
+    refresh materialized view concurrently survey_group_choice_iq_stats_v2;
+    refresh materialized view concurrently user_best_iq_unified_v2;
+end;
+$$;
+
+revoke all on function public.refresh_stats_views_v2() from public, anon, authenticated;
+grant execute on function public.refresh_stats_views_v2() to service_role;
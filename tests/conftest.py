@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Keep translation results in memory so cached entries never leak between runs.
+os.environ.setdefault("TRANSLATION_CACHE_PATH", "")
+os.environ.setdefault("NORMS_SKETCH_PATH", "")
+
+
+@pytest.fixture(autouse=True)
+def _clear_process_caches():
+    from backend.utils.cache import clear_all_caches
+
+    clear_all_caches()
+    yield
@@ -77,6 +77,12 @@ class DummySupabase:
             self.tables[name] = []
         return DummyTable(self.tables[name], name)
 
+    def rpc(self, name, params=None):
+        """No database functions are deployed; callers use the table fallback."""
+        from postgrest.exceptions import APIError
+
+        raise APIError({"code": "PGRST202", "message": f"Could not find the function public.{name}"})
+
 
 def test_insert_and_count(monkeypatch):
     supa = DummySupabase()
@@ -96,6 +96,12 @@ class DummySupabase:
     def from_(self, name):
         return self.table(name)
 
+    def rpc(self, name, params=None):
+        """No database functions are deployed; callers use the table fallback."""
+        from postgrest.exceptions import APIError
+
+        raise APIError({"code": "PGRST202", "message": f"Could not find the function public.{name}"})
+
 
 @pytest.fixture
 def fake_supabase(monkeypatch):
@@ -3,7 +3,8 @@ import sys
 from openai import APIError, BadRequestError
 
 sys.path.insert(0, os.path.abspath("backend"))
-from services.translation import _client, is_reasoning, translate_text
+from services.translation import PROMPT_VERSION, _FALLBACK_MODEL, _client, is_reasoning, translate_text
+from services.translation_cache import get_translation_cache
 
 
 class DummyResp:
@@ -52,4 +53,7 @@ def test_fallback_to_gpt4o(monkeypatch):
     assert result == "hola"
     assert calls[0] == "gpt-5"
     assert calls[1] != calls[0]
+    cache = get_translation_cache()
+    assert cache.get("hello", "en", "es", _FALLBACK_MODEL, PROMPT_VERSION) == "hola"
+    assert cache.get("hello", "en", "es", "gpt-5", PROMPT_VERSION) is None
 
@@ -1,13 +1,19 @@
 import argparse
 import json
 import os
+import sys
 import time
 from pathlib import Path
 
 from openai import OpenAI
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from backend.services.translation_cache import get_translation_cache  # noqa: E402
+
 client = OpenAI()
 model = os.getenv("TRANSLATION_MODEL", "gpt-5")
+# Bump when the instructions or schema change in a way that alters output.
+PROMPT_VERSION = "1"
 
 SCHEMA = {
     "name": "Question",
@@ -26,7 +32,14 @@ SCHEMA = {
 }
 
 
-def translate_payload(payload: dict, src: str, tgt: str) -> dict:
+def translate_payload(payload: dict, src: str, tgt: str) -> tuple[dict, bool]:
+    """Translate ``payload``; the flag reports whether the cache answered."""
+
+    source = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    cache = get_translation_cache()
+    cached = cache.get(source, src, tgt, model, PROMPT_VERSION)
+    if cached is not None:
+        return json.loads(cached), True
     resp = client.responses.create(
         model=model,
         instructions=(
@@ -36,7 +49,9 @@ def translate_payload(payload: dict, src: str, tgt: str) -> dict:
         input=json.dumps(payload, ensure_ascii=False),
         text={"format": {"type": "json_schema", "json_schema": SCHEMA}},
     )
-    return json.loads(resp.output_text)
+    translated = json.loads(resp.output_text)
+    cache.put(source, src, tgt, model, PROMPT_VERSION, resp.output_text)
+    return translated, False
 
 
 def translate_file(path: Path, languages: list[str]) -> None:
@@ -56,10 +71,11 @@ def translate_file(path: Path, languages: list[str]) -> None:
                 "answer_index": q.get("answer", 0),
                 "explanation": q.get("explanation", ""),
             }
-            translated = translate_payload(payload, src_lang, lang)
+            translated, cached = translate_payload(payload, src_lang, lang)
             q["question"] = translated["prompt"]
             q["options"] = translated["options"]
-            time.sleep(1)
+            if not cached:
+                time.sleep(1)
         out_file = path.parent / f"{set_id}_{lang}.json"
         out_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
         print(f"Saved {out_file}")